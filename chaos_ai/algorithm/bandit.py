@@ -0,0 +1,129 @@
+'''
+Multi-armed bandit allocating random scenarios across scenario types.
+
+Each scenario type is an arm rewarded with the fitness score of the scenarios
+of that type, so that the initial population and injected members are biased
+toward types that disrupt the system, while an exploration floor keeps every
+type in play. Optionally a second bandit per type allocates across target
+values (pod label, node selector, ...) of that type.
+'''
+
+import math
+import random
+from typing import Dict, Hashable, List, Optional
+
+from chaos_ai.models.base_scenario import BaseScenario, Scenario
+from chaos_ai.models.config import BanditConfig, BanditStrategy
+from chaos_ai.models.search_space import TARGET_PARAMETERS
+from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.metrics import REGISTRY
+
+logger = get_module_logger(__name__)
+
+ARM_PULLS = REGISTRY.gauge(
+    "chaos_ai_bandit_arm_pulls", "Evaluated scenarios per scenario type.", ["scenario"]
+)
+ARM_MEAN_FITNESS = REGISTRY.gauge(
+    "chaos_ai_bandit_arm_mean_fitness_score", "Mean fitness score per scenario type.", ["scenario"]
+)
+
+
+class Arm:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.count if self.count > 0 else 0.0
+
+    def update(self, reward: float):
+        self.count += 1
+        self.total += reward
+
+
+class Bandit:
+    '''
+    UCB1 or Gaussian Thompson sampling over arms identified by any hashable key.
+    Fitness scores are not bounded, so rewards are scaled by the largest
+    reward observed to keep them within [0, 1].
+    '''
+
+    def __init__(self, strategy: BanditStrategy, exploration: float, min_probability: float):
+        self.strategy = strategy
+        self.exploration = exploration
+        self.min_probability = min_probability
+        self.arms: Dict[Hashable, Arm] = {}
+        self.max_reward = 0.0
+
+    def update(self, key: Hashable, reward: float):
+        self.arms.setdefault(key, Arm()).update(reward)
+        self.max_reward = max(self.max_reward, reward)
+
+    def score(self, key: Hashable, total_count: int) -> float:
+        arm = self.arms.get(key)
+        if arm is None or arm.count == 0:
+            # Untried arms are played first
+            return float("inf")
+
+        scale = self.max_reward if self.max_reward > 0 else 1.0
+        if self.strategy == BanditStrategy.thompson:
+            # Posterior of mean reward with prior N(0.5, 0.25), rewards within [0, 1]
+            posterior_mean = (arm.total / scale + 0.5) / (arm.count + 1)
+            return random.gauss(posterior_mean, 0.5 / math.sqrt(arm.count + 1))
+        return arm.mean / scale + self.exploration * math.sqrt(math.log(total_count) / arm.count)
+
+    def choose(self, keys: List[Hashable]) -> Hashable:
+        '''Pick one of keys, uniformly with probability min_probability per arm, by score otherwise.'''
+        if random.random() < self.min_probability * len(keys):
+            return random.choice(keys)
+
+        total_count = sum(self.arms[key].count for key in keys if key in self.arms)
+        scores = {key: self.score(key, total_count) for key in keys}
+        best = max(scores.values())
+        # Break ties at random, e.g. between untried arms
+        return random.choice([key for key in keys if scores[key] == best])
+
+
+class ScenarioBandit:
+    '''Allocates scenario types and their target values by observed fitness.'''
+
+    def __init__(self, config: BanditConfig):
+        self.config = config
+        self.types = self._new_bandit()
+        self.targets: Dict[str, Bandit] = {}
+
+    def _new_bandit(self) -> Bandit:
+        return Bandit(self.config.strategy, self.config.exploration, self.config.min_probability)
+
+    def choose_type(self, names: List[str]) -> str:
+        return self.types.choose(names)
+
+    def choose_target(self, scenario_name: str, values: List[str]) -> Optional[str]:
+        '''Target value to draw scenario with, None to leave it to uniform sampling.'''
+        if not self.config.targets:
+            return None
+        bandit = self.targets.setdefault(scenario_name, self._new_bandit())
+        return bandit.choose(values)
+
+    def observe(self, scenario: BaseScenario, fitness_score: float):
+        # Composite scenarios can not credit the score to either of their types
+        if not isinstance(scenario, Scenario):
+            return
+
+        self.types.update(scenario.name, fitness_score)
+        arm = self.types.arms[scenario.name]
+        ARM_PULLS.set(arm.count, scenario=scenario.name)
+        ARM_MEAN_FITNESS.set(arm.mean, scenario=scenario.name)
+
+        if self.config.targets:
+            for parameter in scenario.parameters:
+                if parameter.name == TARGET_PARAMETERS.get(scenario.name):
+                    bandit = self.targets.setdefault(scenario.name, self._new_bandit())
+                    bandit.update(parameter.value, fitness_score)
+
+    def describe(self) -> str:
+        return ", ".join(
+            "%s: %d runs, mean %.4f" % (name, arm.count, arm.mean)
+            for name, arm in self.types.arms.items()
+        )
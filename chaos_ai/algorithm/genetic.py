@@ -1,25 +1,53 @@
 import os
-import copy
-import json
-import yaml
+import time
 import random
-from typing import List
+import itertools
+from typing import Dict, List, Optional
 
-from chaos_ai.models.app import CommandRunResult, KrknRunnerType
+from chaos_ai.algorithm.bandit import ScenarioBandit
+from chaos_ai.algorithm.racing import RacingPolicy
+from chaos_ai.algorithm.warm_start import WarmStart
+from chaos_ai.models.app import CommandRunResult, FitnessResult, KrknRunnerType, ResultSummary
 from chaos_ai.models.base_scenario import (
     BaseScenario,
     Scenario,
     CompositeDependency,
     CompositeScenario,
-    ScenarioFactory
 )
 from chaos_ai.models.config import ConfigFile
+from chaos_ai.models.search_space import SearchSpace
 from chaos_ai.reporter.health_check_reporter import HealthCheckReporter
+from chaos_ai.reporter.run_ledger import RunLedger
 from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.metrics import REGISTRY
+from chaos_ai.utils.serialization import dump_data, dump_yaml, model_to_json
+from chaos_ai.utils.tracing import TRACE_FILE_NAME, SpanRecorder, recording, span, write_chrome_trace
+from chaos_ai.chaos_engines.cluster_inventory import ClusterInventory
+from chaos_ai.chaos_engines.coordinator import Coordinator
+from chaos_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
 from chaos_ai.chaos_engines.krkn_runner import KrknRunner
 
 logger = get_module_logger(__name__)
 
+GENERATION = REGISTRY.gauge("chaos_ai_generation", "Generation currently being evaluated.")
+EVALUATIONS = REGISTRY.counter("chaos_ai_evaluations", "Scenarios evaluated by running krkn.")
+CACHE_HITS = REGISTRY.counter(
+    "chaos_ai_evaluation_cache_hits", "Scenarios whose result was reused from an earlier generation."
+)
+PENDING_EVALUATIONS = REGISTRY.gauge(
+    "chaos_ai_pending_evaluations", "Scenarios of the current generation waiting to be evaluated."
+)
+BEST_FITNESS = REGISTRY.gauge("chaos_ai_best_fitness_score", "Best fitness score found so far.")
+GENERATION_BEST_FITNESS = REGISTRY.gauge(
+    "chaos_ai_generation_best_fitness_score", "Best fitness score of the latest completed generation."
+)
+PARTIAL_FITNESS = REGISTRY.gauge(
+    "chaos_ai_partial_fitness_score", "Fitness score sampled so far of the scenario being evaluated."
+)
+LAST_EVALUATION = REGISTRY.gauge(
+    "chaos_ai_last_evaluation_timestamp_seconds", "Unix time of the latest completed evaluation."
+)
+
 
 class GeneticAlgorithm:
     '''
@@ -29,59 +57,108 @@ class GeneticAlgorithm:
         config: ConfigFile, 
         output_dir: str,
         format: str,
-        runner_type: KrknRunnerType = None
+        runner_type: KrknRunnerType = None,
+        plots_enabled: bool = True,
+        plot_dpi: int = 300,
+        plot_format: str = "png",
+        export_files: bool = False,
+        compact: bool = False,
+        coordinator: Coordinator = None,
+        warm_start: WarmStart = None,
     ):
+        # Single health check watcher spans the whole run, each scenario gets its own window
+        self.health_check_watcher = HealthCheckWatcher(config.health_checks)
         self.krkn_client = KrknRunner(
             config,
             output_dir=output_dir,
-            runner_type=runner_type
+            runner_type=runner_type,
+            health_check_watcher=self.health_check_watcher,
         )
         self.output_dir = output_dir
         self.config = config
         self.population = []
         self.format = format
-
-        self.seen_population = {}  # Map between scenario and its result
+        self.export_files = export_files  # Export per-scenario result files from ledger on save
+        self.compact = compact  # Write result files without indentation
+        # Scenarios are run by remote agents when set, by the local krkn runner otherwise
+        self.coordinator = coordinator
+
+        # Results are appended to the ledger as soon as they are available
+        self.ledger = RunLedger(self.output_dir)
+
+        # Index over all scenarios of the config, used to sample random members
+        self.search_space = SearchSpace(config)
+        logger.info(
+            "Search space contains %s scenarios (%s)",
+            self.search_space.cardinality,
+            self.search_space.describe()
+        )
+        # Biases random members toward productive scenario types when enabled
+        self.bandit = ScenarioBandit(config.bandit) if config.bandit.enabled else None
+        # Skips scenarios that target no pods or nodes when enabled
+        self.inventory = ClusterInventory(config) if config.inventory.enabled else None
+        # Runs leading scenarios again while their ranking is uncertain when enabled
+        self.racing = RacingPolicy(config.reevaluation) if config.reevaluation.enabled else None
+        # Seeds initial population with best scenarios of previous runs when set
+        self.warm_start = warm_start
+        if warm_start is not None and warm_start.priors:
+            self.import_priors()
+
+        # Map between scenario and its result summary, health check samples are spilled to samples_dir
+        self.seen_population = {}
+        # Latest sampled fitness of scenarios still running, with fitness sampling enabled
+        self.running_estimates: Dict[BaseScenario, FitnessResult] = {}
+        self.samples_dir = os.path.join(self.output_dir, "samples")
+        self.trace = SpanRecorder()  # Timing spans of the whole run, exported to trace.json
         self.best_of_generation = []
 
-        self.reporter = HealthCheckReporter(self.output_dir)
+        self.reporter = HealthCheckReporter(
+            self.output_dir,
+            plots_enabled=plots_enabled,
+            plot_dpi=plot_dpi,
+            plot_format=plot_format,
+        )
 
         logger.debug("CONFIG")
         logger.debug("--------------------------------------------------------")
-        logger.debug("%s", json.dumps(self.config.model_dump(), indent=2))
+        logger.debug("%s", model_to_json(self.config))
 
     def simulate(self):
-        self.create_population(self.config.population_size)
+        with recording(self.trace):
+            with span("health_check_start"):
+                self.health_check_watcher.run()
+            try:
+                if self.config.health_checks.baseline_duration > 0:
+                    logger.info(
+                        "Collecting health check baseline for %d seconds",
+                        self.config.health_checks.baseline_duration
+                    )
+                    with span("health_check_baseline"):
+                        time.sleep(self.config.health_checks.baseline_duration)
+                self.evolve()
+            finally:
+                with span("health_check_stop"):
+                    self.health_check_watcher.stop()
+
+    def evolve(self):
+        budget = self.config.generations * self.config.population_size
+        if self.search_space.cardinality <= budget:
+            logger.info(
+                "Search space of %d scenarios fits in %d evaluations, evaluating every scenario",
+                self.search_space.cardinality,
+                budget
+            )
+            self.evaluate_search_space()
+            return
+
+        self.create_initial_population()
 
         for i in range(self.config.generations):
             if len(self.population) == 0:
                 logger.warning("No more population found, stopping generations.")
                 break
 
-            logger.info("| Population |")
-            logger.info("--------------------------------------------------------")
-            for scenario in self.population:
-                logger.info("%s, ", scenario)
-            logger.info("--------------------------------------------------------")
-
-            logger.info("| Generation %d |", i + 1)
-            logger.info("--------------------------------------------------------")
-
-            # Evaluate fitness of the current population
-            fitness_scores = [
-                self.calculate_fitness(member, i) for member in self.population
-            ]
-            # Find the best individual in the current generation
-            # Note: If there is no best solution, it will still consider based on sorting order
-            fitness_scores = sorted(
-                fitness_scores, key=lambda x: x.fitness_result.fitness_score, reverse=True
-            )
-            self.best_of_generation.append(fitness_scores[0])
-            logger.info("Best Fitness: %f", fitness_scores[0].fitness_result.fitness_score)
-
-            # We don't want to add a same parent back to population since its already been included
-            for fitness_result in fitness_scores:
-                self.seen_population[fitness_result.scenario] = fitness_result
+            fitness_scores = self.evaluate_generation(i)
 
             # Repopulate off-springs
             self.population = []
@@ -90,22 +167,17 @@ class GeneticAlgorithm:
                 child1, child2 = None, None
                 if random.random() < self.config.composition_rate:
                     # componention crossover to generate 1 scenario
-                    child1 = self.composition(
-                        copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    )
+                    # Operators don't modify parents, unchanged subtrees are shared
+                    child1 = self.composition(parent1, parent2)
                     child1 = self.mutate(child1)
                     self.population.append(child1)
 
-                    child2 = self.composition(
-                        copy.deepcopy(parent2), copy.deepcopy(parent1)
-                    )
+                    child2 = self.composition(parent2, parent1)
                     child2 = self.mutate(child2)
                     self.population.append(child2)
                 else:
                     # Crossover of 2 parents to generate 2 offsprings
-                    child1, child2 = self.crossover(
-                        copy.deepcopy(parent1), copy.deepcopy(parent2)
-                    )
+                    child1, child2 = self.crossover(parent1, parent2)
                     child1 = self.mutate(child1)
                     child2 = self.mutate(child2)
 
@@ -116,52 +188,234 @@ class GeneticAlgorithm:
             if random.random() < self.config.population_injection_rate:
                 self.create_population(self.config.population_injection_size)
 
+    def evaluate_search_space(self):
+        """Evaluate every scenario of a small search space, population_size scenarios per generation"""
+        scenarios = self.search_space.enumerate()
+        for i in range(self.config.generations):
+            self.population = list(itertools.islice(scenarios, self.config.population_size))
+            if len(self.population) == 0:
+                break
+            self.evaluate_generation(i)
+
+    def evaluate_generation(self, generation_id: int) -> List[ResultSummary]:
+        """Evaluate current population, returns results sorted by fitness score"""
+        logger.info("| Population |")
+        logger.info("--------------------------------------------------------")
+        for scenario in self.population:
+            logger.info("%s, ", scenario)
+        logger.info("--------------------------------------------------------")
+
+        logger.info("| Generation %d |", generation_id + 1)
+        logger.info("--------------------------------------------------------")
+        GENERATION.set(generation_id + 1)
+
+        # Evaluate fitness of the current population
+        PENDING_EVALUATIONS.set(len(self.population))
+        with span("evaluate_generation", generation_id=generation_id):
+            for member in self.population:
+                # Offsprings are not sampled again when injecting random members
+                self.search_space.mark_drawn(member)
+            fitness_scores = self.calculate_fitness(self.population, generation_id)
+            # We don't want to add a same parent back to population since its already been included.
+            # Recorded before re-evaluation, so that results of re-runs replace those of first runs
+            for fitness_result in fitness_scores:
+                self.seen_population[fitness_result.scenario] = fitness_result
+            if self.racing is not None:
+                self.reevaluate(generation_id)
+        # Find the best individual in the current generation
+        # Note: If there is no best solution, it will still consider based on sorting order
+        fitness_scores = sorted(fitness_scores, key=self.rank_score, reverse=True)
+        self.best_of_generation.append(fitness_scores[0])
+        logger.info("Best Fitness: %f", self.rank_score(fitness_scores[0]))
+        GENERATION_BEST_FITNESS.set(self.rank_score(fitness_scores[0]))
+        BEST_FITNESS.set(max(self.rank_score(x) for x in self.best_of_generation))
+
+        if self.bandit is not None:
+            logger.info("Scenario types: %s", self.bandit.describe())
+        return fitness_scores
+
+    def reevaluate(self, generation_id: int):
+        """Run leading scenarios again while their confidence intervals overlap"""
+        candidates = self.racing.candidates()
+        if len(candidates) == 0:
+            return
+        logger.info("Re-evaluating %d scenarios with overlapping fitness intervals", len(candidates))
+        PENDING_EVALUATIONS.set(len(candidates))
+        with span("reevaluate", generation_id=generation_id):
+            for scenario, result in zip(candidates, self.run_scenarios(candidates, generation_id)):
+                self.seen_population[scenario] = result
+                logger.info("Re-evaluated %s", self.racing.describe(scenario))
+
+    def rank_score(self, result: ResultSummary) -> float:
+        """Score results are ranked and selected by, confidence bound over all runs with re-evaluation"""
+        if self.racing is not None:
+            score = self.racing.rank_score(result.scenario)
+            if score is not None:
+                return score
+        return result.fitness_result.fitness_score
+
+    def create_initial_population(self):
+        """Seed population with prior scenarios when warm starting, fill the rest with random ones"""
+        if self.warm_start is not None:
+            seeds = self.warm_start.seeds(self.config.population_size)
+            logger.info("Seeding population with %d prior scenarios", len(seeds))
+            for seed in seeds:
+                # Random members are drawn without replacement, so they never duplicate a seed
+                self.search_space.mark_drawn(seed)
+            self.population.extend(seeds)
+        if len(self.population) < self.config.population_size:
+            self.create_population(self.config.population_size - len(self.population))
+
+    def import_priors(self):
+        """Use fitness of prior results as observations of bandit and re-evaluation statistics"""
+        for prior in self.warm_start.results:
+            for fitness_score in prior.fitness_scores:
+                if self.bandit is not None:
+                    self.bandit.observe(prior.scenario, fitness_score)
+                if self.racing is not None:
+                    self.racing.observe(prior.scenario, fitness_score)
+
     def create_population(self, population_size):
         """Generate random population for algorithm"""
         logger.info("Creating random population")
-        logger.info("Population Size: %d", self.config.population_size)
-
-        already_seen = set()
-        count = 0
-        while count != population_size:
-            scenario = ScenarioFactory.generate_random_scenario(self.config)
-            # Mutate to generate initial randomness among same tests
-            scenario = self.mutate(scenario)
-            if scenario and scenario not in already_seen:
-                self.population.append(scenario)
-                already_seen.add(scenario)
-                count += 1
-
-    def calculate_fitness(self, scenario: BaseScenario, generation_id: int):
-        # If scenario has already been run, do not run it again.
-        # we will rely on mutation for the same parents to produce newer samples
-        if scenario in self.seen_population:
-            logger.info("Scenario %s already evaluated, skipping fitness calculation.", scenario)
-            scenario = copy.deepcopy(self.seen_population[scenario])
-            scenario.generation_id = generation_id
-            return scenario
-        scenario_result = self.krkn_client.run(scenario, generation_id)
-        # Save scenario result
-        self.save_scenario_result(scenario_result)
-        self.reporter.plot_report(scenario_result)
-        return scenario_result
+        logger.info("Population Size: %d", population_size)
+
+        # Sampled without replacement, so members are unique and never seen before
+        scenarios = self.search_space.sample(population_size, bandit=self.bandit)
+        if len(scenarios) < population_size:
+            logger.warning(
+                "Search space exhausted, created %d of %d random scenarios",
+                len(scenarios),
+                population_size
+            )
+        self.population.extend(scenarios)
+
+    def calculate_fitness(self, scenarios: List[BaseScenario], generation_id: int) -> List[ResultSummary]:
+        """Fitness results of scenarios in the same order, scenarios that need a run are run as a batch"""
+        results = [None] * len(scenarios)
+        scenarios = list(scenarios)
+        to_run = []
+        for i, scenario in enumerate(scenarios):
+            # Repair target of scenario before looking it up, skip it if nothing is targeted
+            if self.inventory is not None:
+                scenario, reason = self.inventory.check(scenario)
+                scenarios[i] = scenario
+                if reason is not None:
+                    logger.info("Skipping scenario: %s", reason)
+                    results[i] = ResultSummary.from_result(CommandRunResult.not_run(scenario, generation_id, reason))
+                    PENDING_EVALUATIONS.dec()
+                    continue
+
+            # If scenario has already been run, do not run it again.
+            # we will rely on mutation for the same parents to produce newer samples
+            if scenario in self.seen_population:
+                logger.info("Scenario %s already evaluated, skipping fitness calculation.", scenario)
+                CACHE_HITS.inc()
+                results[i] = self.seen_population[scenario].model_copy(update={"generation_id": generation_id})
+                PENDING_EVALUATIONS.dec()
+                continue
+            to_run.append(i)
+
+        run_results = self.run_scenarios([scenarios[i] for i in to_run], generation_id)
+        for i, result in zip(to_run, run_results):
+            results[i] = result
+        return results
+
+    def run_scenarios(self, scenarios: List[BaseScenario], generation_id: int) -> List[ResultSummary]:
+        """Run scenarios locally one by one, or on remote agents in parallel with a coordinator"""
+        if self.coordinator is not None:
+            completed = self.coordinator.evaluate(scenarios, generation_id)
+        else:
+            completed = (
+                (i, self.krkn_client.run(
+                    scenario,
+                    generation_id,
+                    on_partial_fitness=lambda fitness_result, scenario=scenario: self.on_partial_fitness(
+                        scenario, fitness_result
+                    ),
+                ))
+                for i, scenario in enumerate(scenarios)
+            )
 
-    def mutate(self, scenario: BaseScenario):
+        # Results are recorded as they complete
+        results = [None] * len(scenarios)
+        for i, result in completed:
+            if self.coordinator is not None:
+                # Spans of remote runs are not recorded in this process
+                for item in result.spans:
+                    self.trace.record(item)
+            results[i] = self.record_result(scenarios[i], result)
+            PENDING_EVALUATIONS.dec()
+        return results
+
+    def record_result(self, scenario: BaseScenario, scenario_result: CommandRunResult) -> ResultSummary:
+        '''Record result of a run, returns its summary kept in memory.'''
+        EVALUATIONS.inc()
+        LAST_EVALUATION.set(time.time())
+        self.running_estimates.pop(scenario, None)
+        if self.bandit is not None:
+            self.bandit.observe(scenario, scenario_result.fitness_result.fitness_score)
+        if self.racing is not None:
+            self.racing.observe(scenario, scenario_result.fitness_result.fitness_score)
+
+        # Spans of post-processing are added to the result, plot is queued
+        # first so that its span is included in the saved result
+        with recording(SpanRecorder(scenario_id=scenario_result.scenario_id, spans=scenario_result.spans)):
+            with span("plot_report"):
+                self.reporter.plot_report(scenario_result)
+            with span("save_result"):
+                self.save_scenario_result(scenario_result)
+            with span("spill_samples"):
+                samples_path = self.spill_samples(scenario_result)
+        return ResultSummary.from_result(scenario_result, samples_path)
+
+    def spill_samples(self, scenario_result: CommandRunResult) -> Optional[str]:
+        '''Save health check samples of a result to disk, returns path of the file if there were any.'''
+        if sum(len(series) for series in scenario_result.health_check_samples) == 0:
+            return None
+        os.makedirs(self.samples_dir, exist_ok=True)
+        samples_path = os.path.join(self.samples_dir, "scenario_%d.npz" % scenario_result.scenario_id)
+        scenario_result.health_check_samples.save(samples_path)
+        return samples_path
+
+    def on_partial_fitness(self, scenario: BaseScenario, fitness_result: FitnessResult):
+        '''Receives fitness score sampled while a scenario is still running, kept until its result is recorded.'''
+        self.running_estimates[scenario] = fitness_result
+        PARTIAL_FITNESS.set(fitness_result.fitness_score)
+        logger.info("Partial fitness score of %s: %f", scenario, fitness_result.fitness_score)
+
+    def mutate(self, scenario: BaseScenario) -> BaseScenario:
+        '''Mutated copy of scenario, scenario itself if no parameter was mutated.'''
         if isinstance(scenario, CompositeScenario):
-            scenario.scenario_a = self.mutate(scenario.scenario_a)
-            scenario.scenario_b = self.mutate(scenario.scenario_b)
+            return scenario.replace(self.mutate(scenario.scenario_a), self.mutate(scenario.scenario_b))
+        mutated = [i for i in range(len(scenario.parameters)) if random.random() < self.config.mutation_rate]
+        if len(mutated) == 0:
             return scenario
-        for param in scenario.parameters:
-            if random.random() < self.config.mutation_rate:
-                param.mutate()
+        scenario = scenario.model_copy(deep=True)
+        for i in mutated:
+            scenario.parameters[i].mutate()
         return scenario
 
-    def select_parents(self, fitness_scores: List[CommandRunResult]):
+    def within_bounds(self, scenario: BaseScenario) -> bool:
+        '''Whether composite scenario is within configured depth and leaf count.'''
+        return (
+            scenario.depth() <= self.config.composition.max_depth
+            and scenario.leaf_count() <= self.config.composition.max_leaves
+        )
+
+    def select_parents(self, fitness_scores: List[ResultSummary]):
         """
         Selects two parents using Roulette Wheel Selection (proportionate selection).
         Higher fitness means higher chance of being selected.
         """
-        total_fitness = sum([x.fitness_result.fitness_score for x in fitness_scores])
+        # Lower confidence bounds may be negative, which can't be a selection weight.
+        # Parsimony pressure favors smaller composites of similar fitness
+        parsimony = self.config.composition.parsimony
+        weights = [
+            max(self.rank_score(x) - parsimony * (x.scenario.leaf_count() - 1), 0.0)
+            for x in fitness_scores
+        ]
+        total_fitness = sum(weights)
 
         scenarios = [x.scenario for x in fitness_scores]
 
@@ -169,7 +423,7 @@ class GeneticAlgorithm:
             return random.choice(scenarios), random.choice(scenarios)
 
         # Normalize fitness scores to get probabilities
-        probabilities = [x.fitness_result.fitness_score / total_fitness for x in fitness_scores]
+        probabilities = [weight / total_fitness for weight in weights]
 
         # Select parents based on probabilities
         parent1 = random.choices(scenarios, weights=probabilities, k=1)[0]
@@ -177,26 +431,30 @@ class GeneticAlgorithm:
         return parent1, parent2
 
     def crossover(self, scenario_a: BaseScenario, scenario_b: BaseScenario):
+        '''Offsprings of two scenarios, parents are returned if offsprings exceed composite bounds.'''
         if isinstance(scenario_a, CompositeScenario) and isinstance(scenario_b, CompositeScenario):
             # Handle both scenario are composite
             # by swapping one of the branches
-            scenario_a.scenario_b, scenario_b.scenario_b = scenario_b.scenario_b, scenario_a.scenario_b
+            child_a = scenario_a.replace(scenario_a.scenario_a, scenario_b.scenario_b)
+            child_b = scenario_b.replace(scenario_b.scenario_a, scenario_a.scenario_b)
+        elif isinstance(scenario_a, CompositeScenario):
+            # Scenario A is composite and B is not
+            # Swap scenario_a's right node with scenario_b
+            child_a = scenario_a.replace(scenario_a.scenario_a, scenario_b)
+            child_b = scenario_a.scenario_b
+        elif isinstance(scenario_b, CompositeScenario):
+            # Scenario B is composite and A is not
+            # Swap scenario_b's left node with scenario_a
+            child_a = scenario_b.scenario_a
+            child_b = scenario_b.replace(scenario_a, scenario_b.scenario_b)
+        else:
+            return self.crossover_parameters(scenario_a, scenario_b)
+
+        if not (self.within_bounds(child_a) and self.within_bounds(child_b)):
             return scenario_a, scenario_b
-        elif isinstance(scenario_a, CompositeScenario) or isinstance(scenario_b, CompositeScenario):
-            # Only one of them is composite
-            if isinstance(scenario_a, CompositeScenario):
-                # Scenario A is composite and B is not
-                # Swap scenario_a's right node with scenario_b
-                a_b = scenario_a.scenario_b
-                scenario_a.scenario_b = scenario_b
-                return scenario_a, a_b
-            else:
-                # Scenario B is composite and A is not
-                # Swap scenario_a's right node with scenario_b
-                b_a = scenario_b.scenario_a
-                scenario_b.scenario_a = scenario_a
-                return b_a, scenario_b
+        return child_a, child_b
 
+    def crossover_parameters(self, scenario_a: Scenario, scenario_b: Scenario):
         common_params = set([x.name for x in scenario_a.parameters]) & set(
             [x.name for x in scenario_b.parameters]
         )
@@ -211,6 +469,9 @@ class GeneticAlgorithm:
             # adopt some different strategy
             return scenario_a, scenario_b
         else:
+            # Parents may be shared with earlier results and composites, values are swapped on copies
+            scenario_a, scenario_b = scenario_a.model_copy(deep=True), scenario_b.model_copy(deep=True)
+
             # if there are common params, lets switch values between them
             for param in common_params:
                 if random.random() < self.config.crossover_rate:
@@ -227,27 +488,41 @@ class GeneticAlgorithm:
 
             return scenario_a, scenario_b
 
-    def composition(self, scenario_a: BaseScenario, scenario_b: BaseScenario):
-        # combines two scenario to create a single composite scenario
+    def composition(self, scenario_a: BaseScenario, scenario_b: BaseScenario) -> BaseScenario:
+        '''Combine two scenarios into a composite, scenario_a if composite would exceed bounds.'''
         dependency = random.choice([
             CompositeDependency.NONE,
             CompositeDependency.A_ON_B,
             CompositeDependency.B_ON_A
         ])
-        composite_scenario = CompositeScenario(
-            name="composite",
-            scenario_a=scenario_a,
-            scenario_b=scenario_b,
-            dependency=dependency
-        )
+        composite_scenario = CompositeScenario.of(scenario_a, scenario_b, dependency)
+        if not self.within_bounds(composite_scenario):
+            return scenario_a
         return composite_scenario
 
     def save(self):
         '''Save run results'''
         # TODO: Create a single result file (results.json) that contains summary of all the results
-        self.save_config()
-        self.save_best_generations()
-        self.save_health_check_report()
+        with recording(self.trace):
+            with span("save_config"):
+                self.save_config()
+            with span("save_best_generations"):
+                self.save_best_generations()
+            with span("save_health_check_report"):
+                self.save_health_check_report()
+            if self.export_files:
+                with span("export_files"):
+                    self.ledger.export_files(self.format, compact=self.compact)
+            self.ledger.close()
+            with span("wait_for_plots"):
+                self.reporter.wait()
+        self.save_trace()
+
+    def save_trace(self):
+        '''Save timing spans of the run in Chrome trace event format.'''
+        trace_path = os.path.join(self.output_dir, TRACE_FILE_NAME)
+        write_chrome_trace(trace_path, self.trace.spans)
+        logger.debug("Timing trace saved to %s", trace_path)
 
     def save_config(self):
         logger.info("Saving config file to config.yaml")
@@ -258,8 +533,7 @@ class GeneticAlgorithm:
             "w",
             encoding="utf-8"
         ) as f:
-            config_data = self.config.model_dump(mode='json')
-            yaml.dump(config_data, f, sort_keys=False)
+            dump_yaml(self.config.model_dump(mode='json'), f)
 
     def save_best_generations(self):
         logger.info("Saving results to best_scenarios.json")
@@ -270,56 +544,30 @@ class GeneticAlgorithm:
             "w",
             encoding="utf-8"
         ) as f:
-            best_generations = self.best_of_generation[:]
-            for i in range(len(best_generations)):
-                scenario_result = best_generations[i].model_dump()
-                del scenario_result['log']
-                scenario_result['start_time'] = (scenario_result['start_time']).isoformat()
-                scenario_result['end_time'] = (scenario_result['end_time']).isoformat()
-                best_generations[i] = scenario_result
-            if self.format == 'json':
-                json.dump(best_generations, f, indent=4)
-            elif self.format == 'yaml':
-                yaml.dump(best_generations, f, sort_keys=False)
-
-    def save_log_file(self, job_id: str, log_data: str):
-        dir_path = os.path.join(self.output_dir, 'logs')
-        os.makedirs(dir_path, exist_ok=True)
-        # Store log file in output directory under a "logs" folder.
-        log_save_path = os.path.join(dir_path, "scenario_%s.log" % job_id)
-        with open(log_save_path, 'w', encoding='utf-8') as f:
-            f.write(log_data)
-        return log_save_path
+            dump_data(
+                [self.load_result(summary) for summary in self.best_of_generation],
+                f,
+                self.format,
+                compact=self.compact
+            )
+
+    def load_result(self, summary: ResultSummary) -> Dict:
+        '''Full serialized result of a summary from the ledger, without its log.'''
+        try:
+            result = self.ledger.result(summary.scenario_id)
+        except KeyError:
+            # Skipped scenarios are not recorded in the ledger
+            result = summary.model_dump(mode='json', exclude={'samples_path'})
+        # Cached results are reused by later generations
+        result['generation_id'] = summary.generation_id
+        return result
 
     def save_scenario_result(self, fitness_result: CommandRunResult):
         logger.debug("Saving scenario result for scenario %s", fitness_result.scenario_id)
-        result = fitness_result.model_dump()
-        # Convert scenario to string representation and replace it in scenario.name
-        result['scenario']['name'] = str(fitness_result.scenario)
-        generation_id = result['generation_id']
-        result['job_id'] = fitness_result.scenario_id
-
-        # Store log in a log file and update log location
-        result['log'] = self.save_log_file(
-            str(fitness_result.scenario_id),
-            result['log']
-        )
-        # Convert timestamps to ISO string
-        result['start_time'] = (result['start_time']).isoformat()
-        result['end_time'] = (result['end_time']).isoformat()
-
-        output_dir = os.path.join(self.output_dir, self.format, "generation_%s" % generation_id)
-        os.makedirs(output_dir, exist_ok=True)
-
-        with open(
-                os.path.join(output_dir, "scenario_%s.%s" % (fitness_result.scenario_id, self.format)),
-                "w",
-                encoding="utf-8"
-            ) as file_handler:
-                if self.format == 'json':
-                    json.dump(result, file_handler, indent=4)
-                elif self.format == 'yaml':
-                    yaml.dump(result, file_handler, sort_keys=False)
+        self.ledger.append(fitness_result)
 
     def save_health_check_report(self):
-        self.reporter.save_report(self.seen_population.values())
+        self.reporter.save_report(
+            self.seen_population.values(),
+            baselines=self.health_check_watcher.get_baselines()
+        )
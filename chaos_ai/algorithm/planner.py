@@ -0,0 +1,283 @@
+'''
+Dry-run cost estimate of a run, and generations/population size fitting a time budget.
+
+The duration of a scenario is bounded by one of its parameters (KILL_TIMEOUT,
+DURATION, TOTAL_CHAOS_DURATION, ...), plus the overhead of starting krkn and
+querying fitness. Composite scenarios run their parts in parallel after a dummy
+scenario (no dependency) or one after another, so their duration is the
+critical path of the graph. The overhead of each scenario type is calibrated
+from results of previous runs when available.
+
+How many composites a run produces depends on random choices of the genetic
+algorithm, so the population is simulated on durations alone: parents are
+picked uniformly, as fitness is not known upfront, composites are bounded by
+the composition config, and no scenario is assumed to be a cache hit, which
+makes the estimate an upper bound.
+'''
+
+import re
+import json
+import math
+import random
+import datetime
+import statistics
+from typing import Dict, List, Optional, Tuple
+
+from chaos_ai.models.app import RunEstimate
+from chaos_ai.models.base_scenario import (
+    BaseScenario,
+    CompositeDependency,
+    CompositeScenario,
+    Scenario,
+    ScenarioFactory,
+)
+from chaos_ai.models.config import ConfigFile
+from chaos_ai.models.search_space import SearchSpace
+from chaos_ai.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+# Parameter bounding the chaos duration of a scenario type, in seconds
+DURATION_PARAMETERS = {
+    "pod-scenarios": "KILL_TIMEOUT",
+    "application-outages": "DURATION",
+    "container-scenarios": "EXPECTED_RECOVERY_TIME",
+    "node-cpu-hog": "TOTAL_CHAOS_DURATION",
+    "node-memory-hog": "TOTAL_CHAOS_DURATION",
+    "dummy-scenario": "END",
+}
+
+DEFAULT_OVERHEAD = 30.0  # in seconds, krkn container start and fitness queries
+DUMMY_DURATION = 10.0  # END of the dummy root scenario of parallel composites
+
+POOL_SIZE = 256  # Random scenarios drawn to estimate durations of new members
+MAX_GENERATIONS = 10000
+MAX_POPULATION_SIZE = 4096
+
+
+def parse_duration(value: str) -> float:
+    '''Parse duration such as 90, 90m, 1h30m or 3600s into seconds, plain numbers are minutes.'''
+    value = value.strip().lower()
+    if re.fullmatch(r"\d+(\.\d+)?", value):
+        return float(value) * 60
+    match = re.fullmatch(r"(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m)?(?:(\d+(?:\.\d+)?)s)?", value)
+    if value == "" or match is None:
+        raise ValueError(f"Invalid duration '{value}', expected e.g. 90m, 6h or 1h30m")
+    hours, minutes, seconds = (float(group or 0) for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds
+
+
+def format_duration(seconds: float) -> str:
+    minutes = int(round(seconds / 60))
+    if minutes < 60:
+        return f"{minutes}m"
+    return f"{minutes // 60}h{minutes % 60:02d}m"
+
+
+def critical_path(scenario: BaseScenario, leaf_duration) -> float:
+    '''Duration of scenario graph, leaves estimated by leaf_duration.'''
+    if isinstance(scenario, CompositeScenario):
+        duration_a = critical_path(scenario.scenario_a, leaf_duration)
+        duration_b = critical_path(scenario.scenario_b, leaf_duration)
+        return compose(duration_a, duration_b, scenario.dependency, leaf_duration(None))
+    return leaf_duration(scenario)
+
+
+def compose(duration_a: float, duration_b: float, dependency: CompositeDependency, dummy: float) -> float:
+    if dependency == CompositeDependency.NONE:
+        return dummy + max(duration_a, duration_b)
+    return duration_a + duration_b
+
+
+class CostModel:
+    def __init__(self, overheads: Optional[Dict[str, float]] = None, default_overhead: float = DEFAULT_OVERHEAD):
+        self.overheads = overheads or {}  # Overhead per scenario type, in seconds
+        self.default_overhead = default_overhead
+
+    @classmethod
+    def from_history(cls, output_dirs: List[str]) -> "CostModel":
+        '''Calibrate overheads by the median of measured minus nominal duration of previous runs.'''
+        from chaos_ai.reporter.run_ledger import RunLedger
+
+        residuals: Dict[str, List[float]] = {}
+        for output_dir in output_dirs:
+            ledger = RunLedger(output_dir)
+            try:
+                for row in ledger.rows():
+                    if row["returncode"] == -1:
+                        # Scenario was skipped or lost, nothing was run
+                        continue
+                    try:
+                        scenario = ScenarioFactory.from_dict(json.loads(row["result"])["scenario"])
+                    except Exception as error:
+                        logger.debug("Skipping result %s: %s", row["scenario_id"], error)
+                        continue
+                    if not isinstance(scenario, Scenario):
+                        continue
+                    duration = _seconds_between(row["start_time"], row["end_time"])
+                    residuals.setdefault(scenario.name, []).append(duration - nominal_duration(scenario))
+            finally:
+                ledger.close()
+
+        overheads = {name: _overhead(values) for name, values in residuals.items()}
+        all_residuals = [value for values in residuals.values() for value in values]
+        default_overhead = _overhead(all_residuals) if all_residuals else DEFAULT_OVERHEAD
+        for name, values in residuals.items():
+            logger.info("Calibrated %s from %d runs: overhead %.0fs", name, len(values), overheads[name])
+        return cls(overheads, default_overhead)
+
+    def leaf_duration(self, scenario: Optional[Scenario]) -> float:
+        '''Estimated duration of a single scenario, None for the dummy root of a composite.'''
+        if scenario is None:
+            return DUMMY_DURATION
+        overhead = self.overheads.get(scenario.name, self.default_overhead)
+        return max(0.0, nominal_duration(scenario) + overhead)
+
+    def estimate(self, scenario: BaseScenario) -> float:
+        return critical_path(scenario, self.leaf_duration)
+
+
+def _overhead(residuals: List[float]) -> float:
+    '''Median residual, runs shorter than nominal (e.g. early stopped) do not make overhead negative.'''
+    return max(0.0, statistics.median(residuals))
+
+
+def nominal_duration(scenario: Scenario) -> float:
+    name = DURATION_PARAMETERS.get(scenario.name)
+    for parameter in scenario.parameters:
+        if parameter.name == name:
+            return float(parameter.value)
+    return 0.0
+
+
+def _seconds_between(start: str, end: str) -> float:
+    return (datetime.datetime.fromisoformat(end) - datetime.datetime.fromisoformat(start)).total_seconds()
+
+
+def makespan(durations: List[float], agents: int) -> float:
+    '''Wall clock of running scenarios in order on agents, each picking the next one once idle.'''
+    if agents <= 1:
+        return sum(durations)
+    busy_until = [0.0] * agents
+    for duration in durations:
+        index = busy_until.index(min(busy_until))
+        busy_until[index] += duration
+    return max(busy_until)
+
+
+class RunPlanner:
+    def __init__(self, config: ConfigFile, cost_model: CostModel, agents: int = 1, trials: int = 50, seed: int = 0):
+        self.config = config
+        self.cost_model = cost_model
+        self.agents = agents
+        self.trials = trials
+        self.seed = seed
+        self.search_space = SearchSpace(config)
+        # (duration, depth, leaf count) of new random members, drawn with replacement during simulation
+        self.pool = [
+            (self.cost_model.estimate(scenario), 0, 1)
+            for scenario in self.search_space.sample(min(POOL_SIZE, self.search_space.cardinality))
+        ]
+        if len(self.pool) == 0:
+            raise ValueError("No scenarios found to estimate")
+
+    def _reevaluations(self, durations: List[float], rng: random.Random) -> List[float]:
+        '''Re-runs of a generation, at most the leading top_k + 1 scenarios.'''
+        if not self.config.reevaluation.enabled:
+            return []
+        count = min(self.config.reevaluation.top_k + 1, len(durations))
+        return rng.sample(durations, count)
+
+    def _compose(self, member_a: Tuple, member_b: Tuple, rng: random.Random) -> Tuple:
+        '''Composite of simulated members, member_a if it would exceed composite bounds.'''
+        duration_a, depth_a, leaves_a = member_a
+        duration_b, depth_b, leaves_b = member_b
+        dependency = rng.choice(list(CompositeDependency))
+        depth, leaves = 1 + max(depth_a, depth_b), leaves_a + leaves_b
+        if depth > self.config.composition.max_depth or leaves > self.config.composition.max_leaves:
+            return member_a
+        return compose(duration_a, duration_b, dependency, DUMMY_DURATION), depth, leaves
+
+    def simulate(self, generations: int, population_size: int, rng: random.Random) -> List[Tuple[float, float, int]]:
+        '''(cluster seconds, wall clock seconds, evaluations) of each generation.'''
+        if self.search_space.cardinality <= generations * population_size:
+            # Small search space is evaluated scenario by scenario instead of evolved
+            durations = [self.cost_model.estimate(scenario) for scenario in self.search_space.enumerate()]
+            batches = [durations[i:i + population_size] for i in range(0, len(durations), population_size)]
+            return [(sum(batch), makespan(batch, self.agents), len(batch)) for batch in batches[:generations]]
+
+        population = [rng.choice(self.pool) for _ in range(population_size)]
+        costs = []
+        for _ in range(generations):
+            if len(population) == 0:
+                break
+            durations = [member[0] for member in population]
+            durations += self._reevaluations(durations, rng)
+            costs.append((sum(durations), makespan(durations, self.agents), len(durations)))
+
+            offsprings = []
+            for _ in range(population_size // 2):
+                parent1, parent2 = rng.choice(population), rng.choice(population)
+                if rng.random() < self.config.composition_rate:
+                    offsprings.append(self._compose(parent1, parent2, rng))
+                    offsprings.append(self._compose(parent2, parent1, rng))
+                else:
+                    # Crossover exchanges parameters of the same type, durations stay close to the parents'
+                    offsprings.extend([parent1, parent2])
+            population = offsprings
+            if rng.random() < self.config.population_injection_rate:
+                population.extend(rng.choice(self.pool) for _ in range(self.config.population_injection_size))
+        return costs
+
+    def estimate(self, generations: int, population_size: int) -> RunEstimate:
+        rng = random.Random(self.seed)
+        baseline = self.config.health_checks.baseline_duration
+        cluster, wall_clock, evaluations = [], [], []
+        for _ in range(self.trials):
+            costs = self.simulate(generations, population_size, rng)
+            cluster.append(sum(cost[0] for cost in costs))
+            wall_clock.append(baseline + sum(cost[1] for cost in costs))
+            evaluations.append(sum(cost[2] for cost in costs))
+        return RunEstimate(
+            generations=generations,
+            population_size=population_size,
+            agents=self.agents,
+            evaluations=statistics.mean(evaluations),
+            cluster_seconds=statistics.mean(cluster),
+            wall_clock_seconds=statistics.mean(wall_clock),
+            wall_clock_p90_seconds=_percentile(wall_clock, 90),
+        )
+
+    def fit_generations(self, budget: float, population_size: int) -> Optional[RunEstimate]:
+        '''Most generations of given population size whose 90th percentile wall clock fits the budget.'''
+        return _fit(lambda generations: self.estimate(generations, population_size), budget, MAX_GENERATIONS)
+
+    def fit_population_size(self, budget: float, generations: int) -> Optional[RunEstimate]:
+        '''Largest even population size whose 90th percentile wall clock over generations fits the budget.'''
+        # Offsprings are created in pairs, so population size is searched in pairs
+        return _fit(lambda pairs: self.estimate(generations, pairs * 2), budget, MAX_POPULATION_SIZE // 2)
+
+
+def _fit(estimate, budget: float, limit: int) -> Optional[RunEstimate]:
+    '''Largest value up to limit whose estimate fits the budget, bounded by doubling then bisected.'''
+    best, low, high = None, 1, 1
+    while high <= limit:
+        result = estimate(high)
+        if result.wall_clock_p90_seconds > budget:
+            break
+        best, low, high = result, high + 1, high * 2
+    high = min(high - 1, limit)
+    while low <= high:
+        middle = (low + high) // 2
+        result = estimate(middle)
+        if result.wall_clock_p90_seconds <= budget:
+            best, low = result, middle + 1
+        else:
+            high = middle - 1
+    return best
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    index = max(0, math.ceil(percent / 100 * len(ordered)) - 1)
+    return ordered[index]
@@ -0,0 +1,121 @@
+'''
+Racing re-evaluation of noisy fitness measurements.
+
+Fitness of a chaos scenario (restart counts, latency, failed probes) varies
+from run to run, so a single lucky or unlucky run should not decide whether a
+scenario survives. Sample statistics are kept per scenario fingerprint, and
+after each generation only the leading scenarios whose confidence intervals
+still overlap are run again, so that repeat runs are spent where they can
+change the ranking. Scenarios are ranked by a confidence bound of their mean.
+'''
+
+import math
+from statistics import NormalDist
+from typing import Dict, List, Optional, Tuple
+
+from chaos_ai.models.base_scenario import BaseScenario
+from chaos_ai.models.config import ConfidenceBound, ReevaluationConfig
+from chaos_ai.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class FitnessStats:
+    '''Running mean and variance of fitness scores (Welford's algorithm).'''
+
+    def __init__(self):
+        self.count = 0
+        self.mean = 0.0
+        self._m2 = 0.0
+
+    def update(self, value: float):
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+
+    @property
+    def variance(self) -> Optional[float]:
+        '''Sample variance, None until there are two samples.'''
+        if self.count < 2:
+            return None
+        return self._m2 / (self.count - 1)
+
+
+class RacingPolicy:
+    def __init__(self, config: ReevaluationConfig):
+        self.config = config
+        # Two-sided normal quantile of the confidence level
+        self.z = NormalDist().inv_cdf(0.5 + config.confidence / 2)
+        self.stats: Dict[str, FitnessStats] = {}
+        self.scenarios: Dict[str, BaseScenario] = {}
+
+    def observe(self, scenario: BaseScenario, fitness_score: float):
+        fingerprint = scenario.fingerprint()
+        self.stats.setdefault(fingerprint, FitnessStats()).update(fitness_score)
+        self.scenarios.setdefault(fingerprint, scenario)
+
+    def pooled_variance(self) -> Optional[float]:
+        '''Variance pooled over all scenarios run more than once.'''
+        samples = [(stats.count - 1, stats.variance) for stats in self.stats.values() if stats.count > 1]
+        degrees = sum(count for count, _ in samples)
+        if degrees == 0:
+            return None
+        return sum(count * variance for count, variance in samples) / degrees
+
+    def interval(self, fingerprint: str, pooled_variance: Optional[float] = None) -> Tuple[float, float]:
+        '''Confidence interval of mean fitness, unbounded while variance is unknown.'''
+        stats = self.stats[fingerprint]
+        # Variance of a few runs is unreliable, the larger of own and pooled variance is used
+        variances = [variance for variance in (stats.variance, pooled_variance) if variance is not None]
+        if len(variances) == 0:
+            return -math.inf, math.inf
+        variance = max(variances)
+        half_width = self.z * math.sqrt(variance / stats.count)
+        return stats.mean - half_width, stats.mean + half_width
+
+    def rank_score(self, scenario: BaseScenario) -> Optional[float]:
+        '''Score scenario is ranked by, None if it was never observed.'''
+        fingerprint = scenario.fingerprint()
+        if fingerprint not in self.stats:
+            return None
+        return self._rank(fingerprint, self.pooled_variance())
+
+    def _rank(self, fingerprint: str, pooled_variance: Optional[float]) -> float:
+        low, high = self.interval(fingerprint, pooled_variance)
+        if self.config.rank_by == ConfidenceBound.mean or math.isinf(low):
+            # Bounds are meaningless until variance is known
+            return self.stats[fingerprint].mean
+        return low if self.config.rank_by == ConfidenceBound.lower else high
+
+    def candidates(self) -> List[BaseScenario]:
+        '''
+        Scenarios to run again: among the top_k scenarios and the first one
+        below them, those whose interval overlaps another one's and which were
+        run fewer than max_runs times.
+        '''
+        pooled_variance = self.pooled_variance()
+        ranked = sorted(
+            self.stats,
+            key=lambda fingerprint: self._rank(fingerprint, pooled_variance),
+            reverse=True,
+        )[:self.config.top_k + 1]
+        intervals = {fingerprint: self.interval(fingerprint, pooled_variance) for fingerprint in ranked}
+
+        candidates = []
+        for fingerprint in ranked:
+            if self.stats[fingerprint].count >= self.config.max_runs:
+                continue
+            low, high = intervals[fingerprint]
+            if any(
+                other != fingerprint and low < intervals[other][1] and intervals[other][0] < high
+                for other in ranked
+            ):
+                candidates.append(self.scenarios[fingerprint])
+        return candidates
+
+    def describe(self, scenario: BaseScenario) -> str:
+        fingerprint = scenario.fingerprint()
+        stats = self.stats[fingerprint]
+        low, high = self.interval(fingerprint, self.pooled_variance())
+        return "%s: %d runs, mean %.4f, interval [%.4f, %.4f]" % (scenario, stats.count, stats.mean, low, high)
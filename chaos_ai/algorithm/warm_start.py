@@ -0,0 +1,139 @@
+'''
+Warm start of the initial population from results of previous runs.
+
+Recurring suites run against the same application night after night, so the
+strongest scenarios of earlier runs are a better starting point than random
+ones. Prior results are re-mapped onto the current config: scenario types
+that are no longer configured are dropped, values no longer allowed are
+replaced by values of the current config, and numeric values are clamped into
+the current ranges.
+'''
+
+import os
+import json
+import statistics
+from typing import Dict, List, Optional
+
+from chaos_ai.models.base_scenario import (
+    BaseScenario,
+    CompositeScenario,
+    ScenarioFactory,
+)
+from chaos_ai.models.base_scenario_parameter import NumericParameter
+from chaos_ai.models.config import ConfigFile
+from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.serialization import load_yaml
+
+logger = get_module_logger(__name__)
+
+
+class PriorResult:
+    def __init__(self, scenario: BaseScenario, fitness_scores: List[float]):
+        self.scenario = scenario
+        self.fitness_scores = fitness_scores
+
+    @property
+    def fitness_score(self) -> float:
+        return statistics.mean(self.fitness_scores)
+
+
+def load_results(output_dir: str) -> List[Dict]:
+    '''Serialized results of a previous run, from its ledger or from best_scenarios otherwise.'''
+    from chaos_ai.reporter.run_ledger import LEDGER_FILE_NAME, RunLedger
+
+    if os.path.exists(os.path.join(output_dir, LEDGER_FILE_NAME)):
+        ledger = RunLedger(output_dir)
+        try:
+            # Skipped or lost scenarios were never run
+            return [json.loads(row["result"]) for row in ledger.rows() if row["returncode"] != -1]
+        finally:
+            ledger.close()
+
+    for extension in ("yaml", "json"):
+        path = os.path.join(output_dir, "best_scenarios.%s" % extension)
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                return load_yaml(f) or []
+    logger.warning("No results found in %s", output_dir)
+    return []
+
+
+class WarmStart:
+    def __init__(self, config: ConfigFile, output_dirs: List[str], fraction: float = 0.5, priors: bool = False):
+        self.config = config
+        self.fraction = fraction  # Part of the initial population seeded with prior scenarios
+        self.priors = priors  # Import fitness of prior results into bandit and re-evaluation statistics
+        self.sections = ScenarioFactory.available_scenarios(config)
+        self.dropped_values = 0
+        self.results = self._load(output_dirs)
+
+    def _load(self, output_dirs: List[str]) -> List[PriorResult]:
+        '''Prior results re-mapped to current config, best first, runs of the same scenario merged.'''
+        merged: Dict[str, PriorResult] = {}
+        dropped = 0
+        for output_dir in output_dirs:
+            for data in load_results(output_dir):
+                try:
+                    scenario = self.remap(ScenarioFactory.from_dict(data["scenario"]))
+                except Exception as error:
+                    logger.debug("Unable to restore prior scenario: %s", error)
+                    scenario = None
+                if scenario is None:
+                    dropped += 1
+                    continue
+                fitness_score = data["fitness_result"]["fitness_score"]
+                prior = merged.setdefault(scenario.fingerprint(), PriorResult(scenario, []))
+                prior.fitness_scores.append(fitness_score)
+
+        results = sorted(merged.values(), key=lambda prior: prior.fitness_score, reverse=True)
+        logger.info(
+            "Loaded %d prior scenarios, dropped %d no longer configured, replaced %d values no longer allowed",
+            len(results),
+            dropped,
+            self.dropped_values,
+        )
+        return results
+
+    def remap(self, scenario: BaseScenario) -> Optional[BaseScenario]:
+        '''Scenario within current parameter space, None if its type is no longer configured.'''
+        if isinstance(scenario, CompositeScenario):
+            scenario_a = self.remap(scenario.scenario_a)
+            scenario_b = self.remap(scenario.scenario_b)
+            if scenario_a is None or scenario_b is None:
+                return None
+            composite = CompositeScenario.of(scenario_a, scenario_b, scenario.dependency, name=scenario.name)
+            if (
+                composite.depth() > self.config.composition.max_depth
+                or composite.leaf_count() > self.config.composition.max_leaves
+            ):
+                return None
+            return composite
+
+        if scenario.name not in self.sections:
+            return None
+        # Prototype carries choices and ranges of the current config
+        remapped = ScenarioFactory.apply_parameter_ranges(
+            ScenarioFactory.create_scenario(scenario.name, self.sections[scenario.name]),
+            self.config.parameter_ranges,
+        )
+        prior_values = {parameter.name: parameter.value for parameter in scenario.parameters}
+        for parameter in remapped.parameters:
+            if parameter.name not in prior_values:
+                continue
+            value = prior_values[parameter.name]
+            if isinstance(parameter, NumericParameter):
+                parameter.value = parameter.clamp(value)
+            elif not hasattr(parameter, "possible_values"):
+                # Fixed by the current config, e.g. hog image
+                continue
+            elif value in parameter.possible_values:
+                parameter.value = value
+            else:
+                # Value of current config is kept
+                self.dropped_values += 1
+        return remapped
+
+    def seeds(self, population_size: int) -> List[BaseScenario]:
+        '''Best prior scenarios for the configured fraction of the initial population.'''
+        count = min(int(round(self.fraction * population_size)), len(self.results))
+        return [prior.scenario for prior in self.results[:count]]
@@ -0,0 +1,144 @@
+'''
+Runner agent evaluating scenarios handed out by a coordinator.
+
+An agent is bound to a single cluster (kubeconfig) and its Prometheus, leases
+scenarios from the coordinator, runs them with a local KrknRunner and posts
+back the CommandRunResult. The lease is extended by heartbeats while the
+scenario runs, so that the coordinator can tell a long run from a lost agent.
+'''
+
+import json
+import time
+import socket
+import threading
+import urllib.error
+import urllib.request
+from typing import Dict, Optional
+
+from chaos_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from chaos_ai.chaos_engines.krkn_runner import KrknRunner
+from chaos_ai.models.app import KrknRunnerType
+from chaos_ai.models.base_scenario import ScenarioFactory
+from chaos_ai.models.config import ConfigFile
+from chaos_ai.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+REQUEST_TIMEOUT = 30  # in seconds
+
+
+class RunnerAgent:
+    def __init__(
+        self,
+        coordinator_url: str,
+        output_dir: str,
+        name: Optional[str] = None,
+        config: Optional[ConfigFile] = None,
+        kubeconfig: Optional[str] = None,
+        prometheus_url: Optional[str] = None,
+        runner_type: KrknRunnerType = None,
+        poll_interval: float = 2.0,
+        max_retries: int = 5,
+    ):
+        self.coordinator_url = coordinator_url.rstrip("/")
+        self.output_dir = output_dir
+        self.name = name or socket.gethostname()
+        self.config = config  # Fetched from coordinator if not provided
+        self.kubeconfig = kubeconfig
+        self.prometheus_url = prometheus_url
+        self.runner_type = runner_type
+        self.poll_interval = poll_interval
+        self.max_retries = max_retries  # Consecutive failed requests before giving up
+
+    def _request(self, path: str, payload: Optional[Dict] = None) -> Dict:
+        '''Send request to coordinator, retrying with exponential backoff on connection errors.'''
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        for attempt in range(self.max_retries):
+            request = urllib.request.Request(
+                self.coordinator_url + path,
+                data=data,
+                headers={"Content-Type": "application/json"},
+                method="POST" if data is not None else "GET",
+            )
+            try:
+                with urllib.request.urlopen(request, timeout=REQUEST_TIMEOUT) as response:
+                    return json.loads(response.read())
+            except urllib.error.HTTPError:
+                # Coordinator rejected the request, retrying would not help
+                raise
+            except (urllib.error.URLError, ConnectionError, TimeoutError) as error:
+                if attempt == self.max_retries - 1:
+                    raise
+                delay = min(2 ** attempt, 30)
+                logger.warning("Coordinator request %s failed (%s), retrying in %ds", path, error, delay)
+                time.sleep(delay)
+
+    def run(self):
+        if self.config is None:
+            self.config = ConfigFile(**self._request("/config"))
+        if self.kubeconfig is not None:
+            self.config.kubeconfig_file_path = self.kubeconfig
+
+        health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+        runner = KrknRunner(
+            self.config,
+            output_dir=self.output_dir,
+            runner_type=self.runner_type,
+            health_check_watcher=health_check_watcher,
+            prometheus_url=self.prometheus_url,
+        )
+        logger.info("Agent %s pulling scenarios from %s", self.name, self.coordinator_url)
+
+        health_check_watcher.run()
+        try:
+            while True:
+                try:
+                    response = self._request("/lease", {"agent": self.name})
+                except (urllib.error.URLError, ConnectionError, TimeoutError) as error:
+                    # Coordinator is gone, e.g. run finished while agent was waiting
+                    logger.warning("Coordinator is not reachable, stopping agent: %s", error)
+                    break
+                task = response.get("task")
+                if task is None:
+                    if response.get("finished"):
+                        logger.info("Run finished, stopping agent")
+                        break
+                    time.sleep(self.poll_interval)
+                    continue
+                try:
+                    self.run_task(runner, task, response.get("lease_timeout", 60))
+                except Exception as error:
+                    # Coordinator queues the scenario again once its lease expires
+                    logger.error("Unable to run task %d: %s", task["task_id"], error)
+        finally:
+            health_check_watcher.stop()
+
+    def run_task(self, runner: KrknRunner, task: Dict, lease_timeout: float):
+        scenario = ScenarioFactory.from_dict(task["scenario"])
+        logger.info("Running scenario %s (task %d)", scenario, task["task_id"])
+
+        # Heartbeats keep the lease while scenario is running
+        stopped = threading.Event()
+
+        def heartbeat():
+            while not stopped.wait(lease_timeout / 3):
+                try:
+                    response = self._request("/heartbeat", {"agent": self.name, "task_id": task["task_id"]})
+                    if not response.get("ok"):
+                        logger.warning("Lease of task %d was lost", task["task_id"])
+                except Exception as error:
+                    logger.warning("Heartbeat failed: %s", error)
+
+        heartbeat_thread = threading.Thread(target=heartbeat, daemon=True)
+        heartbeat_thread.start()
+        try:
+            result = runner.run(scenario, task["generation_id"], scenario_id=task["scenario_id"])
+        finally:
+            stopped.set()
+            heartbeat_thread.join()
+
+        self._request("/result", {
+            "agent": self.name,
+            "task_id": task["task_id"],
+            "result": json.loads(result.model_dump_json()),
+        })
@@ -0,0 +1,248 @@
+'''
+Cluster inventory used to skip scenarios that target nothing.
+
+Scenario parameters are combined from independent config lists, so many
+combinations (e.g. a pod label that does not exist in the namespace) resolve
+to zero pods or nodes, and a krkn run would only confirm that nothing happened.
+The inventory keeps a snapshot of pods and nodes, refreshed on an interval,
+and checks each scenario against it before it is run: scenarios without
+targets are repaired by trying other target values, or skipped otherwise, and
+disruption counts are capped at the number of targets.
+'''
+
+import re
+import json
+import time
+import random
+import threading
+from typing import Callable, Dict, List, Optional, Tuple
+
+from chaos_ai.models.base_scenario import BaseScenario, CompositeScenario, Scenario
+from chaos_ai.models.base_scenario_parameter import NumericParameter
+from chaos_ai.models.cluster_inventory import ClusterSnapshot, NodeInfo, PodInfo
+from chaos_ai.models.config import ConfigFile
+from chaos_ai.models.custom_errors import ClusterInventoryError
+from chaos_ai.models.search_space import TARGET_PARAMETERS
+from chaos_ai.utils import run_shell
+from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.metrics import REGISTRY
+from chaos_ai.utils.serialization import load_yaml
+
+logger = get_module_logger(__name__)
+
+# Fetches Kubernetes API objects of a kind ("pods" or "nodes")
+ResourceFetcher = Callable[[str], List[dict]]
+
+# Parameter bounded by the number of targets of a scenario type
+COUNT_PARAMETERS = {
+    "pod-scenarios": "DISRUPTION_COUNT",
+    "container-scenarios": "DISRUPTION_COUNT",
+    "node-cpu-hog": "NUMBER_OF_NODES",
+    "node-memory-hog": "NUMBER_OF_NODES",
+}
+
+PRUNED_SCENARIOS = REGISTRY.counter(
+    "chaos_ai_pruned_scenarios", "Scenarios skipped because they target no pods or nodes.", ["scenario"]
+)
+REPAIRED_SCENARIOS = REGISTRY.counter(
+    "chaos_ai_repaired_scenarios", "Scenarios whose target was replaced by one that exists.", ["scenario"]
+)
+
+
+def kubectl_fetcher(kubeconfig: str) -> ResourceFetcher:
+    '''Fetch resources of all namespaces with kubectl.'''
+    def fetch(kind: str) -> List[dict]:
+        output, returncode = run_shell(
+            f"kubectl --kubeconfig={kubeconfig} get {kind} --all-namespaces -o json",
+            do_not_log=True,
+        )
+        if returncode != 0:
+            raise ClusterInventoryError(f"Unable to list {kind}: {output.strip()}")
+        return json.loads(output)["items"]
+    return fetch
+
+
+def match_pattern(pattern: str, value: str) -> bool:
+    '''Full regex match as krkn does for namespace and name patterns, literal if not a valid regex.'''
+    try:
+        return re.fullmatch(pattern, value) is not None
+    except re.error:
+        return pattern == value
+
+
+def match_label_selector(selector: str, labels: Dict[str, str]) -> bool:
+    '''
+    Match equality based label selector (k=v, k==v, k!=v, k, !k). Set based
+    selectors are not evaluated and always match, so they are never pruned.
+    '''
+    if "(" in selector:
+        return True
+    for term in selector.split(","):
+        term = term.strip()
+        if term == "":
+            continue
+        if "!=" in term:
+            key, value = term.split("!=", 1)
+            if labels.get(key.strip()) == value.strip():
+                return False
+        elif "=" in term:
+            key, value = term.replace("==", "=").split("=", 1)
+            if labels.get(key.strip()) != value.strip():
+                return False
+        elif term.startswith("!"):
+            if term[1:].strip() in labels:
+                return False
+        elif term not in labels:
+            return False
+    return True
+
+
+def match_pod_selector(selector: str, labels: Dict[str, str]) -> bool:
+    '''Match pod selector of application outages, written as a YAML mapping such as {app: cart}.'''
+    try:
+        parsed = load_yaml(selector)
+    except Exception:
+        parsed = None
+    if not isinstance(parsed, dict):
+        return match_label_selector(selector, labels)
+    return all(labels.get(str(key)) == str(value) for key, value in parsed.items())
+
+
+class ClusterInventory:
+    def __init__(
+        self,
+        config: ConfigFile,
+        fetcher: Optional[ResourceFetcher] = None,
+    ):
+        self.config = config
+        self.refresh_interval = config.inventory.refresh_interval
+        self.repair = config.inventory.repair
+        self.fetcher = fetcher if fetcher is not None else kubectl_fetcher(config.kubeconfig_file_path)
+        self._snapshot: Optional[ClusterSnapshot] = None
+        self._attempted_at = 0.0  # Failed fetches are retried after refresh interval too
+        self._lock = threading.Lock()
+
+    def snapshot(self) -> Optional[ClusterSnapshot]:
+        '''Current snapshot, fetched again once older than refresh interval. None if never fetched.'''
+        with self._lock:
+            if time.time() - self._attempted_at >= self.refresh_interval:
+                self.refresh()
+            return self._snapshot
+
+    def refresh(self):
+        self._attempted_at = time.time()
+        try:
+            self._snapshot = ClusterSnapshot.from_resources(
+                pods=self.fetcher("pods"),
+                nodes=self.fetcher("nodes"),
+            )
+            logger.debug(
+                "Cluster inventory: %d pods in %d namespaces, %d nodes",
+                len(self._snapshot.pods),
+                len(self._snapshot.namespaces),
+                len(self._snapshot.nodes),
+            )
+        except Exception as error:
+            # Previous snapshot is kept, scenarios are not checked without any
+            logger.warning("Unable to fetch cluster inventory: %s", error)
+
+    def pods(self, namespace: str, selector: str, name_pattern: str = ".*") -> List[PodInfo]:
+        return [
+            pod for pod in self.snapshot().pods
+            if match_pattern(namespace, pod.namespace)
+            and match_label_selector(selector, pod.labels)
+            and match_pattern(name_pattern, pod.name)
+        ]
+
+    def nodes(self, selector: str) -> List[NodeInfo]:
+        return [node for node in self.snapshot().nodes if match_label_selector(selector, node.labels)]
+
+    def count_targets(self, scenario: Scenario) -> Optional[int]:
+        '''Number of pods or nodes scenario would disrupt, None if scenario type is not checked.'''
+        values = {parameter.name: parameter.get_value() for parameter in scenario.parameters}
+        if scenario.name == "pod-scenarios":
+            return len(self.pods(values["NAMESPACE"], values["POD_LABEL"], values["NAME_PATTERN"]))
+        if scenario.name == "container-scenarios":
+            pods = self.pods(values["NAMESPACE"], values["LABEL_SELECTOR"])
+            container_name = values["CONTAINER_NAME"]
+            if container_name == "":
+                return len(pods)
+            return len([
+                pod for pod in pods
+                if any(match_pattern(container_name, container) for container in pod.containers)
+            ])
+        if scenario.name == "application-outages":
+            return len([
+                pod for pod in self.snapshot().pods
+                if match_pattern(values["NAMESPACE"], pod.namespace)
+                and match_pod_selector(values["POD_SELECTOR"], pod.labels)
+            ])
+        if scenario.name in ("node-cpu-hog", "node-memory-hog"):
+            return len(self.nodes(values["NODE_SELECTOR"]))
+        return None
+
+    def check(self, scenario: BaseScenario) -> Tuple[BaseScenario, Optional[str]]:
+        '''
+        Check scenario against the cluster. Returns the scenario with its target
+        repaired and disruption count capped (a copy if anything changed, since
+        scenarios are shared between composites and results), and the reason why
+        it should be skipped, None if it can be run.
+        '''
+        if isinstance(scenario, CompositeScenario):
+            scenario_a, reason = self.check(scenario.scenario_a)
+            if reason is None:
+                scenario_b, reason = self.check(scenario.scenario_b)
+            if reason is not None:
+                return scenario, reason
+            return scenario.replace(scenario_a, scenario_b), None
+        if not isinstance(scenario, Scenario) or self.snapshot() is None:
+            return scenario, None
+
+        count = self.count_targets(scenario)
+        if count is None:
+            return scenario, None
+        checked = scenario.model_copy(deep=True)
+        if count == 0 and self.repair:
+            count = self._repair(checked)
+        if count == 0:
+            PRUNED_SCENARIOS.inc(scenario=scenario.name)
+            return scenario, f"{scenario} targets no pods or nodes in the cluster"
+
+        self._cap_count(checked, count)
+        # Parameters are declared as BaseParameter, ranges are only compared when serialized as their own class
+        if checked.model_dump(serialize_as_any=True) == scenario.model_dump(serialize_as_any=True):
+            return scenario, None
+        return checked, None
+
+    def _repair(self, scenario: Scenario) -> int:
+        '''Replace target value by one that resolves to pods or nodes, returns number of targets.'''
+        for parameter in scenario.parameters:
+            if parameter.name != TARGET_PARAMETERS.get(scenario.name):
+                continue
+            original = parameter.value
+            candidates = [value for value in getattr(parameter, "possible_values", []) if value != original]
+            random.shuffle(candidates)
+            for value in candidates:
+                parameter.value = value
+                count = self.count_targets(scenario)
+                if count > 0:
+                    logger.info("Repaired scenario target %s=%s to %s", parameter.name, original, value)
+                    REPAIRED_SCENARIOS.inc(scenario=scenario.name)
+                    return count
+            parameter.value = original
+        return 0
+
+    def _cap_count(self, scenario: Scenario, count: int):
+        '''Search disruption count up to the number of targets, within the configured range if any.'''
+        for parameter in scenario.parameters:
+            if parameter.name != COUNT_PARAMETERS.get(scenario.name):
+                continue
+            if not isinstance(parameter, NumericParameter):
+                continue
+            parameter_range = self.config.parameter_ranges.get(parameter.name)
+            if parameter_range is not None and parameter_range.max is not None:
+                max_value = min(parameter_range.max, count)
+            else:
+                max_value = count
+            parameter.max_value = max(max_value, parameter.min_value)
+            parameter.value = parameter.clamp(parameter.value)
@@ -0,0 +1,309 @@
+'''
+Coordinator handing out scenarios to remote runner agents.
+
+Agents (see agent.py) are bound to their own cluster and Prometheus, and pull
+work from the coordinator over a small JSON over HTTP protocol:
+
+    GET  /config     Config of the run, used by agents without a config file
+    POST /lease      {"agent"} -> {"task": {...} or null, "finished": bool}
+    POST /heartbeat  {"agent", "task_id"} -> {"ok": bool}, extends the lease
+    POST /result     {"agent", "task_id", "result"} -> {"ok": bool}
+    GET  /status     Connected agents and queued tasks
+
+Idle agents pull the next task, so faster clusters naturally take more work.
+A task whose lease is not extended in time (agent crashed or lost network) is
+queued again, and reported as failed once it was lost max_attempts times.
+'''
+
+import json
+import time
+import queue
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from chaos_ai.models.app import CommandRunResult, auto_id
+from chaos_ai.models.base_scenario import BaseScenario, ScenarioFactory
+from chaos_ai.models.config import ConfigFile, HealthCheckResult
+from chaos_ai.models.health_check_samples import HealthCheckSamples
+from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.metrics import REGISTRY
+
+logger = get_module_logger(__name__)
+
+DEFAULT_PORT = 8765
+DEFAULT_LEASE_TIMEOUT = 60  # in seconds
+DEFAULT_MAX_ATTEMPTS = 3
+
+CONNECTED_AGENTS = REGISTRY.gauge("chaos_ai_agents", "Agents seen within the lease timeout.")
+QUEUED_TASKS = REGISTRY.gauge("chaos_ai_queued_tasks", "Scenarios waiting for an agent.")
+LOST_TASKS = REGISTRY.counter(
+    "chaos_ai_lost_tasks", "Scenarios queued again after their agent stopped responding."
+)
+
+
+class Task:
+    def __init__(self, scenario: BaseScenario, generation_id: int, index: int, results: "queue.Queue"):
+        self.task_id = next(auto_id)
+        # Scenario ID is assigned here, so that IDs are unique across agents
+        self.scenario_id = self.task_id
+        self.scenario = scenario
+        self.generation_id = generation_id
+        self.index = index  # Position in the evaluated batch
+        self.results = results  # Queue of the batch the task belongs to
+        self.attempts = 0
+        self.agent: Optional[str] = None
+        self.lease_expires = 0.0
+        self.done = False
+
+    def to_dict(self) -> Dict:
+        return {
+            "task_id": self.task_id,
+            "scenario_id": self.scenario_id,
+            "generation_id": self.generation_id,
+            "scenario": ScenarioFactory.to_dict(self.scenario),
+        }
+
+
+class AgentState:
+    def __init__(self, name: str):
+        self.name = name
+        self.last_seen = time.time()
+        self.task_id: Optional[int] = None
+        self.completed = 0
+        self.notified = False  # Told that the run is finished
+
+
+class Coordinator:
+    def __init__(
+        self,
+        config: ConfigFile,
+        port: int = DEFAULT_PORT,
+        host: str = "0.0.0.0",
+        lease_timeout: int = DEFAULT_LEASE_TIMEOUT,
+        max_attempts: int = DEFAULT_MAX_ATTEMPTS,
+    ):
+        self.config = config
+        self.host = host
+        self.port = port
+        self.lease_timeout = lease_timeout
+        self.max_attempts = max_attempts
+        self.finished = False
+
+        self._lock = threading.Lock()
+        self._pending: deque = deque()
+        self._leased: Dict[int, Task] = {}
+        self._agents: Dict[str, AgentState] = {}
+        self._server: Optional[ThreadingHTTPServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        coordinator = self
+
+        class CoordinatorHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path == "/config":
+                    self._reply(coordinator.config.model_dump(mode='json', by_alias=True))
+                elif self.path == "/status":
+                    self._reply(coordinator.status())
+                else:
+                    self.send_error(404)
+
+            def do_POST(self):
+                routes = {
+                    "/lease": coordinator.lease,
+                    "/heartbeat": coordinator.heartbeat,
+                    "/result": coordinator.complete,
+                }
+                if self.path not in routes:
+                    self.send_error(404)
+                    return
+                try:
+                    length = int(self.headers.get("Content-Length", 0))
+                    payload = json.loads(self.rfile.read(length))
+                    self._reply(routes[self.path](payload))
+                except Exception as error:
+                    logger.error("Invalid %s request: %s", self.path, error)
+                    self.send_error(400, str(error))
+
+            def _reply(self, data: Dict):
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                logger.debug("Coordinator request: " + format, *args)
+
+        self._server = ThreadingHTTPServer((self.host, self.port), CoordinatorHandler)
+        self._server.daemon_threads = True
+        # Port 0 picks a free port
+        self.port = self._server.server_address[1]
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        logger.info("Coordinator waiting for agents on %s:%d", self.host, self.port)
+
+    def stop(self, grace_period: float = 10):
+        '''Tell agents that the run is finished and stop serving.'''
+        self.finished = True
+        # Agents learn that the run is finished on their next lease request
+        deadline = time.time() + grace_period
+        while time.time() < deadline:
+            with self._lock:
+                now = time.time()
+                if all(
+                    agent.notified or now - agent.last_seen >= self.lease_timeout
+                    for agent in self._agents.values()
+                ):
+                    break
+            time.sleep(0.5)
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def _seen(self, name: str) -> AgentState:
+        agent = self._agents.get(name)
+        if agent is None:
+            logger.info("Agent %s connected", name)
+            agent = self._agents[name] = AgentState(name)
+        agent.last_seen = time.time()
+        return agent
+
+    def lease(self, payload: Dict) -> Dict:
+        with self._lock:
+            agent = self._seen(payload["agent"])
+            self._expire_leases()
+            if len(self._pending) == 0:
+                agent.task_id = None
+                agent.notified = self.finished
+                return {"task": None, "finished": self.finished}
+
+            task = self._pending.popleft()
+            task.attempts += 1
+            task.agent = agent.name
+            task.lease_expires = time.time() + self.lease_timeout
+            self._leased[task.task_id] = task
+            agent.task_id = task.task_id
+            QUEUED_TASKS.set(len(self._pending))
+        logger.info("Scenario %s leased to agent %s (attempt %d)", task.scenario, agent.name, task.attempts)
+        return {"task": task.to_dict(), "finished": False, "lease_timeout": self.lease_timeout}
+
+    def heartbeat(self, payload: Dict) -> Dict:
+        with self._lock:
+            self._seen(payload["agent"])
+            task = self._leased.get(payload.get("task_id"))
+            if task is None or task.agent != payload["agent"]:
+                # Lease expired and was handed to another agent
+                return {"ok": False}
+            task.lease_expires = time.time() + self.lease_timeout
+            return {"ok": True}
+
+    def complete(self, payload: Dict) -> Dict:
+        with self._lock:
+            agent = self._seen(payload["agent"])
+            agent.task_id = None
+            task = self._leased.pop(payload["task_id"], None)
+            if task is None:
+                # Late result of a task that was already completed by another agent
+                for pending in self._pending:
+                    if pending.task_id == payload["task_id"]:
+                        task = pending
+                        self._pending.remove(pending)
+                        QUEUED_TASKS.set(len(self._pending))
+                        break
+            if task is None or task.done:
+                return {"ok": False}
+            task.done = True
+            agent.completed += 1
+
+        result = self._parse_result(task, payload["result"])
+        task.results.put((task.index, result))
+        return {"ok": True}
+
+    def _parse_result(self, task: Task, data: Dict) -> CommandRunResult:
+        # Scenario is restored from the task, health check samples from their serialized results
+        health_check_results = {
+            url: [HealthCheckResult(**item) for item in items]
+            for url, items in data.get("health_check_results", {}).items()
+        }
+        return CommandRunResult(**{
+            **data,
+            "scenario": task.scenario,
+            "health_check_samples": HealthCheckSamples.from_results(
+                health_check_results, self.config.health_checks.max_samples
+            ),
+        })
+
+    def _expire_leases(self):
+        '''Queue tasks of unresponsive agents again, fail them after max_attempts. Called with lock held.'''
+        now = time.time()
+        for task in list(self._leased.values()):
+            if task.lease_expires > now:
+                continue
+            del self._leased[task.task_id]
+            LOST_TASKS.inc()
+            if task.attempts >= self.max_attempts:
+                logger.error("Scenario %s lost %d times, giving up", task.scenario, task.attempts)
+                task.done = True
+                task.results.put((task.index, CommandRunResult.not_run(
+                    task.scenario,
+                    task.generation_id,
+                    f"Scenario was lost by {task.attempts} agents",
+                    scenario_id=task.scenario_id,
+                )))
+            else:
+                logger.warning("Agent %s stopped responding, queueing scenario %s again", task.agent, task.scenario)
+                # Retried before other queued scenarios
+                self._pending.appendleft(task)
+        CONNECTED_AGENTS.set(len([
+            agent for agent in self._agents.values() if now - agent.last_seen < self.lease_timeout
+        ]))
+        QUEUED_TASKS.set(len(self._pending))
+
+    def evaluate(self, scenarios: List[BaseScenario], generation_id: int) -> Iterator[Tuple[int, CommandRunResult]]:
+        '''Queue scenarios for agents, yields (index, result) in order of completion.'''
+        results: "queue.Queue[Tuple[int, CommandRunResult]]" = queue.Queue()
+        with self._lock:
+            for index, scenario in enumerate(scenarios):
+                self._pending.append(Task(scenario, generation_id, index, results))
+            QUEUED_TASKS.set(len(self._pending))
+
+        waiting_since = time.time()
+        for _ in range(len(scenarios)):
+            while True:
+                try:
+                    yield results.get(timeout=1)
+                    waiting_since = time.time()
+                    break
+                except queue.Empty:
+                    with self._lock:
+                        self._expire_leases()
+                    if time.time() - waiting_since >= self.lease_timeout:
+                        logger.warning("Waiting for agents: %s", self.describe())
+                        waiting_since = time.time()
+
+    def status(self) -> Dict:
+        with self._lock:
+            now = time.time()
+            return {
+                "finished": self.finished,
+                "queued": len(self._pending),
+                "leased": len(self._leased),
+                "agents": [
+                    {
+                        "name": agent.name,
+                        "last_seen": round(now - agent.last_seen, 1),
+                        "task_id": agent.task_id,
+                        "completed": agent.completed,
+                    }
+                    for agent in self._agents.values()
+                ],
+            }
+
+    def describe(self) -> str:
+        status = self.status()
+        return "%d queued, %d running, %d agents" % (status["queued"], status["leased"], len(status["agents"]))
@@ -0,0 +1,142 @@
+'''
+This module samples fitness function queries periodically while a scenario is running.
+
+Working Details:
+1. A background thread evaluates every fitness query on a fixed interval against [start, now].
+2. Each sample is kept in a running series per fitness item, along with the overall score.
+3. If the overall score crosses the configured threshold, or stays unchanged for a
+   configured number of samples, the running krkn process is terminated early.
+4. Once the scenario finishes, one final sample at the end timestamp becomes the fitness result.
+'''
+
+import datetime
+import threading
+import contextvars
+from typing import Callable, List, Optional
+
+from chaos_ai.models.app import FitnessResult, FitnessSample, FitnessScoreResult
+from chaos_ai.models.config import FitnessFunction, FitnessFunctionItem, HEALTH_CHECK_FITNESS_TYPES
+from chaos_ai.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+
+class FitnessSampler:
+    def __init__(
+        self,
+        fitness_function: FitnessFunction,
+        calculate_fitness_value: Callable,
+        start: datetime.datetime,
+        on_sample: Callable[[FitnessResult], None] = None,
+    ):
+        self.fitness_function = fitness_function
+        self.calculate_fitness_value = calculate_fitness_value
+        self.start = start
+        self.on_sample = on_sample
+
+        # Top-level fitness query is sampled as a single unweighted item
+        if fitness_function.query is not None:
+            self.items = [FitnessFunctionItem(
+                id=0,
+                query=fitness_function.query,
+                type=fitness_function.type,
+            )]
+        else:
+            # Health check based items are computed once scenario completes
+            self.items = [
+                item for item in fitness_function.items
+                if item.type not in HEALTH_CHECK_FITNESS_TYPES
+            ]
+
+        self.result = FitnessResult(
+            scores=[
+                FitnessScoreResult(id=item.id, fitness_score=0.0, weighted_score=0.0)
+                for item in self.items
+            ]
+        )
+        self._process = None
+        self._stop_event = threading.Event()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def attach(self, process):
+        '''Keep track of running krkn process so that it can be stopped early.'''
+        self._process = process
+        # Scenario could have been finished before process was started
+        if self.result.early_stopped:
+            self._terminate()
+
+    def run(self):
+        if len(self.items) == 0:
+            return
+        logger.debug("Starting fitness sampler with %ds interval", self.fitness_function.sampling.interval)
+        # Run in caller's context, so that sampler logs are routed with the scenario
+        self._thread = threading.Thread(
+            target=contextvars.copy_context().run,
+            args=(self._sample_loop,),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def stop(self, end: datetime.datetime) -> FitnessResult:
+        '''Stop sampling and record final fitness value at the end of the scenario.'''
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.sample(end)
+        return self.result
+
+    def _sample_loop(self):
+        interval = self.fitness_function.sampling.interval
+        while not self._stop_event.wait(interval):
+            try:
+                self.sample(datetime.datetime.now())
+            except Exception as error:
+                logger.warning("Unable to sample fitness function: %s", error)
+                continue
+
+            if self.on_sample is not None:
+                self.on_sample(self.result)
+
+            if self.should_stop():
+                logger.info("Fitness score %f is final, stopping scenario early.", self.result.fitness_score)
+                with self._lock:
+                    self.result.early_stopped = True
+                self._terminate()
+                break
+
+    def sample(self, timestamp: datetime.datetime):
+        '''Evaluate all fitness items for time range [start, timestamp].'''
+        overall_score = 0.0
+        for item, score in zip(self.items, self.result.scores):
+            raw_score = self.calculate_fitness_value(
+                start=self.start,
+                end=timestamp,
+                query=item.query,
+                fitness_type=item.type
+            )
+            with self._lock:
+                score.fitness_score = raw_score
+                score.weighted_score = item.weight * raw_score
+                score.samples.append(FitnessSample(timestamp=timestamp, value=raw_score))
+            overall_score += score.weighted_score
+
+        with self._lock:
+            self.result.fitness_score = overall_score
+            self.result.samples.append(FitnessSample(timestamp=timestamp, value=overall_score))
+
+    def should_stop(self) -> bool:
+        sampling = self.fitness_function.sampling
+        if sampling.threshold is not None and self.result.fitness_score >= sampling.threshold:
+            return True
+
+        if sampling.saturation_samples > 0:
+            recent: List[FitnessSample] = self.result.samples[-(sampling.saturation_samples + 1):]
+            if len(recent) > sampling.saturation_samples:
+                latest = recent[-1].value
+                return all(abs(x.value - latest) <= sampling.saturation_tolerance for x in recent)
+        return False
+
+    def _terminate(self):
+        if self._process is not None and self._process.poll() is None:
+            self._process.terminate()
@@ -0,0 +1,110 @@
+'''
+Fitness functions computed locally from health check samples.
+
+These do not require Prometheus, and measure user facing impact of a scenario:
+- failure_ratio: Fraction of failed probes.
+- outage_streak: Longest continuous outage in seconds.
+- latency_degradation: Relative increase of latency percentile over the baseline, either
+  configured on the item or measured by the watcher during steady state.
+- time_to_recover: Seconds between first failure and the final recovery.
+
+When multiple applications are evaluated, failure ratio is computed over all
+probes and the other functions take the worst application.
+'''
+
+from typing import Dict, List, Optional
+
+import numpy as np
+
+from chaos_ai.models.config import FitnessFunctionItem, FitnessFunctionType
+from chaos_ai.models.health_check_samples import HealthCheckBaseline, HealthCheckSamples, HealthCheckSeries
+
+
+def select_series(item: FitnessFunctionItem, samples: HealthCheckSamples) -> List[HealthCheckSeries]:
+    return [
+        series for series in samples
+        if len(series) > 0 and (item.application is None or series.name == item.application)
+    ]
+
+
+def failure_ratio(series_list: List[HealthCheckSeries]) -> float:
+    total = sum(len(series) for series in series_list)
+    if total == 0:
+        return 0.0
+    failures = sum(int(np.count_nonzero(~series.success)) for series in series_list)
+    return failures / total
+
+
+def _outages(series: HealthCheckSeries):
+    '''
+    Yields (start, end) timestamps of each continuous run of failed probes.
+    An outage ends at the next successful probe, or one interval after the
+    last probe when the application did not recover.
+    '''
+    success = series.success
+    timestamps = series.timestamps
+    interval = series.expected_interval or 0.0
+
+    # Find boundaries where success state flips
+    failed = np.concatenate(([False], ~success, [False])).astype(np.int8)
+    edges = np.diff(failed)
+    starts = np.flatnonzero(edges == 1)
+    ends = np.flatnonzero(edges == -1)
+    for start, end in zip(starts, ends):
+        if end < len(timestamps):
+            yield timestamps[start], timestamps[end]
+        else:
+            yield timestamps[start], timestamps[-1] + interval
+
+
+def outage_streak(series_list: List[HealthCheckSeries]) -> float:
+    longest = 0.0
+    for series in series_list:
+        for start, end in _outages(series):
+            longest = max(longest, float(end - start))
+    return longest
+
+
+def time_to_recover(series_list: List[HealthCheckSeries]) -> float:
+    worst = 0.0
+    for series in series_list:
+        outages = list(_outages(series))
+        if len(outages) > 0:
+            worst = max(worst, float(outages[-1][1] - outages[0][0]))
+    return worst
+
+
+def latency_degradation(
+    series_list: List[HealthCheckSeries],
+    percentile: float,
+    baseline: Optional[float],
+    baselines: Optional[Dict[str, HealthCheckBaseline]] = None,
+) -> float:
+    worst = 0.0
+    for series in series_list:
+        expected = baseline
+        if expected is None and baselines is not None and series.url in baselines:
+            expected = baselines[series.url].percentile(percentile)
+        if expected is None or expected <= 0:
+            continue
+        latency = series.latency_histogram().percentile(percentile)
+        worst = max(worst, (latency - expected) / expected)
+    return worst
+
+
+def calculate_health_check_fitness(
+    item: FitnessFunctionItem,
+    samples: HealthCheckSamples,
+    baselines: Optional[Dict[str, HealthCheckBaseline]] = None,
+) -> float:
+    '''Calculate fitness value for a health check based fitness function item.'''
+    series_list = select_series(item, samples)
+    if item.type == FitnessFunctionType.failure_ratio:
+        return failure_ratio(series_list)
+    elif item.type == FitnessFunctionType.outage_streak:
+        return outage_streak(series_list)
+    elif item.type == FitnessFunctionType.latency_degradation:
+        return latency_degradation(series_list, item.percentile, item.baseline, baselines)
+    elif item.type == FitnessFunctionType.time_to_recover:
+        return time_to_recover(series_list)
+    raise NotImplementedError(f"Unsupported health check fitness type: {item.type}")
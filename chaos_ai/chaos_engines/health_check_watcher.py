@@ -2,87 +2,223 @@
 This module is used to run health checks for the application URLs and keep track of the results.
 
 Working Details:
-1. Asynchronous health check for each URL.
-2. Keep track of the results in a list.
-3. Once there is signal from main thread that the test is complete, or in case the api status check fails, then the watcher stops.
-4. Return the results to the main thread by seperate method.
+1. A single background thread runs an event loop that probes every URL concurrently.
+   Probes follow a fixed-rate schedule, slots missed while a probe is still running are counted.
+2. Probes share a bounded, keep-alive connection pool with per-host concurrency limits.
+3. Connection setup and pool wait time are measured separately from server latency.
+4. The watcher can span a whole run, each scenario opens a window to get its own slice of samples.
+5. Samples collected outside of scenario windows (and after a cooldown) form the steady state baseline.
+6. Once there is signal from main thread that the test is complete, the watcher stops. With stop_watcher_on_failure,
+   probing stops after a failed probe within a scenario window and resumes once the next window begins.
+7. Return the results to the main thread by seperate method.
 '''
 
-from collections import defaultdict
-import threading
 import time
-import requests
-from typing import List, Dict
+import asyncio
+import threading
+from types import SimpleNamespace
+from typing import List, Dict, Optional
+
+import aiohttp
 
 from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.metrics import REGISTRY
 from chaos_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig, HealthCheckResult
+from chaos_ai.models.health_check_samples import HealthCheckBaseline, HealthCheckSamples
 
 logger = get_module_logger(__name__)
 
+PROBES = REGISTRY.counter(
+    "chaos_ai_health_check_probes", "Health check probes sent.", ["application", "result"]
+)
+PROBE_RESPONSE_TIME = REGISTRY.histogram(
+    "chaos_ai_health_check_response_time_seconds", "Health check response time.", ["application"]
+)
+MISSED_SLOTS = REGISTRY.counter(
+    "chaos_ai_health_check_missed_slots", "Scheduled health check probes skipped.", ["application"]
+)
+
+
 class HealthCheckWatcher:
     def __init__(self, config: HealthCheckConfig):
         self.config = config
         self._stop_event = threading.Event()
-        self._threads: List[threading.Thread] = []
-        # Each thread stores results in its own list - ZERO contention!
-        self._thread_results = {}
+        self._thread: Optional[threading.Thread] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._async_stop_event: Optional[asyncio.Event] = None
+        # Samples are only appended from the event loop thread
+        self._samples = HealthCheckSamples(capacity=config.max_samples)
+        self._baselines: Dict[str, HealthCheckBaseline] = {}
+        self._window_lock = threading.Lock()
+        self._active_windows = 0
+        self._last_window_end = float('-inf')
+        self._window_failed = False  # A probe failed within the current window, see stop_watcher_on_failure
 
     def run(self):
-        # Start a thread for each health check
+        # Start a single event loop thread for all health checks
         logger.debug(f"Starting health check watcher for {len(self.config.applications)} applications")
-        for health_check in self.config.applications:
-            t = threading.Thread(target=self.run_health_check, args=(health_check,))
-            t.start()
-            self._threads.append(t)
-
-    def run_health_check(self, health_check: HealthCheckApplicationConfig):
-        # Each thread gets its own private results list
-        thread_id = threading.current_thread().ident
-        thread_results = []
-        self._thread_results[thread_id] = (health_check.url, thread_results)
-        
-        # Simple polling loop, stops when stop() is called
-        while not self._stop_event.is_set():
+        started = threading.Event()
+        self._thread = threading.Thread(target=self._run_event_loop, args=(started,), daemon=True)
+        self._thread.start()
+        started.wait()
+
+    def _run_event_loop(self, started: threading.Event):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._async_stop_event = asyncio.Event()
+        started.set()
+        try:
+            self._loop.run_until_complete(self._watch())
+        finally:
+            self._loop.close()
+
+    async def _watch(self):
+        if self._stop_event.is_set():
+            return
+        connector = aiohttp.TCPConnector(
+            limit=self.config.max_connections,
+            limit_per_host=self.config.max_connections_per_host,
+            keepalive_timeout=self.config.keepalive_timeout,
+        )
+        async with aiohttp.ClientSession(
+            connector=connector,
+            trace_configs=[self._probe_overhead_trace()],
+        ) as session:
+            await asyncio.gather(*[
+                self.run_health_check(session, health_check)
+                for health_check in self.config.applications
+            ])
+
+    def _probe_overhead_trace(self) -> aiohttp.TraceConfig:
+        '''
+        Track time spent waiting for a pooled connection and establishing
+        a new one (DNS, TCP, TLS), so that it is not counted as server latency.
+        '''
+        async def on_start(session, trace_config_ctx, params):
+            trace_config_ctx.start = asyncio.get_running_loop().time()
+
+        async def on_end(session, trace_config_ctx, params):
+            probe = trace_config_ctx.trace_request_ctx
+            probe.overhead += asyncio.get_running_loop().time() - trace_config_ctx.start
+
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(on_start)
+        trace_config.on_connection_queued_end.append(on_end)
+        trace_config.on_connection_create_start.append(on_start)
+        trace_config.on_connection_create_end.append(on_end)
+        return trace_config
+
+    async def run_health_check(self, session: aiohttp.ClientSession, health_check: HealthCheckApplicationConfig):
+        series = self._samples.series(health_check.name, health_check.url, health_check.interval)
+        baseline = self._baselines.setdefault(
+            health_check.url,
+            HealthCheckBaseline(health_check.name, health_check.url)
+        )
+        timeout = aiohttp.ClientTimeout(total=health_check.timeout)
+        loop = asyncio.get_running_loop()
+        deadline = loop.time()
+
+        # Fixed-rate polling loop, stops when stop() is called
+        while not self._async_stop_event.is_set():
+            if self._window_failed and self._active_windows > 0:
+                # Probing is stopped for the rest of the window, schedule restarts with the next one
+                deadline = loop.time()
+                try:
+                    await asyncio.wait_for(self._async_stop_event.wait(), timeout=health_check.interval)
+                except asyncio.TimeoutError:
+                    pass
+                continue
+
+            probe = SimpleNamespace(overhead=0.0)
+            timestamp = time.monotonic()
+            start = loop.time()
             try:
-                resp = requests.get(health_check.url, timeout=health_check.timeout)
-                status = resp.status_code
-                success = (status == 200)
+                async with session.get(health_check.url, timeout=timeout, trace_request_ctx=probe) as resp:
+                    elapsed = loop.time() - start
+                    # Drain body so that connection is returned to the pool
+                    await resp.read()
+                status = resp.status
+                success = (status == health_check.status_code)
                 error = None
             except Exception as e:
                 status = -1
                 success = False
-                resp = None
-                error = str(e)
+                # Time waited for the failed probe, about the timeout when the server does not answer,
+                # so that the slowest probes still reach latency percentiles
+                elapsed = loop.time() - start
+                error = str(e) or type(e).__name__
 
-            result = HealthCheckResult(
-                name=health_check.name,
+            response_time = max(elapsed - probe.overhead, 0.0)
+            series.append(
+                timestamp,
                 status_code=status,
                 success=success,
                 error=error,
-                response_time=resp.elapsed.total_seconds() if resp is not None else -1
+                response_time=response_time,
+                probe_overhead=probe.overhead,
             )
-            
-            # Store in thread-private list - NO LOCKS, NO CONTENTION!
-            thread_results.append(result)
+            PROBES.inc(application=health_check.name, result="success" if success else "failure")
+            PROBE_RESPONSE_TIME.observe(response_time, application=health_check.name)
+            if self._is_quiet(timestamp):
+                baseline.record(response_time, success, health_check.interval)
+
+            if not success and self.config.stop_watcher_on_failure and self._active_windows > 0:
+                self._window_failed = True
+
+            # Schedule next probe relative to the previous deadline rather than
+            # completion time, so that slow responses do not reduce probe rate
+            deadline += health_check.interval
+            now = loop.time()
+            if now > deadline:
+                missed = int((now - deadline) // health_check.interval) + 1
+                series.add_missed_slots(missed)
+                MISSED_SLOTS.inc(missed, application=health_check.name)
+                deadline += missed * health_check.interval
+
+            try:
+                await asyncio.wait_for(self._async_stop_event.wait(), timeout=deadline - now)
+            except asyncio.TimeoutError:
+                pass
+
+    def _is_quiet(self, timestamp: float) -> bool:
+        '''Whether no scenario is running or recovering at given monotonic timestamp.'''
+        return self._active_windows == 0 and timestamp >= self._last_window_end + self.config.baseline_cooldown
+
+    def begin_window(self) -> float:
+        '''Mark start of a scenario, returns monotonic start timestamp of the window.'''
+        with self._window_lock:
+            self._active_windows += 1
+            self._window_failed = False
+        return time.monotonic()
 
-            if not success and self.config.stop_watcher_on_failure:
-                self._stop_event.set()
-                break
+    def end_window(self, start: float) -> HealthCheckSamples:
+        '''Mark end of a scenario and return samples collected during its window.'''
+        end = time.monotonic()
+        with self._window_lock:
+            self._active_windows = max(self._active_windows - 1, 0)
+            self._last_window_end = max(self._last_window_end, end)
+        return self._samples.slice(start, end)
 
-            time.sleep(health_check.interval)
+    def get_baselines(self) -> Dict[str, HealthCheckBaseline]:
+        '''Steady state baseline for each health check keyed by URL.'''
+        return dict(self._baselines)
 
     def stop(self):
         logger.info(f"Stopping health check watcher")
         self._stop_event.set()
-        for t in self._threads:
-            t.join()
+        if self._loop is not None and not self._loop.is_closed():
+            try:
+                self._loop.call_soon_threadsafe(self._async_stop_event.set)
+            except RuntimeError:
+                # Event loop already finished
+                pass
+        if self._thread is not None:
+            self._thread.join()
+
+    def get_samples(self) -> HealthCheckSamples:
+        """Columnar samples from all health checks - called after watcher completes"""
+        return self._samples
 
     def get_results(self) -> Dict[str, List[HealthCheckResult]]:
-        """Aggregate results from all threads - called after threads complete"""
-        results = defaultdict(list)
-        
-        # Each thread has its own URL and results list
-        for url, thread_results in self._thread_results.values():
-            results[url].extend(thread_results)
-                
-        return dict(results)
+        """Aggregate results from all health checks - called after watcher completes"""
+        return self._samples.to_results()
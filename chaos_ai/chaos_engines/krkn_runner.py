@@ -1,13 +1,17 @@
 import os
 import json
+import time
 import random
 import datetime
 import tempfile
+from typing import Callable, Dict, List
 
-from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
+from chaos_ai.chaos_engines.fitness_sampler import FitnessSampler
+from chaos_ai.chaos_engines.health_check_fitness import calculate_health_check_fitness
 from chaos_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
-from chaos_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType
-from chaos_ai.models.config import ConfigFile, FitnessFunctionType
+from chaos_ai.models.app import CommandRunResult, FitnessResult, FitnessScoreResult, KrknRunnerType, auto_id
+from chaos_ai.models.config import ConfigFile, FitnessFunctionItem, FitnessFunctionType, HEALTH_CHECK_FITNESS_TYPES
+from chaos_ai.models.health_check_samples import HealthCheckBaseline, HealthCheckSamples
 from chaos_ai.models.base_scenario import (
     Scenario,
     BaseScenario,
@@ -17,7 +21,9 @@ from chaos_ai.models.base_scenario import (
 )
 from chaos_ai.utils import run_shell
 from chaos_ai.utils.fs import env_is_truthy
-from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.logger import get_module_logger, scenario_logging
+from chaos_ai.utils.metrics import REGISTRY
+from chaos_ai.utils.tracing import SpanRecorder, recording, span
 
 logger = get_module_logger(__name__)
 
@@ -31,6 +37,20 @@ KRKNCTL_GRAPH_RUN_TEMPLATE = "krknctl graph run {path} --kubeconfig {kubeconfig}
 
 KRKN_HUB_FAILURE_SCORE = 5
 
+SCENARIO_RUNS = REGISTRY.counter("chaos_ai_scenario_runs", "Scenarios run by krkn.", ["returncode"])
+SCENARIO_DURATION = REGISTRY.histogram(
+    "chaos_ai_scenario_duration_seconds",
+    "Wall time of a scenario run, including fitness calculation.",
+    buckets=(10, 30, 60, 120, 300, 600, 1200, 1800, 3600),
+)
+RUNNING_SCENARIOS = REGISTRY.gauge("chaos_ai_running_scenarios", "Scenarios currently being run.")
+FITNESS_QUERY_DURATION = REGISTRY.histogram(
+    "chaos_ai_fitness_query_duration_seconds", "Latency of Prometheus fitness queries.", ["type"]
+)
+FITNESS_QUERY_ERRORS = REGISTRY.counter(
+    "chaos_ai_fitness_query_errors", "Failed Prometheus fitness queries.", ["type"]
+)
+
 
 class KrknRunner:
     def __init__(
@@ -38,10 +58,17 @@ class KrknRunner:
         config: ConfigFile,
         output_dir: str,
         runner_type: KrknRunnerType = None,
+        health_check_watcher: HealthCheckWatcher = None,
+        prometheus_url: str = None,
     ):
         self.config = config
-        self.prom_client = self.__connect_prom_client()
+        # Prometheus of the cluster, PROMETHEUS_URL or the cluster's thanos route otherwise
+        self.prometheus_url = prometheus_url
+        # Long-lived watcher shared across runs, a new watcher is started for each run otherwise
+        self.health_check_watcher = health_check_watcher
+        self._prom_client = None
         self.output_dir = output_dir
+        self._instant_query_cache = {}
         if runner_type is None:
             self.runner_type = self.__check_runner_availability()
         else:
@@ -74,22 +101,66 @@ class KrknRunner:
             logger.debug("Using krknhub as runner.")
             return KrknRunnerType.HUB_RUNNER
 
-    def run(self, scenario: BaseScenario, generation_id: int) -> CommandRunResult:
+    def run(
+        self,
+        scenario: BaseScenario,
+        generation_id: int,
+        on_partial_fitness: Callable[[FitnessResult], None] = None,
+        scenario_id: int = None,
+    ) -> CommandRunResult:
+        # Scenario ID is assigned upfront, so that logs of the run are routed to its log file.
+        # Remote runs get their ID from the coordinator, so that IDs are unique across agents
+        if scenario_id is None:
+            scenario_id = next(auto_id)
+        started = time.monotonic()
+        RUNNING_SCENARIOS.inc()
+        recorder = SpanRecorder(scenario_id=scenario_id)
+        try:
+            with scenario_logging(scenario_id), recording(recorder):
+                with span("krkn_runner.run", generation_id=generation_id):
+                    result = self._run(scenario, scenario_id, generation_id, on_partial_fitness)
+        finally:
+            RUNNING_SCENARIOS.dec()
+        result.spans = recorder.spans
+        SCENARIO_RUNS.inc(returncode=result.returncode)
+        SCENARIO_DURATION.observe(time.monotonic() - started)
+        return result
+
+    def _run(
+        self,
+        scenario: BaseScenario,
+        scenario_id: int,
+        generation_id: int,
+        on_partial_fitness: Callable[[FitnessResult], None] = None,
+    ) -> CommandRunResult:
         logger.debug("Running scenario %s", scenario)
 
         start_time = datetime.datetime.now()
+        # Instant query results are only reused within a single run
+        self._instant_query_cache = {}
 
         # Generate command krkn executor command
         log, returncode = None, None
         command = ""
-        if isinstance(scenario, CompositeScenario):
-            command = self.graph_command(scenario)
-        elif isinstance(scenario, Scenario):
-            command = self.runner_command(scenario)
-        else:
-            raise NotImplementedError("Scenario unable to run")
-
-        health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+        with span("build_command"):
+            if isinstance(scenario, CompositeScenario):
+                command = self.graph_command(scenario)
+            elif isinstance(scenario, Scenario):
+                command = self.runner_command(scenario)
+            else:
+                raise NotImplementedError("Scenario unable to run")
+
+        health_check_baselines = None
+        health_check_samples = HealthCheckSamples()
+
+        fitness_sampler = None
+        if self.config.fitness_function.sampling.enabled:
+            fitness_sampler = FitnessSampler(
+                self.config.fitness_function,
+                self.calculate_fitness_value,
+                start=start_time,
+                on_sample=on_partial_fitness,
+            )
 
         # Run command and fetch result
         if env_is_truthy('MOCK_RUN'):
@@ -99,21 +170,59 @@ class KrknRunner:
             # TODO: How to capture logs from composite run scenario
             
             # Start watching application urls for health checks
-            health_check_watcher.run()
+            with span("health_check_start"):
+                if self.health_check_watcher is not None:
+                    window_start = self.health_check_watcher.begin_window()
+                else:
+                    health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+                    health_check_watcher.run()
+
+            if fitness_sampler is not None:
+                fitness_sampler.run()
 
             # Run command
-            log, returncode = run_shell(command)
+            with span("krkn_run"):
+                log, returncode = run_shell(
+                    command,
+                    on_start=fitness_sampler.attach if fitness_sampler is not None else None
+                )
             
             # Stop watching application urls for health checks
-            health_check_watcher.stop()
+            with span("health_check_stop"):
+                if self.health_check_watcher is not None:
+                    health_check_samples = self.health_check_watcher.end_window(window_start)
+                    health_check_baselines = self.health_check_watcher.get_baselines()
+                else:
+                    health_check_watcher.stop()
+                    health_check_samples = health_check_watcher.get_samples()
 
         end_time = datetime.datetime.now()
 
         # calculate fitness scores
         fitness_result: FitnessResult = FitnessResult()
 
+        if fitness_sampler is not None:
+            # Final sample of the running series is the fitness result
+            with span("fitness_sampler_stop"):
+                fitness_result = fitness_sampler.stop(end_time)
+            if self.config.fitness_function.query is not None:
+                fitness_result.scores = []
+            else:
+                # Health check items are not sampled, since they don't query Prometheus
+                health_check_result = self.calculate_fitness_score_for_items(
+                    start=start_time,
+                    end=end_time,
+                    health_check_samples=health_check_samples,
+                    health_check_baselines=health_check_baselines,
+                    items=[
+                        item for item in self.config.fitness_function.items
+                        if item.type in HEALTH_CHECK_FITNESS_TYPES
+                    ]
+                )
+                fitness_result.scores.extend(health_check_result.scores)
+                fitness_result.fitness_score += health_check_result.fitness_score
         # If user provided fitness_function.query, then we use the default function to calculate
-        if self.config.fitness_function.query is not None:
+        elif self.config.fitness_function.query is not None:
             fitness_value = self.calculate_fitness_value(
                 start=start_time,
                 end=end_time,
@@ -126,7 +235,9 @@ class KrknRunner:
         elif len(self.config.fitness_function.items) > 0:
             fitness_result = self.calculate_fitness_score_for_items(
                 start=start_time,
-                end=end_time
+                end=end_time,
+                health_check_samples=health_check_samples,
+                health_check_baselines=health_check_baselines,
             )
 
         # Include krkn hub run failure info to the fitness score
@@ -136,6 +247,7 @@ class KrknRunner:
                 fitness_result.fitness_score += KRKN_HUB_FAILURE_SCORE
 
         return CommandRunResult(
+            scenario_id=scenario_id,
             generation_id=generation_id,
             scenario=scenario,
             cmd=command,
@@ -144,7 +256,7 @@ class KrknRunner:
             start_time=start_time,
             end_time=end_time,
             fitness_result=fitness_result,
-            health_check_results=health_check_watcher.get_results()
+            health_check_samples=health_check_samples
         )
 
     def runner_command(self, scenario: Scenario):
@@ -186,7 +298,7 @@ class KrknRunner:
         # Create JSON for krknctl graph runner
         scenario_json = self.__expand_composite_json(scenario)
         json_file = tempfile.mktemp(suffix=".json", dir=graph_json_directory)
-        with open(json_file, "w", encoding="utf-8") as f:
+        with span("write_graph_json"), open(json_file, "w", encoding="utf-8") as f:
             json.dump(scenario_json, f, ensure_ascii=False, indent=4)
         logger.info("Created scenario json in path: %s", json_file)
 
@@ -283,9 +395,20 @@ class KrknRunner:
             result["depends_on"] = depends_on
         return result
 
+    @property
+    def prom_client(self):
+        '''Prometheus client, connected on first use so that health check
+        based fitness functions do not require Prometheus access.'''
+        if self._prom_client is None:
+            self._prom_client = self.__connect_prom_client()
+        return self._prom_client
+
     def __connect_prom_client(self):
+        # krkn-lib is only needed for PromQL fitness functions and is slow to import
+        from krkn_lib.prometheus.krkn_prometheus import KrknPrometheus
+
         # Fetch Prometheus query endpoint
-        url = os.getenv("PROMETHEUS_URL", "")
+        url = self.prometheus_url or os.getenv("PROMETHEUS_URL", "")
         if url == "":
             prom_spec_json, _ = run_shell(
                 f"kubectl --kubeconfig={self.config.kubeconfig_file_path} -n openshift-monitoring get route -l app.kubernetes.io/name=thanos-query -o json",
@@ -311,28 +434,52 @@ class KrknRunner:
         if env_is_truthy("MOCK_FITNESS"):
             return random.random()
 
+        started = time.monotonic()
         try:
-            if fitness_type == FitnessFunctionType.point:
-                return self.calculate_point_fitness(start, end, query)
-            elif fitness_type == FitnessFunctionType.range:
-                return self.calculate_range_fitness(start, end, query)
+            with span("fitness_query", type=fitness_type.value):
+                if fitness_type == FitnessFunctionType.point:
+                    return self.calculate_point_fitness(start, end, query)
+                elif fitness_type == FitnessFunctionType.range:
+                    return self.calculate_range_fitness(start, end, query)
         except Exception as error:
+            FITNESS_QUERY_ERRORS.inc(type=fitness_type.value)
             logger.error("Fitness function calculation failed: %s", error)
             raise error
+        finally:
+            FITNESS_QUERY_DURATION.observe(time.monotonic() - started, type=fitness_type.value)
 
-    def calculate_fitness_score_for_items(self, start, end):
+    def calculate_fitness_score_for_items(
+        self,
+        start,
+        end,
+        health_check_samples: HealthCheckSamples = None,
+        health_check_baselines: Dict[str, HealthCheckBaseline] = None,
+        items: List[FitnessFunctionItem] = None,
+    ):
         '''
         This is used to compute fitness scores when multiple SLOs are defined.
+        PromQL based items are queried from Prometheus, while health check
+        based items are computed from health check samples of the run.
         '''
+        if items is None:
+            items = self.config.fitness_function.items
         results = []
         overall_score = 0
-        for fitness_item in self.config.fitness_function.items:
-            raw_score = self.calculate_fitness_value(
-                start=start,
-                end=end,
-                query=fitness_item.query,
-                fitness_type=fitness_item.type
-            )
+        for fitness_item in items:
+            if fitness_item.type in HEALTH_CHECK_FITNESS_TYPES:
+                with span("health_check_fitness", type=fitness_item.type.value):
+                    raw_score = calculate_health_check_fitness(
+                        fitness_item,
+                        health_check_samples if health_check_samples is not None else HealthCheckSamples(),
+                        baselines=health_check_baselines,
+                    )
+            else:
+                raw_score = self.calculate_fitness_value(
+                    start=start,
+                    end=end,
+                    query=fitness_item.query,
+                    fitness_type=fitness_item.type
+                )
             fitness_value = fitness_item.weight * raw_score
             overall_score += fitness_value
 
@@ -353,21 +500,26 @@ class KrknRunner:
         Helpful to measure values for counter based metric like restarts.
         """
         logger.info("Calculating Point Fitness")
-        result_at_beginning = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=start,
-            end_time=start,
-            granularity=100,
-        )[0]["values"][-1][1]
+        result_at_beginning = self.query_value_at(query, start)
+        result_at_end = self.query_value_at(query, end)
 
-        result_at_end = self.prom_client.process_prom_query_in_range(
-            query,
-            start_time=end,
-            end_time=end,
-            granularity=100,
-        )[0]["values"][-1][1]
+        return result_at_end - result_at_beginning
 
-        return float(result_at_end) - float(result_at_beginning)
+    def query_value_at(self, query, timestamp):
+        """Fetch value of query at given timestamp.
+        Results are cached for the current run, so that repeated samples
+        against the same start timestamp only query Prometheus once.
+        """
+        key = (query, timestamp)
+        if key not in self._instant_query_cache:
+            result = self.prom_client.process_prom_query_in_range(
+                query,
+                start_time=timestamp,
+                end_time=timestamp,
+                granularity=100,
+            )[0]["values"][-1][1]
+            self._instant_query_cache[key] = float(result)
+        return self._instant_query_cache[key]
 
     def calculate_range_fitness(self, start, end, query):
         """
@@ -0,0 +1,212 @@
+'''
+Replay of the top scenarios of a previous run, to regression test a cluster.
+
+Scenarios are restored from the run ledger, best mean fitness first, and run
+again through KrknRunner. Scenarios that do not disrupt the same target
+(namespace of pod, container and application outage scenarios, node selector
+of node hogs) may run concurrently; scenarios sharing a target always run one
+after another, as their disruptions would add up. Composite scenarios target
+the union of their parts.
+
+Fitness measures how much a scenario disrupts the application, so a replayed
+fitness score above the recorded one beyond the tolerance means the
+application got less resilient and is reported as a regression.
+
+Fitness is not scoped to the targets of a scenario: Prometheus queries cover
+the whole cluster and health checks probe all applications through a single
+watcher, so scenarios running concurrently are scored on each other's
+disruption too. A warning is logged when replaying with concurrency, and
+scores of such replays are only comparable to replays of the same
+concurrency.
+'''
+
+import threading
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Dict, FrozenSet, List, Optional, Tuple
+
+from chaos_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from chaos_ai.chaos_engines.krkn_runner import KrknRunner
+from chaos_ai.models.app import CommandRunResult, KrknRunnerType, ReplayResult
+from chaos_ai.models.base_scenario import BaseScenario, CompositeScenario, ScenarioFactory
+from chaos_ai.models.config import HEALTH_CHECK_FITNESS_TYPES, ConfigFile, FitnessFunction
+from chaos_ai.reporter.run_ledger import RunLedger
+from chaos_ai.utils.logger import get_module_logger
+
+logger = get_module_logger(__name__)
+
+# Parameter holding the target disrupted by a scenario type
+TARGET_PARAMETERS = {
+    "pod-scenarios": ("namespace", "NAMESPACE"),
+    "container-scenarios": ("namespace", "NAMESPACE"),
+    "application-outages": ("namespace", "NAMESPACE"),
+    "node-cpu-hog": ("node", "NODE_SELECTOR"),
+    "node-memory-hog": ("node", "NODE_SELECTOR"),
+}
+
+
+class ReplayItem:
+    def __init__(self, scenario: BaseScenario, fitness_score: float, runs: int, scenario_id: int):
+        self.scenario = scenario
+        self.fitness_score = fitness_score  # Mean recorded fitness score
+        self.runs = runs  # Recorded runs the mean is taken over
+        self.scenario_id = scenario_id  # Latest recorded run
+
+
+def targets(scenario: BaseScenario) -> FrozenSet[Tuple[str, str]]:
+    '''(kind, value) of targets disrupted by scenario.'''
+    if isinstance(scenario, CompositeScenario):
+        return targets(scenario.scenario_a) | targets(scenario.scenario_b)
+    if scenario.name not in TARGET_PARAMETERS:
+        return frozenset()
+    kind, name = TARGET_PARAMETERS[scenario.name]
+    return frozenset(
+        (kind, str(parameter.get_value())) for parameter in scenario.parameters if parameter.name == name
+    )
+
+
+def shared_fitness(fitness_function: FitnessFunction) -> List[str]:
+    '''Parts of fitness measured over the whole cluster rather than the targets of a scenario.'''
+    shared = []
+    if fitness_function.query is not None or any(
+        item.type not in HEALTH_CHECK_FITNESS_TYPES for item in fitness_function.items
+    ):
+        shared.append("Prometheus queries")
+    if any(item.type in HEALTH_CHECK_FITNESS_TYPES for item in fitness_function.items):
+        shared.append("health checks")
+    return shared
+
+
+def load_top(output_dir: str, count: int) -> List[ReplayItem]:
+    '''Top scenarios of a run ledger by mean fitness score.'''
+    ledger = RunLedger(output_dir)
+    try:
+        top = ledger.top_scenarios(count)
+    finally:
+        ledger.close()
+    items = []
+    for row in top:
+        result = row["result"]
+        try:
+            scenario = ScenarioFactory.from_dict(result["scenario"])
+        except Exception as error:
+            logger.warning("Unable to restore scenario %s: %s", result.get("scenario_id"), error)
+            continue
+        items.append(ReplayItem(scenario, row["fitness_score"], row["runs"], result["scenario_id"]))
+    return items
+
+
+class ReplayRunner:
+    def __init__(
+        self,
+        config: ConfigFile,
+        output_dir: str,
+        runner_type: KrknRunnerType = None,
+        concurrency: int = 1,
+        tolerance: float = 0.1,
+        absolute_tolerance: float = 0.0,
+    ):
+        self.config = config
+        self.output_dir = output_dir
+        self.runner_type = runner_type
+        self.concurrency = concurrency  # Scenarios run at the same time, if their targets do not overlap
+        self.tolerance = tolerance  # Allowed increase of fitness score, relative to the recorded one
+        self.absolute_tolerance = absolute_tolerance  # Allowed increase of fitness score, at least
+        self.ledger = RunLedger(output_dir)
+        self._local = threading.local()
+
+        shared = shared_fitness(config.fitness_function)
+        if concurrency > 1 and shared:
+            logger.warning(
+                "Fitness uses %s over the whole cluster, scores of scenarios replayed concurrently "
+                "include each other's disruption. Replay one scenario at a time to compare with the recorded run.",
+                " and ".join(shared),
+            )
+
+    def allowed_delta(self, recorded: float) -> float:
+        return max(self.absolute_tolerance, self.tolerance * abs(recorded))
+
+    def compare(self, item: ReplayItem, result: CommandRunResult) -> ReplayResult:
+        fitness_score = result.fitness_result.fitness_score
+        delta = fitness_score - item.fitness_score
+        allowed = self.allowed_delta(item.fitness_score)
+        if result.returncode == -1:
+            status = "error"
+        elif delta > allowed:
+            status = "regression"
+        elif delta < -allowed:
+            status = "improvement"
+        else:
+            status = "pass"
+        return ReplayResult(
+            scenario_id=result.scenario_id,
+            recorded_scenario_id=item.scenario_id,
+            scenario=str(item.scenario),
+            recorded_fitness_score=item.fitness_score,
+            recorded_runs=item.runs,
+            fitness_score=fitness_score,
+            delta=delta,
+            allowed_delta=allowed,
+            returncode=result.returncode,
+            status=status,
+        )
+
+    def _runner(self, health_check_watcher: HealthCheckWatcher) -> KrknRunner:
+        # Runner keeps per-run state, so each worker thread gets its own
+        runner = getattr(self._local, "runner", None)
+        if runner is None:
+            runner = self._local.runner = KrknRunner(
+                self.config,
+                output_dir=self.output_dir,
+                runner_type=self.runner_type,
+                health_check_watcher=health_check_watcher,
+            )
+        return runner
+
+    def _run(self, item: ReplayItem, health_check_watcher: HealthCheckWatcher) -> CommandRunResult:
+        try:
+            return self._runner(health_check_watcher).run(item.scenario, 0)
+        except Exception as error:
+            logger.error("Unable to replay scenario %s: %s", item.scenario, error)
+            return CommandRunResult.not_run(item.scenario, 0, f"Replay failed: {error}")
+
+    def replay(self, items: List[ReplayItem]) -> List[ReplayResult]:
+        '''Run scenarios again, results in the order of items.'''
+        results: List[Optional[ReplayResult]] = [None] * len(items)
+        pending = list(range(len(items)))
+        running: Dict[Future, int] = {}
+        health_check_watcher = HealthCheckWatcher(self.config.health_checks)
+        health_check_watcher.run()
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                while pending or running:
+                    busy = set().union(*(targets(items[i].scenario) for i in running.values()))
+                    # Start scenarios in order, skipping those whose targets are being disrupted
+                    for i in list(pending):
+                        if len(running) >= self.concurrency:
+                            break
+                        scenario_targets = targets(items[i].scenario)
+                        if scenario_targets & busy:
+                            continue
+                        logger.info("Replaying scenario %s", items[i].scenario)
+                        pending.remove(i)
+                        busy |= scenario_targets
+                        running[executor.submit(self._run, items[i], health_check_watcher)] = i
+
+                    done, _ = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        i = running.pop(future)
+                        result = future.result()
+                        if result.returncode != -1:
+                            self.ledger.append(result)
+                        results[i] = self.compare(items[i], result)
+                        logger.info(
+                            "Scenario %s: %s (fitness %.4f, recorded %.4f)",
+                            items[i].scenario,
+                            results[i].status,
+                            results[i].fitness_score,
+                            results[i].recorded_fitness_score,
+                        )
+        finally:
+            health_check_watcher.stop()
+            self.ledger.close()
+        return results
@@ -1,12 +1,10 @@
 import logging
 import os
 import click
-from pydantic import ValidationError
-from chaos_ai.utils.fs import read_config_from_file
-from chaos_ai.utils.logger import get_module_logger, verbosity_to_level
-from chaos_ai.models.app import AppContext, KrknRunnerType
+from chaos_ai.utils.logger import get_module_logger, setup_logging, verbosity_to_level
 
-from chaos_ai.algorithm.genetic import GeneticAlgorithm
+# Commands import their dependencies (pydantic models, numpy, aiohttp, reporters)
+# on invocation, so that --help and argument errors return immediately.
 
 
 @click.group()
@@ -30,6 +28,28 @@ def main():
     help='Additional parameters for config file in key=value format.',
     default=[]
 )
+@click.option('--export-files', is_flag=True,
+              help='Export per-scenario result and log files in addition to results.db.')
+@click.option('--compact', is_flag=True, help='Write result files without indentation.')
+@click.option('--no-plots', is_flag=True, help='Skip rendering health check graphs.')
+@click.option('--plot-dpi', type=int, default=300, help='Resolution of health check graphs.')
+@click.option('--plot-format',
+    type=click.Choice(['png', 'svg', 'pdf', 'jpg'], case_sensitive=False),
+    default='png',
+    help='Image format of health check graphs.'
+)
+@click.option('--metrics-port', type=int, default=None,
+              help='Expose Prometheus metrics of the run on localhost at this port.')
+@click.option('--coordinator-port', type=int, default=None,
+              help='Run scenarios on remote agents connecting to this port instead of locally.')
+@click.option('--lease-timeout', type=int, default=60,
+              help='Seconds without heartbeat after which an agent\'s scenario is queued again.')
+@click.option('--seed-from', multiple=True, default=[],
+              help='Output directory of a previous run to seed the initial population from, can be repeated.')
+@click.option('--seed-fraction', type=click.FloatRange(0.0, 1.0), default=0.5,
+              help='Part of the initial population seeded with the best prior scenarios.')
+@click.option('--seed-priors', is_flag=True,
+              help='Import fitness of prior results into bandit and re-evaluation statistics.')
 @click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
 @click.pass_context
 def run(ctx,
@@ -38,10 +58,30 @@ def run(ctx,
     format: str = 'yaml',
     runner_type: str = None,
     param: list[str] = None,
+    export_files: bool = False,
+    compact: bool = False,
+    no_plots: bool = False,
+    plot_dpi: int = 300,
+    plot_format: str = 'png',
+    metrics_port: int = None,
+    coordinator_port: int = None,
+    lease_timeout: int = 60,
+    seed_from: list[str] = None,
+    seed_fraction: float = 0.5,
+    seed_priors: bool = False,
     verbose: int = 0       # Default to INFO level
 ):
+    from pydantic import ValidationError
+    from chaos_ai.models.app import AppContext, KrknRunnerType
+    from chaos_ai.utils.fs import read_config_from_file
+
     ctx.obj = AppContext(verbose=verbosity_to_level(verbose))
 
+    # Logs emitted while a scenario runs are also written to its own log file
+    setup_logging(
+        ctx.obj.verbose,
+        scenario_log_dir=os.path.join(output, "logs", "scenarios") if output else None,
+    )
     logger = get_module_logger(__name__)
 
     if config == '' or config is None:
@@ -67,12 +107,351 @@ def run(ctx,
         elif runner_type.lower() == 'krknhub':
             enum_runner_type = KrknRunnerType.HUB_RUNNER
 
+    metrics_server = None
+    if metrics_port is not None:
+        from chaos_ai.utils.metrics import MetricsServer
+        metrics_server = MetricsServer(metrics_port)
+        metrics_server.start()
+
+    from chaos_ai.algorithm.genetic import GeneticAlgorithm
+
+    warm_start = None
+    if seed_from:
+        from chaos_ai.algorithm.warm_start import WarmStart
+        warm_start = WarmStart(parsed_config, list(seed_from), fraction=seed_fraction, priors=seed_priors)
+
+    coordinator = None
+    if coordinator_port is not None:
+        from chaos_ai.chaos_engines.coordinator import Coordinator
+        coordinator = Coordinator(parsed_config, port=coordinator_port, lease_timeout=lease_timeout)
+        coordinator.start()
+
     genetic = GeneticAlgorithm(
         parsed_config,
         output_dir=output,
         format=format,
-        runner_type=enum_runner_type
+        runner_type=enum_runner_type,
+        export_files=export_files,
+        compact=compact,
+        plots_enabled=not no_plots,
+        plot_dpi=plot_dpi,
+        plot_format=plot_format.lower(),
+        coordinator=coordinator,
+        warm_start=warm_start,
+    )
+    try:
+        genetic.simulate()
+
+        genetic.save()
+    finally:
+        if coordinator is not None:
+            coordinator.stop()
+        if metrics_server is not None:
+            metrics_server.stop()
+
+
+@main.command()
+@click.option('--coordinator', help='URL of the coordinator, e.g. http://host:8765.', required=True)
+@click.option('--kubeconfig', help='Kubeconfig of the cluster this agent runs scenarios on.')
+@click.option('--prometheus-url', default=None,
+              help='Prometheus host of the cluster, defaults to PROMETHEUS_URL or the cluster\'s thanos route.')
+@click.option('--config', '-c', default=None,
+              help='Path to chaos AI config file, fetched from the coordinator if not set.')
+@click.option(
+    '--param', '-p',
+    multiple=True,
+    help='Additional parameters for config file in key=value format.',
+    default=[]
+)
+@click.option('--name', default=None, help='Name of the agent, defaults to hostname.')
+@click.option('--output', '-o', default='./', help='Directory to save scenario files of the agent.')
+@click.option('--runner-type', '-r',
+              type=click.Choice(['krknctl', 'krknhub'], case_sensitive=False),
+              help='Type of chaos engine to use.', default=None)
+@click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
+@click.pass_context
+def agent(ctx,
+    coordinator: str,
+    kubeconfig: str = None,
+    prometheus_url: str = None,
+    config: str = None,
+    param: list[str] = None,
+    name: str = None,
+    output: str = './',
+    runner_type: str = None,
+    verbose: int = 0
+):
+    '''Run scenarios handed out by a coordinator on this agent's cluster.'''
+    from chaos_ai.models.app import AppContext, KrknRunnerType
+    from chaos_ai.chaos_engines.agent import RunnerAgent
+
+    ctx.obj = AppContext(verbose=verbosity_to_level(verbose))
+
+    setup_logging(
+        ctx.obj.verbose,
+        scenario_log_dir=os.path.join(output, "logs", "scenarios"),
     )
-    genetic.simulate()
+    logger = get_module_logger(__name__)
 
-    genetic.save()
+    parsed_config = None
+    if config is not None:
+        from pydantic import ValidationError
+        from chaos_ai.utils.fs import read_config_from_file
+
+        if not os.path.exists(config):
+            logger.warning("Config file not found.")
+            exit(1)
+        try:
+            parsed_config = read_config_from_file(config, param)
+        except ValidationError as err:
+            logger.error("Unable to parse config file: %s", err)
+            exit(1)
+    elif kubeconfig is None:
+        logger.warning("Either --kubeconfig or --config is required.")
+        exit(1)
+
+    enum_runner_type = None
+    if runner_type:
+        if runner_type.lower() == 'krknctl':
+            enum_runner_type = KrknRunnerType.CLI_RUNNER
+        elif runner_type.lower() == 'krknhub':
+            enum_runner_type = KrknRunnerType.HUB_RUNNER
+
+    RunnerAgent(
+        coordinator,
+        output_dir=output,
+        name=name,
+        config=parsed_config,
+        kubeconfig=kubeconfig,
+        prometheus_url=prometheus_url,
+        runner_type=enum_runner_type,
+    ).run()
+
+
+@main.command()
+@click.option('--output', '-o', help='Directory with results of a run.', required=True)
+@click.option('--format', '-f', help='Format of the output file.',
+    type=click.Choice(['json', 'yaml'], case_sensitive=False),
+    default='yaml'
+)
+@click.option('--compact', is_flag=True, help='Write result files without indentation.')
+@click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
+@click.pass_context
+def export(ctx, output: str, format: str = 'yaml', compact: bool = False, verbose: int = 0):
+    '''Export per-scenario result and log files from a run ledger.'''
+    from chaos_ai.models.app import AppContext
+    from chaos_ai.reporter.run_ledger import LEDGER_FILE_NAME, RunLedger
+
+    ctx.obj = AppContext(verbose=verbosity_to_level(verbose))
+
+    setup_logging(ctx.obj.verbose)
+    logger = get_module_logger(__name__)
+
+    if not os.path.exists(os.path.join(output, LEDGER_FILE_NAME)):
+        logger.warning("Run ledger not found in %s.", output)
+        exit(1)
+
+    ledger = RunLedger(output)
+    ledger.export_files(format.lower(), compact=compact)
+    ledger.close()
+
+
+@main.command()
+@click.option('--config', '-c', help='Path to chaos AI config file.', required=True)
+@click.option(
+    '--param', '-p',
+    multiple=True,
+    help='Additional parameters for config file in key=value format.',
+    default=[]
+)
+@click.option('--history', multiple=True, default=[],
+              help='Output directory of a previous run to calibrate scenario durations, can be repeated.')
+@click.option('--budget', default=None,
+              help='Time budget of the run, e.g. 90m or 6h, to derive generations or population size.')
+@click.option('--keep', type=click.Choice(['population', 'generations'], case_sensitive=False),
+              default='population', help='Config value kept as is when fitting the budget.')
+@click.option('--agents', type=int, default=1, help='Number of clusters running scenarios in parallel.')
+@click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
+@click.pass_context
+def plan(ctx,
+    config: str,
+    param: list[str] = None,
+    history: list[str] = None,
+    budget: str = None,
+    keep: str = 'population',
+    agents: int = 1,
+    verbose: int = 0
+):
+    '''Estimate duration of a run, or the generations and population size fitting a time budget.'''
+    from pydantic import ValidationError
+    from chaos_ai.models.app import AppContext
+    from chaos_ai.reporter.run_ledger import LEDGER_FILE_NAME
+    from chaos_ai.utils.fs import read_config_from_file
+    from chaos_ai.algorithm.planner import CostModel, RunPlanner, format_duration, parse_duration
+
+    ctx.obj = AppContext(verbose=verbosity_to_level(verbose))
+
+    setup_logging(ctx.obj.verbose)
+    logger = get_module_logger(__name__)
+
+    budget_seconds = None
+    if budget is not None:
+        try:
+            budget_seconds = parse_duration(budget)
+        except ValueError as err:
+            logger.error("Invalid budget: %s", err)
+            exit(1)
+    if not os.path.exists(config):
+        logger.warning("Config file not found.")
+        exit(1)
+    try:
+        parsed_config = read_config_from_file(config, param)
+    except ValidationError as err:
+        logger.error("Unable to parse config file: %s", err)
+        exit(1)
+    for output_dir in history:
+        if not os.path.exists(os.path.join(output_dir, LEDGER_FILE_NAME)):
+            logger.warning("Run ledger not found in %s.", output_dir)
+            exit(1)
+    cost_model = CostModel.from_history(list(history)) if history else CostModel()
+    planner = RunPlanner(parsed_config, cost_model, agents=agents)
+
+    estimate = planner.estimate(parsed_config.generations, parsed_config.population_size)
+    if budget_seconds is not None:
+        if keep.lower() == 'population':
+            estimate = planner.fit_generations(budget_seconds, parsed_config.population_size)
+        else:
+            estimate = planner.fit_population_size(budget_seconds, parsed_config.generations)
+        if estimate is None:
+            logger.warning("Not a single generation fits in %s.", format_duration(budget_seconds))
+            exit(1)
+
+    click.echo("generations: %d" % estimate.generations)
+    click.echo("population_size: %d" % estimate.population_size)
+    click.echo("# Scenario runs:       %.0f" % estimate.evaluations)
+    click.echo("# Cluster time:        %s (%.0f cluster-minutes)" % (
+        format_duration(estimate.cluster_seconds), estimate.cluster_seconds / 60
+    ))
+    click.echo("# Wall clock:          %s on %d cluster(s), %s at 90th percentile" % (
+        format_duration(estimate.wall_clock_seconds),
+        estimate.agents,
+        format_duration(estimate.wall_clock_p90_seconds),
+    ))
+
+
+@main.command()
+@click.argument('results')
+@click.option('--top', type=click.IntRange(min=1), default=5, help='Number of best scenarios to replay.')
+@click.option('--config', '-c', default=None,
+              help='Path to chaos AI config file, defaults to config.yaml saved with the results.')
+@click.option(
+    '--param', '-p',
+    multiple=True,
+    help='Additional parameters for config file in key=value format.',
+    default=[]
+)
+@click.option('--output', '-o', default=None,
+              help='Directory to save replay results, defaults to a replay directory within the results.')
+@click.option('--format', '-f', help='Format of the replay report.',
+    type=click.Choice(['json', 'yaml'], case_sensitive=False),
+    default='yaml'
+)
+@click.option('--runner-type', '-r',
+              type=click.Choice(['krknctl', 'krknhub'], case_sensitive=False),
+              help='Type of chaos engine to use.', default=None)
+@click.option('--concurrency', type=click.IntRange(min=1), default=1,
+              help='Scenarios run at the same time, scenarios disrupting the same target never overlap. '
+                   "Fitness is measured cluster-wide, so concurrent scenarios affect each other's score.")
+@click.option('--tolerance', type=click.FloatRange(min=0.0), default=0.1,
+              help='Allowed increase of fitness score, relative to the recorded one.')
+@click.option('--absolute-tolerance', type=click.FloatRange(min=0.0), default=0.0,
+              help='Allowed increase of fitness score, used when larger than the relative one.')
+@click.option('-v', '--verbose', count=True, help='Increase verbosity of output.')
+@click.pass_context
+def replay(ctx,
+    results: str,
+    top: int = 5,
+    config: str = None,
+    param: list[str] = None,
+    output: str = None,
+    format: str = 'yaml',
+    runner_type: str = None,
+    concurrency: int = 1,
+    tolerance: float = 0.1,
+    absolute_tolerance: float = 0.0,
+    verbose: int = 0
+):
+    '''Replay the best scenarios of a run and exit with 1 if their fitness regressed.'''
+    from pydantic import ValidationError
+    from chaos_ai.models.app import AppContext, KrknRunnerType
+    from chaos_ai.reporter.run_ledger import LEDGER_FILE_NAME
+    from chaos_ai.utils.fs import read_config_from_file
+    from chaos_ai.utils.serialization import dump_data
+    from chaos_ai.chaos_engines.replay import ReplayRunner, load_top
+
+    # Exit code 1 is reserved for regressions, invalid input exits with 2 like usage errors
+    if output is None:
+        output = os.path.join(results, "replay")
+    ctx.obj = AppContext(verbose=verbosity_to_level(verbose))
+
+    setup_logging(
+        ctx.obj.verbose,
+        scenario_log_dir=os.path.join(output, "logs", "scenarios"),
+    )
+    logger = get_module_logger(__name__)
+
+    if not os.path.exists(os.path.join(results, LEDGER_FILE_NAME)):
+        logger.warning("Run ledger not found in %s.", results)
+        exit(2)
+    if os.path.abspath(output) == os.path.abspath(results):
+        logger.warning("Replay results would overwrite the recorded ones, choose another output directory.")
+        exit(2)
+    if config is None:
+        config = os.path.join(results, "config.yaml")
+    if not os.path.exists(config):
+        logger.warning("Config file not found.")
+        exit(2)
+    try:
+        parsed_config = read_config_from_file(config, param)
+    except ValidationError as err:
+        logger.error("Unable to parse config file: %s", err)
+        exit(2)
+
+    enum_runner_type = None
+    if runner_type:
+        if runner_type.lower() == 'krknctl':
+            enum_runner_type = KrknRunnerType.CLI_RUNNER
+        elif runner_type.lower() == 'krknhub':
+            enum_runner_type = KrknRunnerType.HUB_RUNNER
+
+    items = load_top(results, top)
+    if len(items) == 0:
+        logger.warning("No scenarios to replay in %s.", results)
+        exit(2)
+
+    os.makedirs(output, exist_ok=True)
+    runner = ReplayRunner(
+        parsed_config,
+        output_dir=output,
+        runner_type=enum_runner_type,
+        concurrency=concurrency,
+        tolerance=tolerance,
+        absolute_tolerance=absolute_tolerance,
+    )
+    replay_results = runner.replay(items)
+
+    with open(os.path.join(output, "replay.%s" % format.lower()), "w", encoding="utf-8") as f:
+        dump_data([result.model_dump(mode='json') for result in replay_results], f, format.lower())
+
+    for result in replay_results:
+        click.echo("%-12s %+.4f  %.4f -> %.4f  %s" % (
+            result.status,
+            result.delta,
+            result.recorded_fitness_score,
+            result.fitness_score,
+            result.scenario,
+        ))
+    failed = [result for result in replay_results if result.status in ("regression", "error")]
+    if failed:
+        logger.error("%d of %d replayed scenarios regressed or failed.", len(failed), len(replay_results))
+        exit(1)
@@ -1,12 +1,13 @@
 import logging
 import datetime
 from enum import Enum
-from typing import Dict, List
+from typing import Dict, List, Optional, Union
 from dataclasses import dataclass
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field, SerializeAsAny, computed_field
 
 from chaos_ai.models.base_scenario import BaseScenario
 from chaos_ai.models.config import HealthCheckResult
+from chaos_ai.models.health_check_samples import HealthCheckSamples
 from chaos_ai.utils import id_generator
 
 
@@ -16,28 +17,138 @@ auto_id = id_generator()
 class AppContext:
     verbose: int = logging.INFO
 
+class FitnessSample(BaseModel):
+    timestamp: datetime.datetime
+    value: float
+
+
 class FitnessScoreResult(BaseModel):
     id: int
     fitness_score: float
     weighted_score: float
+    samples: List[FitnessSample] = []   # Values sampled while scenario was running
 
 
 class FitnessResult(BaseModel):
     scores: List[FitnessScoreResult] = []
     fitness_score: float = 0.0    # Overall fitness score
+    samples: List[FitnessSample] = []   # Overall score sampled while scenario was running
+    early_stopped: bool = False   # Scenario was stopped once fitness score was certain
+
+
+class TimingSpan(BaseModel):
+    name: str               # Phase of the run, e.g. krkn_run
+    start: float            # Unix epoch seconds
+    duration: float         # Seconds
+    thread: str             # Name of thread that ran the phase
+    scenario_id: Optional[int] = None
+    attributes: Dict[str, Union[str, int, float, bool]] = {}
 
 
 class CommandRunResult(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     generation_id: int      # Which generation was scenario referred
     scenario_id: int = Field(default_factory=lambda: next(auto_id))        # Scenario ID
-    scenario: BaseScenario  # scenario details
+    scenario: SerializeAsAny[BaseScenario]  # scenario details
     cmd: str                # Krkn-Hub command 
     log: str                # Log details or path to log file
     returncode: int         # Return code of Krkn-Hub scenario execution
     start_time: datetime.datetime   # Start date timestamp of the test 
     end_time: datetime.datetime     # End date timestamp of the test
     fitness_result: FitnessResult   # Fitness result measured for scenario.
-    health_check_results: Dict[str, List[HealthCheckResult]] = {}
+    spans: List[TimingSpan] = []    # Timing of each phase of the run
+    # Columnar health check samples, kept out of serialization
+    health_check_samples: HealthCheckSamples = Field(default_factory=HealthCheckSamples, exclude=True)
+
+    @classmethod
+    def not_run(cls, scenario: BaseScenario, generation_id: int, reason: str, **kwargs) -> "CommandRunResult":
+        '''Result of scenario that was not run (or whose run was lost), scored 0.'''
+        now = datetime.datetime.now()
+        return cls(
+            generation_id=generation_id,
+            scenario=scenario,
+            cmd="",
+            log=reason,
+            returncode=-1,
+            start_time=now,
+            end_time=now,
+            fitness_result=FitnessResult(),
+            **kwargs,
+        )
+
+    @computed_field
+    @property
+    def health_check_results(self) -> Dict[str, List[HealthCheckResult]]:
+        '''Health check samples materialized on demand.'''
+        return self.health_check_samples.to_results()
+
+    @computed_field
+    @property
+    def health_check_latency(self) -> Dict[str, Dict[str, float]]:
+        '''Latency percentiles per health check, corrected for coordinated omission.'''
+        return self.health_check_samples.latency_percentiles()
+
+
+class ResultSummary(BaseModel):
+    '''
+    Compact result kept in memory for the whole run. Log stays in the run
+    ledger and health check samples are spilled to an npz file, loaded on access.
+    '''
+    generation_id: int
+    scenario_id: int
+    scenario: SerializeAsAny[BaseScenario]
+    returncode: int
+    start_time: datetime.datetime
+    end_time: datetime.datetime
+    fitness_result: FitnessResult   # Scores without sampled series
+    samples_path: Optional[str] = None  # npz file of health check samples, None if there were none
+
+    @classmethod
+    def from_result(cls, result: CommandRunResult, samples_path: Optional[str] = None) -> "ResultSummary":
+        fitness_result = result.fitness_result.model_copy(update={
+            "samples": [],
+            "scores": [score.model_copy(update={"samples": []}) for score in result.fitness_result.scores],
+        })
+        return cls(
+            generation_id=result.generation_id,
+            scenario_id=result.scenario_id,
+            scenario=result.scenario,
+            returncode=result.returncode,
+            start_time=result.start_time,
+            end_time=result.end_time,
+            fitness_result=fitness_result,
+            samples_path=samples_path,
+        )
+
+    @property
+    def health_check_samples(self) -> HealthCheckSamples:
+        if self.samples_path is None:
+            return HealthCheckSamples()
+        return HealthCheckSamples.load(self.samples_path)
+
+
+class RunEstimate(BaseModel):
+    generations: int
+    population_size: int
+    agents: int = 1                 # Clusters running scenarios in parallel
+    evaluations: float              # Expected scenario runs, including re-evaluations
+    cluster_seconds: float          # Expected time clusters are under chaos, summed over agents
+    wall_clock_seconds: float       # Expected duration of the run
+    wall_clock_p90_seconds: float   # Duration not exceeded by 90% of simulated runs
+
+
+class ReplayResult(BaseModel):
+    scenario_id: int                # Scenario ID of the replayed run
+    recorded_scenario_id: int       # Latest recorded run of the scenario
+    scenario: str
+    recorded_fitness_score: float   # Mean over recorded runs
+    recorded_runs: int
+    fitness_score: float
+    delta: float                    # Replayed minus recorded fitness score
+    allowed_delta: float            # Tolerance the delta is compared to
+    returncode: int
+    status: str                     # pass, regression, improvement or error
 
 
 class KrknRunnerType(str, Enum):
@@ -1,10 +1,11 @@
 import random
+import hashlib
+import weakref
 from enum import Enum
-from typing import List
-from pydantic import BaseModel
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, ConfigDict, PrivateAttr, SerializeAsAny
 import chaos_ai.models.base_scenario_parameter as param
-from chaos_ai.models.config import ConfigFile
-from chaos_ai.models.custom_errors import EmptyConfigError
+from chaos_ai.models.config import ConfigFile, ParameterRangeConfig
 from chaos_ai.utils.logger import get_module_logger
 
 logger = get_module_logger(__name__)
@@ -13,6 +14,18 @@ logger = get_module_logger(__name__)
 class BaseScenario(BaseModel):
     name: str
 
+    def fingerprint(self) -> str:
+        '''Stable identifier of scenario definition, used to index results.'''
+        return hashlib.sha1(str(self).encode("utf-8")).hexdigest()[:16]
+
+    def depth(self) -> int:
+        '''Nesting of composites, 0 for a single scenario.'''
+        return 0
+
+    def leaf_count(self) -> int:
+        '''Number of single scenarios run.'''
+        return 1
+
 
 class Scenario(BaseScenario):
     parameters: List[param.BaseParameter]
@@ -40,10 +53,59 @@ class CompositeDependency(Enum):
 
 
 class CompositeScenario(BaseScenario):
-    scenario_a: BaseScenario
-    scenario_b: BaseScenario
+    '''
+    Immutable node of a scenario graph. Nodes are hash-consed by of(), so equal
+    subtrees are shared instead of copied, and operators build new nodes around
+    unchanged subtrees. Scenarios referenced by a composite must not be modified
+    in place, they are copied before being changed.
+    '''
+    model_config = ConfigDict(frozen=True)
+
+    scenario_a: SerializeAsAny[BaseScenario]
+    scenario_b: SerializeAsAny[BaseScenario]
     dependency: CompositeDependency
 
+    _fingerprint: Optional[str] = PrivateAttr(default=None)
+    _depth: int = PrivateAttr(default=0)
+    _leaf_count: int = PrivateAttr(default=0)
+
+    def model_post_init(self, __context: Any):
+        self._depth = 1 + max(self.scenario_a.depth(), self.scenario_b.depth())
+        self._leaf_count = self.scenario_a.leaf_count() + self.scenario_b.leaf_count()
+
+    @classmethod
+    def of(
+        cls,
+        scenario_a: BaseScenario,
+        scenario_b: BaseScenario,
+        dependency: CompositeDependency,
+        name: str = "composite",
+    ) -> "CompositeScenario":
+        '''Composite of given scenarios, reusing an existing node with the same definition.'''
+        composite = cls(name=name, scenario_a=scenario_a, scenario_b=scenario_b, dependency=dependency)
+        return _interned_composites.setdefault(composite.fingerprint(), composite)
+
+    def replace(self, scenario_a: BaseScenario, scenario_b: BaseScenario) -> "CompositeScenario":
+        '''Node with given children, self if they are unchanged.'''
+        if scenario_a is self.scenario_a and scenario_b is self.scenario_b:
+            return self
+        return CompositeScenario.of(scenario_a, scenario_b, self.dependency, name=self.name)
+
+    def __str__(self):
+        return f"{self.name}({self.scenario_a}, {self.scenario_b}, {self.dependency.name})"
+
+    def fingerprint(self) -> str:
+        if self._fingerprint is None:
+            key = f"{self.name}({self.scenario_a.fingerprint()}, {self.scenario_b.fingerprint()}, {self.dependency.name})"
+            self._fingerprint = hashlib.sha1(key.encode("utf-8")).hexdigest()[:16]
+        return self._fingerprint
+
+    def depth(self) -> int:
+        return self._depth
+
+    def leaf_count(self) -> int:
+        return self._leaf_count
+
     def __eq__(self, other):
         if not isinstance(other, CompositeScenario):
             return NotImplemented
@@ -53,55 +115,72 @@ class CompositeScenario(BaseScenario):
         return hash(tuple([self.scenario_a, self.scenario_b]))
 
 
+# Composite nodes alive in the run keyed by fingerprint, used to share equal subtrees
+_interned_composites: "weakref.WeakValueDictionary[str, CompositeScenario]" = weakref.WeakValueDictionary()
+
+
 class ScenarioFactory:
     @staticmethod
-    def generate_random_scenario(
-        config: ConfigFile,
-    ):
-        # Pick random available choice to try
-        choices = []
-
-        if config.scenario.pod_scenarios is not None:
-            choices.append("pod-scenarios")
-        if config.scenario.application_outages is not None:
-            choices.append("application-outages")
-        if config.scenario.container_scenarios is not None:
-            choices.append("container-scenarios")
-        if config.scenario.node_cpu_hog is not None:
-            choices.append("node-cpu-hog")
-        if config.scenario.node_memory_hog is not None:
-            choices.append("node-memory-hog")
-
-        if len(choices) == 0:
-            raise EmptyConfigError(
-                "No scenarios found. Please provide atleast 1 scenario."
+    def available_scenarios(config: ConfigFile) -> Dict[str, BaseModel]:
+        '''Configured scenario types mapped to their config section.'''
+        sections = {
+            "pod-scenarios": config.scenario.pod_scenarios,
+            "application-outages": config.scenario.application_outages,
+            "container-scenarios": config.scenario.container_scenarios,
+            "node-cpu-hog": config.scenario.node_cpu_hog,
+            "node-memory-hog": config.scenario.node_memory_hog,
+        }
+        return {name: section for name, section in sections.items() if section is not None}
+
+    @staticmethod
+    def to_dict(scenario: BaseScenario) -> Dict[str, Any]:
+        '''Serialize scenario with all parameter fields (choices, ranges), so that from_dict restores it as is.'''
+        if isinstance(scenario, CompositeScenario):
+            return {
+                "name": scenario.name,
+                "scenario_a": ScenarioFactory.to_dict(scenario.scenario_a),
+                "scenario_b": ScenarioFactory.to_dict(scenario.scenario_b),
+                "dependency": scenario.dependency.value,
+            }
+        return {
+            "name": scenario.name,
+            "parameters": [parameter.model_dump(mode='json') for parameter in scenario.parameters],
+        }
+
+    @staticmethod
+    def from_dict(data: Dict[str, Any]) -> BaseScenario:
+        '''Restore scenario from its JSON serialization, e.g. when sent to a remote runner.'''
+        if "scenario_a" in data:
+            return CompositeScenario.of(
+                ScenarioFactory.from_dict(data["scenario_a"]),
+                ScenarioFactory.from_dict(data["scenario_b"]),
+                CompositeDependency(data["dependency"]),
+                name=data["name"],
             )
+        return Scenario(
+            name=data["name"],
+            parameters=[param.parameter_from_dict(parameter) for parameter in data["parameters"]],
+        )
 
-        scenario = random.choice(choices)
-
-        try:
-            if scenario == "pod-scenarios":
-                return ScenarioFactory.create_pod_scenario(
-                    **config.scenario.pod_scenarios.model_dump()
-                )
-            elif scenario == "application-outages":
-                return ScenarioFactory.create_application_outage_scenario(
-                    **config.scenario.application_outages.model_dump()
-                )
-            elif scenario == "container-scenarios":
-                return ScenarioFactory.create_container_scenario(
-                    **config.scenario.container_scenarios.model_dump()
-                )
-            elif scenario == "node-cpu-hog":
-                return ScenarioFactory.create_cpu_hog_scenario(
-                    **config.scenario.node_cpu_hog.model_dump()
-                )
-            elif scenario == "node-memory-hog":
-                return ScenarioFactory.create_memory_hog_scenario(
-                    **config.scenario.node_memory_hog.model_dump()
-                )
-        except Exception as error:
-            logger.error("Unable to generate scenario: %s", error)
+    @staticmethod
+    def create_scenario(name: str, section: BaseModel) -> Scenario:
+        '''Create scenario of given type with random values from its config section.'''
+        factories = {
+            "pod-scenarios": ScenarioFactory.create_pod_scenario,
+            "application-outages": ScenarioFactory.create_application_outage_scenario,
+            "container-scenarios": ScenarioFactory.create_container_scenario,
+            "node-cpu-hog": ScenarioFactory.create_cpu_hog_scenario,
+            "node-memory-hog": ScenarioFactory.create_memory_hog_scenario,
+        }
+        return factories[name](**section.model_dump())
+
+    @staticmethod
+    def apply_parameter_ranges(scenario: Scenario, parameter_ranges: Dict[str, ParameterRangeConfig]):
+        '''Apply user defined ranges to numeric parameters of scenario.'''
+        for parameter in scenario.parameters:
+            if isinstance(parameter, param.NumericParameter) and parameter.name in parameter_ranges:
+                parameter.apply_range(parameter_ranges[parameter.name])
+        return scenario
 
     @staticmethod
     def create_pod_scenario(
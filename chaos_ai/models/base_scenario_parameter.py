@@ -1,8 +1,14 @@
+import math
 import random
 
-from typing import List, Any
+from typing import Dict, List, Any, Type, Union
 from pydantic import BaseModel
 
+from chaos_ai.models.config import MutationDistribution, ParameterRangeConfig, ParameterScale
+
+# Draws attempted before falling back to a single step, so that mutation always changes value
+MAX_MUTATION_ATTEMPTS = 10
+
 
 class BaseParameter(BaseModel):
     name: str
@@ -12,6 +18,122 @@ class BaseParameter(BaseModel):
         return self.value
 
 
+class NumericParameter(BaseParameter):
+    '''
+    Numeric parameter searched within [min_value, max_value].
+
+    Mutation happens in a normalized [0, 1] space (logarithmic for log scale),
+    using the configured distribution. Mutating always yields a different
+    value unless the range holds a single value. Parameters with an int value
+    only take whole numbers, whatever their scale.
+    '''
+    value: Union[int, float]
+    min_value: float
+    max_value: float
+    scale: ParameterScale = ParameterScale.integer
+    distribution: MutationDistribution = MutationDistribution.gaussian
+    sigma: float = 0.1  # Gaussian step as a fraction of the range
+    eta: float = 20.0   # Polynomial distribution index
+
+    def apply_range(self, config: ParameterRangeConfig):
+        '''Override search range and mutation operator, clamping value into the new range.'''
+        for field, attribute in (
+            ("min", "min_value"),
+            ("max", "max_value"),
+            ("scale", "scale"),
+            ("distribution", "distribution"),
+            ("sigma", "sigma"),
+            ("eta", "eta"),
+        ):
+            override = getattr(config, field)
+            if override is not None:
+                setattr(self, attribute, override)
+        # Checked against the resulting range, as min, max and scale may come from defaults
+        if self.min_value > self.max_value:
+            raise ValueError(
+                f"{self.name} range min ({self.min_value}) is greater than max ({self.max_value})."
+            )
+        if self.scale == ParameterScale.log and self.min_value <= 0:
+            raise ValueError(f"{self.name} has log scale, which requires positive min (got {self.min_value}).")
+        self.value = self.clamp(self.value)
+
+    def _is_integer(self) -> bool:
+        return isinstance(self.value, int)
+
+    def clamp(self, value: float) -> Union[int, float]:
+        '''Nearest value in range, rounded for int-valued parameters.'''
+        value = min(max(value, self.min_value), self.max_value)
+        if self._is_integer():
+            # Round inside the range, bounds may be fractional when overridden
+            value = int(round(value))
+            value = max(value, math.ceil(self.min_value))
+            value = min(value, math.floor(self.max_value))
+        return value
+
+    def random_value(self) -> Union[int, float]:
+        '''Value drawn uniformly over the range, in the parameter scale.'''
+        return self.clamp(self._denormalize(random.random()))
+
+    def _normalize(self, value: float) -> float:
+        if self.max_value == self.min_value:
+            return 0.0
+        if self.scale == ParameterScale.log:
+            return (math.log(value) - math.log(self.min_value)) / (math.log(self.max_value) - math.log(self.min_value))
+        return (value - self.min_value) / (self.max_value - self.min_value)
+
+    def _denormalize(self, position: float) -> float:
+        if self.scale == ParameterScale.log:
+            return math.exp(math.log(self.min_value) + position * (math.log(self.max_value) - math.log(self.min_value)))
+        return self.min_value + position * (self.max_value - self.min_value)
+
+    def _draw(self, position: float) -> float:
+        '''New normalized position drawn from the mutation distribution.'''
+        if self.distribution == MutationDistribution.uniform:
+            return random.random()
+        if self.distribution == MutationDistribution.polynomial:
+            # Bounded polynomial mutation (Deb & Goyal)
+            r = random.random()
+            power = 1.0 / (self.eta + 1.0)
+            if r < 0.5:
+                delta = (2 * r + (1 - 2 * r) * (1 - position) ** (self.eta + 1)) ** power - 1
+            else:
+                delta = 1 - (2 * (1 - r) + 2 * (r - 0.5) * position ** (self.eta + 1)) ** power
+            return min(max(position + delta, 0.0), 1.0)
+
+        position += random.gauss(0.0, self.sigma)
+        # Reflect at bounds, so that values at the edge of range can still move inward
+        position = abs(position) % 2.0
+        return 2.0 - position if position > 1.0 else position
+
+    def domain_size(self) -> float:
+        '''Number of distinct values in range, infinite for real valued parameters.'''
+        if not self._is_integer():
+            return float("inf") if self.max_value > self.min_value else 1
+        return max(math.floor(self.max_value) - math.ceil(self.min_value) + 1, 1)
+
+    def mutate(self):
+        if self.domain_size() <= 1:
+            self.value = self.clamp(self.value)
+            return
+
+        current = self.clamp(self.value)
+        position = self._normalize(current)
+        for _ in range(MAX_MUTATION_ATTEMPTS):
+            candidate = self.clamp(self._denormalize(self._draw(position)))
+            if candidate != current:
+                self.value = candidate
+                return
+
+        # Draws kept rounding back to current value, take a single step instead
+        if self._is_integer():
+            step = random.choice([-1, 1])
+            if not math.ceil(self.min_value) <= current + step <= math.floor(self.max_value):
+                step = -step
+            self.value = current + step
+        else:
+            self.value = self.random_value()
+
+
 class DummyParameter(BaseParameter):
     name: str
     value: int
@@ -47,44 +169,34 @@ class NamePatternParameter(BaseParameter):
         self.value = random.choice(self.possible_values)
 
 
-class DisruptionCountParameter(BaseParameter):
+class DisruptionCountParameter(NumericParameter):
     name: str = "DISRUPTION_COUNT"
     value: int = 1
-    max_value: int = 1  # some arbitrary value
-
-    def mutate(self):
-        # TODO: Detect number of pods of same type, and set the max_value
-        pass
-        # self.value = random.randint(1, self.max_value)
+    min_value: float = 1
+    # Raised to the number of matching pods by ClusterInventory when inventory is enabled
+    max_value: float = 1
 
 
-class KillTimeoutParameter(BaseParameter):
+class KillTimeoutParameter(NumericParameter):
     name: str = "KILL_TIMEOUT"
     value: int = 60
-
-    def mutate(self):
-        self.value = self.value
+    min_value: float = 30
+    max_value: float = 300
 
 
-class ExpRecoveryTimeParameter(BaseParameter):
+class ExpRecoveryTimeParameter(NumericParameter):
     name: str = "EXPECTED_RECOVERY_TIME"
     value: int = 60
-
-    def mutate(self):
-        pass
+    # Fixed unless configured, lowering it would only make krkn report failures sooner
+    min_value: float = 60
+    max_value: float = 60
 
 
-class DurationParameter(BaseParameter):
+class DurationParameter(NumericParameter):
     name: str = "DURATION"
     value: int = 60
-
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 15) * self.value / 100
-        else:
-            self.value -= random.randint(1, 15) * self.value / 100
-        self.value = max(self.value, 10)
-        self.value = min(self.value, 600)
+    min_value: float = 10
+    max_value: float = 600
 
 
 class PodSelectorParameter(BaseParameter):
@@ -132,71 +244,43 @@ class ActionParameter(BaseParameter):
         self.value = random.choice(self.possible_values)
 
 
-class TotalChaosDurationParameter(BaseParameter):
+class TotalChaosDurationParameter(NumericParameter):
     name: str = "TOTAL_CHAOS_DURATION"
     value: int = 60
-
-    def mutate(self):
-        pass
+    min_value: float = 10
+    max_value: float = 600
 
 
-class NodeCPUCoreParameter(BaseParameter):
+class NodeCPUCoreParameter(NumericParameter):
     name: str = "NODE_CPU_CORE"
     value: int = 2
-
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 15) * self.value / 100
-        else:
-            self.value -= random.randint(1, 15) * self.value / 100
-        self.value = int(self.value)
-        self.value = max(self.value, 1)
-        self.value = min(self.value, 32)
+    min_value: float = 1
+    max_value: float = 32
+    scale: ParameterScale = ParameterScale.log
 
 
-class NodeCPUPercentageParameter(BaseParameter):
+class NodeCPUPercentageParameter(NumericParameter):
     name: str = "NODE_CPU_PERCENTAGE"
     value: int = 50
-
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 35) * self.value / 100
-        else:
-            self.value -= random.randint(1, 25) * self.value / 100
-        self.value = int(self.value)
-        self.value = max(self.value, 1)
-        self.value = min(self.value, 100)
+    min_value: float = 1
+    max_value: float = 100
 
 
-class NodeMemopryPercentageParameter(BaseParameter):
+class NodeMemopryPercentageParameter(NumericParameter):
     name: str = "MEMORY_CONSUMPTION_PERCENTAGE"
     value: int = 90
+    min_value: float = 1
+    max_value: float = 100
 
     def get_value(self):
         return f"{self.value}%"
 
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 35) * self.value / 100
-        else:
-            self.value -= random.randint(1, 25) * self.value / 100
-        self.value = int(self.value)
-        self.value = max(self.value, 1)
-        self.value = min(self.value, 100)
 
-
-class NumberOfWorkersParameter(BaseParameter):
+class NumberOfWorkersParameter(NumericParameter):
     name: str = "NUMBER_OF_WORKERS"
     value: int = 1
-
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 5) * self.value / 100
-        else:
-            self.value -= random.randint(1, 7) * self.value / 100
-        self.value = int(self.value)
-        self.value = max(self.value, 1)
-        self.value = min(self.value, 10)
+    min_value: float = 1
+    max_value: float = 10
 
 
 class NodeSelectorParameter(BaseParameter):
@@ -217,18 +301,11 @@ class TaintParameter(BaseParameter):
         self.value = random.choice(self.possible_values)
 
 
-class NumberOfNodesParameter(BaseParameter):
+class NumberOfNodesParameter(NumericParameter):
     name: str = "NUMBER_OF_NODES"
     value: int = 1
-
-    def mutate(self):
-        if random.random() < 0.5:
-            self.value += random.randint(1, 15) * self.value / 100
-        else:
-            self.value -= random.randint(1, 15) * self.value / 100
-        self.value = int(self.value)
-        self.value = max(self.value, 1)
-        self.value = min(self.value, 16)
+    min_value: float = 1
+    max_value: float = 16
 
 
 class HogScenarioImageParameter(BaseParameter):
@@ -237,3 +314,31 @@ class HogScenarioImageParameter(BaseParameter):
 
     def mutate(self):
         pass
+
+
+def parameter_classes() -> Dict[str, Type[BaseParameter]]:
+    '''Parameter classes keyed by parameter name, used to restore scenarios from plain data.'''
+    classes = {}
+    pending = list(BaseParameter.__subclasses__())
+    while pending:
+        cls = pending.pop()
+        pending.extend(cls.__subclasses__())
+        # Classes without a default name (DummyParameter, NumericParameter) are not registered
+        name = cls.model_fields["name"].default
+        if isinstance(name, str):
+            classes[name] = cls
+    return classes
+
+
+def parameter_from_dict(data: Dict[str, Any]) -> BaseParameter:
+    '''
+    Restore parameter from its JSON serialization. Results only keep name and
+    value of parameters, required choices then default to the value itself.
+    '''
+    cls = parameter_classes().get(data.get("name"))
+    if cls is None:
+        raise ValueError(f"Unknown scenario parameter: {data.get('name')}")
+    field = cls.model_fields.get("possible_values")
+    if field is not None and field.is_required() and "possible_values" not in data:
+        data = {**data, "possible_values": [data["value"]]}
+    return cls(**data)
@@ -0,0 +1,61 @@
+'''
+Snapshot of cluster resources targeted by chaos scenarios.
+'''
+
+import time
+from typing import Dict, List, Optional
+
+from pydantic import BaseModel, Field
+
+
+class PodInfo(BaseModel):
+    namespace: str
+    name: str
+    labels: Dict[str, str] = {}
+    containers: List[str] = []
+    node: Optional[str] = None
+
+
+class NodeInfo(BaseModel):
+    name: str
+    labels: Dict[str, str] = {}
+    taints: List[str] = []  # key=value:Effect
+
+
+class ClusterSnapshot(BaseModel):
+    pods: List[PodInfo] = []
+    nodes: List[NodeInfo] = []
+    fetched_at: float = Field(default_factory=time.time)  # Unix epoch seconds
+
+    @classmethod
+    def from_resources(cls, pods: List[dict], nodes: List[dict]) -> "ClusterSnapshot":
+        '''Build snapshot from Kubernetes API objects, e.g. items of `kubectl get -o json`.'''
+        return cls(
+            pods=[
+                PodInfo(
+                    namespace=pod["metadata"].get("namespace", "default"),
+                    name=pod["metadata"]["name"],
+                    labels=pod["metadata"].get("labels") or {},
+                    containers=[
+                        container["name"] for container in pod.get("spec", {}).get("containers", [])
+                    ],
+                    node=pod.get("spec", {}).get("nodeName"),
+                )
+                for pod in pods
+            ],
+            nodes=[
+                NodeInfo(
+                    name=node["metadata"]["name"],
+                    labels=node["metadata"].get("labels") or {},
+                    taints=[
+                        "%s=%s:%s" % (taint["key"], taint.get("value", ""), taint.get("effect", ""))
+                        for taint in node.get("spec", {}).get("taints") or []
+                    ],
+                )
+                for node in nodes
+            ],
+        )
+
+    @property
+    def namespaces(self) -> List[str]:
+        return sorted(set(pod.namespace for pod in self.pods))
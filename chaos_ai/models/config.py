@@ -28,6 +28,141 @@ class NodeHogScenarioConfig(BaseModel):
     taints: List[str] = []
 
 
+class ParameterScale(str, Enum):
+    integer = 'integer'  # Linear steps rounded to whole numbers
+    log = 'log'          # Steps proportional to magnitude, e.g. CPU cores 1, 2, 4, 8
+
+
+class MutationDistribution(str, Enum):
+    gaussian = 'gaussian'      # Normal step around current value
+    polynomial = 'polynomial'  # Bounded polynomial step, mostly small with occasional large jumps
+    uniform = 'uniform'        # Reset to a uniformly random value in range
+
+
+class ParameterRangeConfig(BaseModel):
+    '''
+    Overrides search range and mutation operator of a numeric scenario parameter.
+    Fields left unset keep the parameter's defaults.
+    '''
+    min: Optional[float] = None
+    max: Optional[float] = None
+    scale: Optional[ParameterScale] = None
+    distribution: Optional[MutationDistribution] = None
+    sigma: Optional[float] = None  # Gaussian step as a fraction of the range
+    eta: Optional[float] = None    # Polynomial distribution index, larger means smaller steps
+
+    @model_validator(mode='after')
+    def check_range(self):
+        if self.min is not None and self.max is not None and self.min > self.max:
+            raise ValueError(f"Parameter range min ({self.min}) is greater than max ({self.max}).")
+        return self
+
+
+class BanditStrategy(str, Enum):
+    ucb1 = 'ucb1'          # Upper confidence bound on mean fitness
+    thompson = 'thompson'  # Sample mean fitness from its posterior
+
+
+class BanditConfig(BaseModel):
+    '''
+    Allocates random scenarios (initial population and injections) across
+    scenario types, and optionally their target values, by observed fitness.
+    '''
+    enabled: bool = False
+    strategy: BanditStrategy = BanditStrategy.ucb1
+    exploration: float = 2 ** 0.5  # UCB1 exploration coefficient
+    min_probability: float = 0.05  # Exploration floor, each arm is picked at least this often
+    targets: bool = False  # Also allocate across target values (pod label, node selector, ...) of each type
+
+    @field_validator('min_probability', mode='after')
+    @classmethod
+    def is_probability(cls, value: float) -> float:
+        if value < 0 or value > 1:
+            raise ValueError(f'{value} is outside the range [0.0, 1.0]')
+        return value
+
+    @field_validator('exploration', mode='after')
+    @classmethod
+    def is_non_negative(cls, value: float) -> float:
+        if value < 0:
+            raise ValueError(f'{value} should not be negative')
+        return value
+
+
+class InventoryConfig(BaseModel):
+    '''
+    Snapshot of cluster pods and nodes used to skip (or repair) scenarios
+    that would target nothing, instead of paying for a krkn run.
+    '''
+    enabled: bool = False
+    refresh_interval: int = 300  # in seconds, snapshot is fetched again once older
+    repair: bool = True  # Try other target values before skipping a scenario
+
+    @field_validator('refresh_interval', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value <= 0:
+            raise ValueError(f'{value} should be greater than 0')
+        return value
+
+
+class ConfidenceBound(str, Enum):
+    lower = 'lower'  # Favor scenarios that are reliably disruptive
+    mean = 'mean'
+    upper = 'upper'  # Favor scenarios that may be disruptive
+
+
+class ReevaluationConfig(BaseModel):
+    '''
+    Runs leading scenarios again while their fitness confidence intervals
+    overlap, and ranks scenarios by a confidence bound over all their runs.
+    '''
+    enabled: bool = False
+    top_k: int = 3  # Leading scenarios considered for another run after each generation
+    max_runs: int = 3  # Runs of a single scenario at most
+    confidence: float = 0.95  # Confidence level of fitness intervals
+    rank_by: ConfidenceBound = ConfidenceBound.lower
+
+    @field_validator('top_k', 'max_runs', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value <= 0:
+            raise ValueError(f'{value} should be greater than 0')
+        return value
+
+    @field_validator('confidence', mode='after')
+    @classmethod
+    def is_open_probability(cls, value: float) -> float:
+        if value <= 0 or value >= 1:
+            raise ValueError(f'{value} is outside the range (0.0, 1.0)')
+        return value
+
+
+class CompositionConfig(BaseModel):
+    '''
+    Bounds on composite scenarios built by composition and crossover, so that
+    composites stay executable in bounded time. Offsprings exceeding them are
+    replaced by their parents.
+    '''
+    max_depth: int = 4  # Nesting of composites, a composite of two scenarios has depth 1
+    max_leaves: int = 8  # Scenarios run by a single composite
+    parsimony: float = 0.0  # Selection weight lost per scenario of a composite beyond the first
+
+    @field_validator('max_depth', 'max_leaves', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value <= 0:
+            raise ValueError(f'{value} should be greater than 0')
+        return value
+
+    @field_validator('parsimony', mode='after')
+    @classmethod
+    def is_non_negative(cls, value: float) -> float:
+        if value < 0:
+            raise ValueError(f'{value} should not be negative')
+        return value
+
+
 class ScenarioConfig(BaseModel):
     application_outages: Optional[AppOutageScenarioConfig] = Field(
         alias="application-outages", default=None
@@ -49,6 +184,19 @@ class ScenarioConfig(BaseModel):
 class FitnessFunctionType(str, Enum):
     point = 'point'
     range = 'range'
+    # Computed locally from health check results, no PromQL query required
+    failure_ratio = 'failure_ratio'
+    outage_streak = 'outage_streak'
+    latency_degradation = 'latency_degradation'
+    time_to_recover = 'time_to_recover'
+
+
+HEALTH_CHECK_FITNESS_TYPES = {
+    FitnessFunctionType.failure_ratio,
+    FitnessFunctionType.outage_streak,
+    FitnessFunctionType.latency_degradation,
+    FitnessFunctionType.time_to_recover,
+}
 
 
 auto_id = id_generator()
@@ -56,10 +204,15 @@ auto_id = id_generator()
 
 class FitnessFunctionItem(BaseModel):
     id: int = Field(default_factory=lambda: next(auto_id))  # Auto-increment ID
-    query: str  # PromQL
+    query: Optional[str] = None  # PromQL
     type: FitnessFunctionType = FitnessFunctionType.point
     weight: float = 1.0
 
+    # Health check based fitness types
+    application: Optional[str] = None  # Health check name to evaluate, defaults to all
+    percentile: float = 99.0  # Latency percentile compared against baseline
+    baseline: Optional[float] = None  # Expected latency in seconds at given percentile, defaults to measured steady state
+
     @field_validator('weight', mode='after')
     @classmethod
     def is_percent(cls, value: float) -> float:
@@ -67,18 +220,47 @@ class FitnessFunctionItem(BaseModel):
             raise ValueError(f'{value} is outside the range [0.0, 1.0]')
         return value
 
+    @model_validator(mode='after')
+    def check_fitness_item_definition(self):
+        '''Validates that each fitness type has the fields it requires.'''
+        if self.type not in HEALTH_CHECK_FITNESS_TYPES and self.query is None:
+            raise ValueError(f"Please define query for '{self.type.value}' fitness function.")
+        return self
+
+
+class FitnessSamplingConfig(BaseModel):
+    '''
+    Periodically samples the fitness queries while the scenario is running,
+    so that a scenario can be stopped once its outcome is certain.
+    '''
+    enabled: bool = False
+    interval: int = 15  # in seconds
+    saturation_samples: int = 0  # Stop once score is unchanged for N consecutive samples (0 disables)
+    saturation_tolerance: float = 0.0  # Max change in score still considered as unchanged
+    threshold: Optional[float] = None  # Stop once score reaches this value
+
+    @field_validator('interval', mode='after')
+    @classmethod
+    def is_positive(cls, value: int) -> int:
+        if value <= 0:
+            raise ValueError(f'{value} should be greater than 0')
+        return value
+
 
 class FitnessFunction(BaseModel):
     query: Union[str, None] = None  # PromQL
     type: FitnessFunctionType = FitnessFunctionType.point
     include_krkn_failure: bool = False
     items: List[FitnessFunctionItem] = []
+    sampling: FitnessSamplingConfig = FitnessSamplingConfig()
 
     @model_validator(mode='after')
     def check_fitness_definition_exists(self):
         '''Validates whether there is at least one fitness function is defined.'''
         if self.query is None and len(self.items) == 0:
             raise ValueError("Please define at least one fitness function in query or items.")
+        if self.query is not None and self.type in HEALTH_CHECK_FITNESS_TYPES:
+            raise ValueError(f"'{self.type.value}' fitness function should be defined in items.")
         return self
 
 
@@ -94,13 +276,20 @@ class HealthCheckApplicationConfig(BaseModel):
     interval: int = 2   # in seconds
 
 class HealthCheckConfig(BaseModel):
-    stop_watcher_on_failure: bool = False
+    stop_watcher_on_failure: bool = False  # Stop probing for the rest of a scenario once a probe fails
     applications: List[HealthCheckApplicationConfig] = []
+    max_connections: int = 100  # Size of connection pool shared by all health checks
+    max_connections_per_host: int = 10  # Concurrent connections allowed to a single host
+    keepalive_timeout: int = 30  # in seconds, how long idle connections are kept open
+    max_samples: int = 8192  # Samples retained per application, oldest ones are dropped first
+    baseline_duration: int = 0  # in seconds, steady state observed before the first scenario
+    baseline_cooldown: int = 30  # in seconds, samples right after a scenario are excluded from baseline
 
 class HealthCheckResult(BaseModel):
     name: str
     timestamp: str = Field(default_factory=lambda: datetime.datetime.now().isoformat())
-    response_time: float  # in seconds
+    response_time: float  # in seconds, server latency excluding probe overhead, time until failure for failed probes
+    probe_overhead: float = 0.0  # in seconds, connection setup and pool wait time
     status_code: int    # actual status code
     success: bool       # True if status code is as expected
     error: Optional[str] = None # Error message if the status code is not as expected
@@ -116,6 +305,7 @@ class ConfigFile(BaseModel):
     mutation_rate: float = const.MUTATION_RATE  # How often mutation should occur for each scenario parameter (0.0-1.0)
     crossover_rate: float = const.CROSSOVER_RATE    # How often crossover should occur for each scenario parameter (0.0-1.0)
     composition_rate: float = const.CROSSOVER_COMPOSITION_RATE  # How often a crossover would lead to composition (0.0-1.0)
+    composition: CompositionConfig = CompositionConfig()
 
     population_injection_rate: float = const.POPULATION_INJECTION_RATE  # How often a random samples gets added to new population (0.0-1.0)
     population_injection_size: int = const.POPULATION_INJECTION_SIZE    # What's the size of random samples that gets added to new population
@@ -124,3 +314,26 @@ class ConfigFile(BaseModel):
     health_checks: HealthCheckConfig
 
     scenario: ScenarioConfig = ScenarioConfig()
+
+    # Search range of numeric scenario parameters keyed by parameter name (e.g. DURATION)
+    parameter_ranges: Dict[str, ParameterRangeConfig] = {}
+
+    bandit: BanditConfig = BanditConfig()
+
+    inventory: InventoryConfig = InventoryConfig()
+
+    reevaluation: ReevaluationConfig = ReevaluationConfig()
+
+    @field_validator('parameter_ranges', mode='after')
+    @classmethod
+    def check_parameter_ranges(cls, value: Dict[str, ParameterRangeConfig]) -> Dict[str, ParameterRangeConfig]:
+        '''Applies ranges to default parameters, so that overrides are checked against the resulting range and scale.'''
+        # Parameters are defined on top of config models
+        from chaos_ai.models.base_scenario_parameter import NumericParameter, parameter_classes
+
+        classes = parameter_classes()
+        for name, parameter_range in value.items():
+            parameter_class = classes.get(name)
+            if parameter_class is not None and issubclass(parameter_class, NumericParameter):
+                parameter_class().apply_range(parameter_range)
+        return value
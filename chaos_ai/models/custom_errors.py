@@ -1,2 +1,6 @@
 class EmptyConfigError(Exception):
     pass
+
+
+class ClusterInventoryError(Exception):
+    pass
@@ -0,0 +1,351 @@
+'''
+Compact columnar storage for health check samples.
+
+Each endpoint keeps its samples in fixed capacity ring buffers (one NumPy array
+per column), so memory stays bounded regardless of how long the watcher runs.
+Pydantic HealthCheckResult objects are only created when explicitly requested.
+'''
+
+import time
+import datetime
+import threading
+from typing import Dict, Iterator, List, Optional
+
+import numpy as np
+
+from chaos_ai.models.config import HealthCheckResult
+from chaos_ai.models.latency_histogram import LatencyHistogram
+
+# Offset between monotonic clock and wall clock, used to convert sample timestamps
+MONOTONIC_TO_WALL_OFFSET = time.time() - time.monotonic()
+
+DEFAULT_CAPACITY = 8192
+
+
+class HealthCheckSeries:
+    '''Ring buffer of health check samples for a single endpoint.'''
+
+    def __init__(
+        self,
+        name: str,
+        url: str,
+        capacity: int = DEFAULT_CAPACITY,
+        expected_interval: Optional[float] = None,
+    ):
+        self.name = name
+        self.url = url
+        self.capacity = capacity
+        self.expected_interval = expected_interval  # Probe schedule period in seconds
+        self._lock = threading.Lock()
+        self._timestamps = np.zeros(capacity, dtype=np.float64)   # monotonic seconds
+        self._response_times = np.zeros(capacity, dtype=np.float32)
+        self._probe_overheads = np.zeros(capacity, dtype=np.float32)
+        self._status_codes = np.zeros(capacity, dtype=np.int16)
+        self._missed_slots = np.zeros(capacity, dtype=np.int16)  # Slots skipped after each probe
+        self._success = np.zeros((capacity + 7) // 8, dtype=np.uint8)  # bitset
+        self._errors: Dict[int, str] = {}  # sparse, keyed by absolute sample number
+        self._count = 0  # Total number of samples ever appended
+
+    def append(
+        self,
+        timestamp: float,
+        response_time: float,
+        status_code: int,
+        success: bool,
+        error: Optional[str] = None,
+        probe_overhead: float = 0.0,
+    ):
+        '''Append a sample, overwriting the oldest one once buffer is full.'''
+        with self._lock:
+            index = self._count % self.capacity
+            self._timestamps[index] = timestamp
+            self._response_times[index] = response_time
+            self._probe_overheads[index] = probe_overhead
+            self._status_codes[index] = status_code
+            self._missed_slots[index] = 0
+            if success:
+                self._success[index >> 3] |= np.uint8(1 << (index & 7))
+            else:
+                self._success[index >> 3] &= np.uint8(~(1 << (index & 7)) & 0xFF)
+
+            # Drop error of the sample that is being overwritten
+            self._errors.pop(self._count - self.capacity, None)
+            if error is not None:
+                self._errors[self._count] = error
+            self._count += 1
+
+    def add_missed_slots(self, count: int):
+        '''Record scheduled probes skipped after the latest sample.'''
+        with self._lock:
+            if self._count > 0:
+                index = (self._count - 1) % self.capacity
+                self._missed_slots[index] = min(int(self._missed_slots[index]) + count, np.iinfo(np.int16).max)
+
+    def __len__(self) -> int:
+        return min(self._count, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        '''Number of samples overwritten because buffer was full.'''
+        return max(self._count - self.capacity, 0)
+
+    def _ordered(self, column: np.ndarray) -> np.ndarray:
+        '''Return column in insertion order (oldest first).'''
+        if self._count <= self.capacity:
+            return column[:self._count].copy()
+        head = self._count % self.capacity
+        return np.concatenate((column[head:], column[:head]))
+
+    @property
+    def missed_slots(self) -> int:
+        '''Scheduled probes skipped because previous probe was still running.'''
+        return int(self._ordered(self._missed_slots).sum())
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        '''Monotonic timestamps in seconds.'''
+        return self._ordered(self._timestamps)
+
+    @property
+    def wall_timestamps(self) -> np.ndarray:
+        '''Unix epoch timestamps in seconds.'''
+        return self.timestamps + MONOTONIC_TO_WALL_OFFSET
+
+    @property
+    def response_times(self) -> np.ndarray:
+        return self._ordered(self._response_times)
+
+    @property
+    def probe_overheads(self) -> np.ndarray:
+        return self._ordered(self._probe_overheads)
+
+    @property
+    def status_codes(self) -> np.ndarray:
+        return self._ordered(self._status_codes)
+
+    @property
+    def success(self) -> np.ndarray:
+        bits = np.unpackbits(self._success, bitorder='little')[:self.capacity].astype(bool)
+        return self._ordered(bits)
+
+    def slice(self, start: float, end: float) -> 'HealthCheckSeries':
+        '''Copy of samples with monotonic timestamps within [start, end].'''
+        with self._lock:
+            timestamps = self.timestamps
+            mask = (timestamps >= start) & (timestamps <= end)
+            first = self._count - len(self)
+            positions = np.flatnonzero(mask)
+            return HealthCheckSeries.from_columns(
+                self.name,
+                self.url,
+                self.expected_interval,
+                timestamps=timestamps[mask],
+                response_times=self.response_times[mask],
+                probe_overheads=self.probe_overheads[mask],
+                status_codes=self.status_codes[mask],
+                missed_slots=self._ordered(self._missed_slots)[mask],
+                success=self.success[mask],
+                errors={
+                    i: self._errors[first + position]
+                    for i, position in enumerate(positions)
+                    if first + position in self._errors
+                },
+            )
+
+    @classmethod
+    def from_columns(
+        cls,
+        name: str,
+        url: str,
+        expected_interval: Optional[float],
+        timestamps: np.ndarray,
+        response_times: np.ndarray,
+        probe_overheads: np.ndarray,
+        status_codes: np.ndarray,
+        missed_slots: np.ndarray,
+        success: np.ndarray,
+        errors: Dict[int, str],
+    ) -> 'HealthCheckSeries':
+        '''Series holding exactly the given samples (oldest first), errors keyed by position.'''
+        count = len(timestamps)
+        series = cls(name, url, max(count, 1), expected_interval)
+        series._timestamps[:count] = timestamps
+        series._response_times[:count] = response_times
+        series._probe_overheads[:count] = probe_overheads
+        series._status_codes[:count] = status_codes
+        series._missed_slots[:count] = missed_slots
+        series._success = np.packbits(
+            np.pad(success.astype(bool), (0, len(series._success) * 8 - count)),
+            bitorder='little'
+        )
+        series._errors = dict(errors)
+        series._count = count
+        return series
+
+    def latency_histogram(self) -> LatencyHistogram:
+        '''Latency histogram of all probes, failed ones included, corrected for coordinated omission.'''
+        histogram = LatencyHistogram()
+        histogram.record_values(self.response_times, self.expected_interval)
+        return histogram
+
+    def to_results(self) -> List[HealthCheckResult]:
+        '''Materialize samples as HealthCheckResult objects.'''
+        first = self._count - len(self)
+        return [
+            HealthCheckResult(
+                name=self.name,
+                timestamp=datetime.datetime.fromtimestamp(timestamp).isoformat(),
+                response_time=float(response_time),
+                probe_overhead=float(probe_overhead),
+                status_code=int(status_code),
+                success=bool(success),
+                error=self._errors.get(first + i),
+            )
+            for i, (timestamp, response_time, probe_overhead, status_code, success) in enumerate(zip(
+                self.wall_timestamps,
+                self.response_times,
+                self.probe_overheads,
+                self.status_codes,
+                self.success,
+            ))
+        ]
+
+
+class HealthCheckBaseline:
+    '''Steady state latency distribution and success rate of an endpoint.'''
+
+    def __init__(self, name: str, url: str):
+        self.name = name
+        self.url = url
+        self.histogram = LatencyHistogram()
+        self.success_count = 0
+        self.total_count = 0
+
+    def record(self, response_time: Optional[float], success: bool, expected_interval: Optional[float] = None):
+        '''Record a probe, response_time is None if there was no response (timeout, connection error).'''
+        self.total_count += 1
+        if success:
+            self.success_count += 1
+        if response_time is not None:
+            self.histogram.record_value(response_time, expected_interval)
+
+    @property
+    def success_rate(self) -> Optional[float]:
+        if self.total_count == 0:
+            return None
+        return self.success_count / self.total_count
+
+    def percentile(self, percentile: float) -> Optional[float]:
+        if self.histogram.total_count == 0:
+            return None
+        return self.histogram.percentile(percentile)
+
+
+class HealthCheckSamples:
+    '''Collection of health check series keyed by endpoint URL.'''
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        self.capacity = capacity
+        self._series: Dict[str, HealthCheckSeries] = {}
+
+    def series(self, name: str, url: str, expected_interval: Optional[float] = None) -> HealthCheckSeries:
+        '''Get series for an endpoint, creating it if needed.'''
+        if url not in self._series:
+            self._series[url] = HealthCheckSeries(name, url, self.capacity, expected_interval)
+        return self._series[url]
+
+    def __iter__(self) -> Iterator[HealthCheckSeries]:
+        return iter(self._series.values())
+
+    def __len__(self) -> int:
+        return len(self._series)
+
+    def slice(self, start: float, end: float) -> 'HealthCheckSamples':
+        '''Copy of samples with monotonic timestamps within [start, end].'''
+        window = HealthCheckSamples(self.capacity)
+        for url, series in list(self._series.items()):
+            window._series[url] = series.slice(start, end)
+        return window
+
+    def latency_percentiles(self) -> Dict[str, Dict[str, float]]:
+        '''Reported latency percentiles for each endpoint.'''
+        return {url: series.latency_histogram().percentiles() for url, series in self._series.items()}
+
+    def to_results(self) -> Dict[str, List[HealthCheckResult]]:
+        '''Materialize all samples as HealthCheckResult objects.'''
+        return {url: series.to_results() for url, series in self._series.items()}
+
+    def save(self, path: str):
+        '''Spill samples to a compressed npz file, timestamps are stored as wall clock.'''
+        columns = {}
+        for i, series in enumerate(self._series.values()):
+            first = series._count - len(series)
+            errors = sorted((key - first, message) for key, message in series._errors.items() if key >= first)
+            columns.update({
+                f"{i}_timestamps": series.wall_timestamps,
+                f"{i}_response_times": series.response_times,
+                f"{i}_probe_overheads": series.probe_overheads,
+                f"{i}_status_codes": series.status_codes,
+                f"{i}_missed_slots": series._ordered(series._missed_slots),
+                f"{i}_success": series.success,
+                f"{i}_error_positions": np.array([position for position, _ in errors], dtype=np.int64),
+                f"{i}_error_messages": np.array([message for _, message in errors], dtype=str),
+            })
+        series_list = list(self._series.values())
+        np.savez_compressed(
+            path,
+            names=np.array([series.name for series in series_list], dtype=str),
+            urls=np.array([series.url for series in series_list], dtype=str),
+            expected_intervals=np.array([
+                series.expected_interval if series.expected_interval is not None else np.nan
+                for series in series_list
+            ], dtype=np.float64),
+            capacity=np.array(self.capacity),
+            **columns,
+        )
+
+    @classmethod
+    def load(cls, path: str) -> 'HealthCheckSamples':
+        '''Load samples spilled by save.'''
+        with np.load(path, allow_pickle=False) as data:
+            samples = cls(int(data["capacity"]))
+            for i, (name, url, expected_interval) in enumerate(zip(
+                data["names"], data["urls"], data["expected_intervals"]
+            )):
+                samples._series[str(url)] = HealthCheckSeries.from_columns(
+                    str(name),
+                    str(url),
+                    None if np.isnan(expected_interval) else float(expected_interval),
+                    timestamps=data[f"{i}_timestamps"] - MONOTONIC_TO_WALL_OFFSET,
+                    response_times=data[f"{i}_response_times"],
+                    probe_overheads=data[f"{i}_probe_overheads"],
+                    status_codes=data[f"{i}_status_codes"],
+                    missed_slots=data[f"{i}_missed_slots"],
+                    success=data[f"{i}_success"],
+                    errors={
+                        int(position): str(message)
+                        for position, message in zip(data[f"{i}_error_positions"], data[f"{i}_error_messages"])
+                    },
+                )
+        return samples
+
+    @classmethod
+    def from_results(
+        cls,
+        results: Dict[str, List[HealthCheckResult]],
+        capacity: int = DEFAULT_CAPACITY,
+    ) -> 'HealthCheckSamples':
+        '''Rebuild samples from HealthCheckResult objects, e.g. received from a remote runner.'''
+        samples = cls(capacity)
+        for url, url_results in results.items():
+            for result in url_results:
+                series = samples.series(result.name, url)
+                series.append(
+                    datetime.datetime.fromisoformat(result.timestamp).timestamp() - MONOTONIC_TO_WALL_OFFSET,
+                    result.response_time,
+                    result.status_code,
+                    result.success,
+                    error=result.error,
+                    probe_overhead=result.probe_overhead,
+                )
+        return samples
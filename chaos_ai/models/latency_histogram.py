@@ -0,0 +1,111 @@
+'''
+Mergeable HDR-style latency histogram.
+
+Values are recorded in microseconds into log-linear buckets, which keeps the
+relative error bounded by the configured number of significant digits while
+using a fixed amount of memory. Histograms with the same layout can be merged
+by adding their counts.
+'''
+
+import math
+from typing import Dict, Iterable
+
+import numpy as np
+
+# Percentiles reported for each latency histogram
+REPORTED_PERCENTILES = {
+    "p50": 50.0,
+    "p90": 90.0,
+    "p99": 99.0,
+    "p99_9": 99.9,
+}
+
+
+class LatencyHistogram:
+    def __init__(self, max_value: float = 3600.0, significant_digits: int = 2):
+        '''
+        Args:
+            max_value: Highest trackable latency in seconds, larger values are clamped.
+            significant_digits: Decimal digits of precision kept for each value.
+        '''
+        self.max_value = max_value
+        self.significant_digits = significant_digits
+
+        self._max_value_us = max(int(max_value * 1e6), 2)
+        largest_value_with_single_unit = 2 * 10 ** significant_digits
+        self._sub_bucket_bits = math.ceil(math.log2(largest_value_with_single_unit))
+        self._sub_bucket_count = 1 << self._sub_bucket_bits
+        self._sub_bucket_half_count = self._sub_bucket_count >> 1
+        self._sub_bucket_mask = self._sub_bucket_count - 1
+
+        bucket_count = max(self._max_value_us.bit_length() - self._sub_bucket_bits + 1, 1)
+        self.counts = np.zeros((bucket_count + 1) * self._sub_bucket_half_count, dtype=np.int64)
+        self.total_count = 0
+
+    def _counts_index(self, values_us: np.ndarray) -> np.ndarray:
+        _, pow2ceiling = np.frexp((values_us | self._sub_bucket_mask).astype(np.float64))
+        bucket_index = pow2ceiling.astype(np.int64) - self._sub_bucket_bits
+        sub_bucket_index = values_us >> bucket_index
+        return (bucket_index + 1) * self._sub_bucket_half_count + (sub_bucket_index - self._sub_bucket_half_count)
+
+    def _highest_equivalent_values(self) -> np.ndarray:
+        '''Highest value (in microseconds) that maps to each counts index.'''
+        index = np.arange(len(self.counts), dtype=np.int64)
+        half_bits = self._sub_bucket_bits - 1
+        bucket_index = (index >> half_bits) - 1
+        sub_bucket_index = (index & (self._sub_bucket_half_count - 1)) + self._sub_bucket_half_count
+        first_bucket = bucket_index < 0
+        sub_bucket_index[first_bucket] -= self._sub_bucket_half_count
+        bucket_index[first_bucket] = 0
+        return (sub_bucket_index << bucket_index) + (1 << bucket_index) - 1
+
+    def record_values(self, values: Iterable[float], expected_interval: float = None):
+        '''
+        Record latencies in seconds.
+
+        When expected_interval is given, each value larger than the interval also
+        records the samples that would have been taken while the probe was
+        blocked (coordinated omission correction).
+        '''
+        values = np.asarray(values, dtype=np.float64)
+        # Results of earlier versions stored failed probes as -1, without a duration
+        values = values[values >= 0]
+        if expected_interval is not None and expected_interval > 0:
+            corrections = []
+            for value in values[values >= 2 * expected_interval]:
+                missing = value - expected_interval
+                while missing >= expected_interval:
+                    corrections.append(missing)
+                    missing -= expected_interval
+            if len(corrections) > 0:
+                values = np.concatenate((values, corrections))
+        if len(values) == 0:
+            return
+
+        values_us = np.clip(np.rint(values * 1e6).astype(np.int64), 0, self._max_value_us)
+        np.add.at(self.counts, self._counts_index(values_us), 1)
+        self.total_count += len(values_us)
+
+    def record_value(self, value: float, expected_interval: float = None):
+        self.record_values([value], expected_interval)
+
+    def merge(self, other: 'LatencyHistogram'):
+        '''Add counts of other histogram with the same layout.'''
+        if len(other.counts) != len(self.counts) or other.significant_digits != self.significant_digits:
+            raise ValueError("Unable to merge histograms with different layouts")
+        self.counts += other.counts
+        self.total_count += other.total_count
+        return self
+
+    def percentile(self, percentile: float) -> float:
+        '''Latency in seconds at given percentile (0-100), 0 if histogram is empty.'''
+        if self.total_count == 0:
+            return 0.0
+        target = max(math.ceil(percentile / 100 * self.total_count), 1)
+        index = int(np.searchsorted(np.cumsum(self.counts), target))
+        value = float(self._highest_equivalent_values()[index]) / 1e6
+        return min(value, self.max_value)
+
+    def percentiles(self) -> Dict[str, float]:
+        '''Latencies at reported percentiles.'''
+        return {name: self.percentile(value) for name, value in REPORTED_PERCENTILES.items()}
@@ -0,0 +1,273 @@
+'''
+Precompiled index over the scenario search space defined in ConfigFile.scenario.
+
+Each scenario type is compiled once into a template with one axis per
+parameter: the configured choices for categorical parameters, every whole
+number in range for integer numeric parameters, and a single value for fixed
+parameters. A scenario is then identified by a mixed-radix index over its axes,
+so that the space can be counted, sampled without replacement and enumerated
+without generating and rejecting duplicate scenarios.
+'''
+
+import math
+import random
+from collections import Counter
+from typing import TYPE_CHECKING, Any, Iterator, List, Optional, Set, Union
+
+from chaos_ai.models.base_scenario import Scenario, ScenarioFactory
+from chaos_ai.models.base_scenario_parameter import BaseParameter, NumericParameter
+from chaos_ai.models.config import ConfigFile
+from chaos_ai.models.custom_errors import EmptyConfigError
+from chaos_ai.utils.logger import get_module_logger
+
+if TYPE_CHECKING:
+    from chaos_ai.algorithm.bandit import ScenarioBandit
+
+logger = get_module_logger(__name__)
+
+# Parameter selecting what a scenario type disrupts
+TARGET_PARAMETERS = {
+    "pod-scenarios": "POD_LABEL",
+    "application-outages": "POD_SELECTOR",
+    "container-scenarios": "LABEL_SELECTOR",
+    "node-cpu-hog": "NODE_SELECTOR",
+    "node-memory-hog": "NODE_SELECTOR",
+}
+
+
+class ParameterAxis:
+    '''Values a single scenario parameter can take.'''
+
+    def __init__(self, parameter: BaseParameter):
+        self.name = parameter.name
+        self.parameter = parameter
+        self.values: Optional[List[Any]] = None
+        self.low: Optional[int] = None
+
+        possible_values = getattr(parameter, "possible_values", None)
+        if possible_values:
+            # Preserve configured order, drop duplicates
+            self.values = list(dict.fromkeys(possible_values))
+            self.size = len(self.values)
+        elif isinstance(parameter, NumericParameter):
+            domain_size = parameter.domain_size()
+            if math.isinf(domain_size):
+                # Real valued parameter, drawn at random when a scenario is built
+                self.size = None
+            else:
+                self.low = math.ceil(parameter.min_value)
+                self.size = int(domain_size)
+        else:
+            self.values = [parameter.value]
+            self.size = 1
+
+    @property
+    def continuous(self) -> bool:
+        return self.size is None
+
+    def value_at(self, digit: int) -> Any:
+        if self.values is not None:
+            return self.values[digit]
+        return self.low + digit
+
+    def random_value(self) -> Any:
+        return self.parameter.random_value()
+
+
+class ScenarioTemplate:
+    '''Index over all scenarios of a single scenario type.'''
+
+    def __init__(self, prototype: Scenario):
+        self.name = prototype.name
+        self.prototype = prototype
+        self.axes = [ParameterAxis(parameter) for parameter in prototype.parameters]
+        self.discrete_size = math.prod(axis.size for axis in self.axes if not axis.continuous)
+        self._drawn: Set[int] = set()
+
+        # Axis of the target parameter, with index stride and drawn count per target value
+        self.target_axis: Optional[ParameterAxis] = None
+        self._target_stride = 1
+        self._target_drawn: Counter = Counter()
+        for axis in self.axes:
+            if axis.name == TARGET_PARAMETERS.get(self.name) and axis.values is not None:
+                self.target_axis = axis
+                break
+            if not axis.continuous:
+                self._target_stride *= axis.size
+
+    @property
+    def cardinality(self) -> Union[int, float]:
+        if any(axis.continuous for axis in self.axes):
+            return float("inf")
+        return self.discrete_size
+
+    @property
+    def remaining(self) -> Union[int, float]:
+        '''Scenarios not drawn yet.'''
+        return self.cardinality - len(self._drawn)
+
+    def scenario_at(self, index: int) -> Scenario:
+        '''Decode mixed-radix index into a scenario, first parameter is the least significant digit.'''
+        scenario = self.prototype.model_copy(deep=True)
+        for axis, parameter in zip(self.axes, scenario.parameters):
+            if axis.continuous:
+                parameter.value = axis.random_value()
+            else:
+                index, digit = divmod(index, axis.size)
+                parameter.value = axis.value_at(digit)
+        return scenario
+
+    def index_of(self, scenario: Scenario) -> Optional[int]:
+        '''Index of scenario with given values, None if a value is outside the space.'''
+        index = 0
+        multiplier = 1
+        for axis, parameter in zip(self.axes, scenario.parameters):
+            if axis.continuous:
+                continue
+            if axis.values is not None:
+                if parameter.value not in axis.values:
+                    return None
+                digit = axis.values.index(parameter.value)
+            else:
+                digit = parameter.value - axis.low
+                if not 0 <= digit < axis.size:
+                    return None
+            index += digit * multiplier
+            multiplier *= axis.size
+        return index
+
+    def target_remaining(self, digit: int) -> Union[int, float]:
+        '''Scenarios not drawn yet with given value of the target axis.'''
+        if math.isinf(self.cardinality):
+            return self.cardinality
+        return self.discrete_size // self.target_axis.size - self._target_drawn[digit]
+
+    def draw(self, target: Optional[int] = None) -> Optional[int]:
+        '''
+        Uniformly draw an index which was not drawn before, None once exhausted.
+        With target, only indices with that value of the target axis are drawn.
+        '''
+        if target is None:
+            size = self.discrete_size
+            drawn = len(self._drawn)
+
+            def to_index(rank: int) -> int:
+                return rank
+        else:
+            size = self.discrete_size // self.target_axis.size
+            drawn = self._target_drawn[target]
+            stride = self._target_stride
+            radix = self.target_axis.size
+
+            def to_index(rank: int) -> int:
+                # Insert target digit into rank within the sub space
+                return rank % stride + stride * (target + radix * (rank // stride))
+
+        if math.isinf(self.cardinality):
+            # Real valued parameters make every scenario distinct, discrete part may repeat
+            return to_index(random.randrange(size))
+        if size - drawn <= 0:
+            return None
+
+        if size <= 2 * drawn:
+            # Space is mostly drawn, pick among remaining indices directly
+            index = random.choice([
+                to_index(rank) for rank in range(size) if to_index(rank) not in self._drawn
+            ])
+        else:
+            # Rejection is cheap while less than half of the space is drawn
+            index = to_index(random.randrange(size))
+            while index in self._drawn:
+                index = to_index(random.randrange(size))
+        self._add(index)
+        return index
+
+    def _add(self, index: int):
+        if index in self._drawn:
+            return
+        self._drawn.add(index)
+        if self.target_axis is not None:
+            self._target_drawn[(index // self._target_stride) % self.target_axis.size] += 1
+
+    def mark_drawn(self, scenario: Scenario):
+        index = self.index_of(scenario)
+        if index is not None:
+            self._add(index)
+
+
+class SearchSpace:
+    '''Search space of all configured scenario types.'''
+
+    def __init__(self, config: ConfigFile):
+        self.templates: List[ScenarioTemplate] = []
+        for name, section in ScenarioFactory.available_scenarios(config).items():
+            try:
+                prototype = ScenarioFactory.create_scenario(name, section)
+            except Exception as error:
+                logger.error("Unable to generate scenario %s: %s", name, error)
+                continue
+            ScenarioFactory.apply_parameter_ranges(prototype, config.parameter_ranges)
+            self.templates.append(ScenarioTemplate(prototype))
+
+        if len(self.templates) == 0:
+            raise EmptyConfigError(
+                "No scenarios found. Please provide atleast 1 scenario."
+            )
+
+    @property
+    def cardinality(self) -> Union[int, float]:
+        '''Total number of distinct scenarios, infinite when a parameter is real valued.'''
+        return sum(template.cardinality for template in self.templates)
+
+    @property
+    def remaining(self) -> Union[int, float]:
+        return sum(template.remaining for template in self.templates)
+
+    def describe(self) -> str:
+        return ", ".join(f"{template.name}: {template.cardinality}" for template in self.templates)
+
+    def sample(self, count: int, bandit: Optional["ScenarioBandit"] = None) -> List[Scenario]:
+        '''
+        Sample up to count scenarios that were not sampled before. Scenario type is
+        picked among types with remaining scenarios, uniformly or by bandit, then
+        scenario is drawn uniformly within the type (and bandit's target value).
+        Returns fewer scenarios once the space is exhausted.
+        '''
+        scenarios = []
+        while len(scenarios) < count:
+            templates = {
+                template.name: template for template in self.templates if template.remaining > 0
+            }
+            if len(templates) == 0:
+                break
+            if bandit is None:
+                template = random.choice(list(templates.values()))
+            else:
+                template = templates[bandit.choose_type(list(templates))]
+
+            target = None
+            if bandit is not None and template.target_axis is not None:
+                axis = template.target_axis
+                values = [
+                    value for digit, value in enumerate(axis.values)
+                    if template.target_remaining(digit) > 0
+                ]
+                value = bandit.choose_target(template.name, values)
+                if value is not None:
+                    target = axis.values.index(value)
+            scenarios.append(template.scenario_at(template.draw(target)))
+        return scenarios
+
+    def mark_drawn(self, scenario: Scenario):
+        '''Exclude scenario from future samples, e.g. when it was produced by evolution.'''
+        for template in self.templates:
+            if template.name == scenario.name:
+                template.mark_drawn(scenario)
+
+    def enumerate(self) -> Iterator[Scenario]:
+        '''Every scenario of the space, only possible for finite spaces.'''
+        if math.isinf(self.cardinality):
+            raise ValueError("Search space with real valued parameters can not be enumerated.")
+        for template in self.templates:
+            for index in range(template.cardinality):
+                yield template.scenario_at(index)
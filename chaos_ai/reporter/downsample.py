@@ -0,0 +1,68 @@
+'''
+Downsampling helpers used to keep health check graphs readable and cheap
+to render regardless of how long a scenario runs.
+'''
+
+from typing import Tuple
+
+import numpy as np
+
+# Bucket widths (in seconds) considered for time bucketing, smallest fitting one is used
+NICE_BUCKET_WIDTHS = [1, 2, 5, 10, 15, 30, 60, 120, 300, 600, 900, 1800, 3600, 7200, 21600, 43200, 86400]
+
+
+def lttb(x: np.ndarray, y: np.ndarray, threshold: int) -> Tuple[np.ndarray, np.ndarray]:
+    '''
+    Largest-Triangle-Three-Buckets downsampling.
+
+    Keeps first and last points, and from each bucket in between selects the
+    point forming the largest triangle with the previously selected point and
+    the average of the next bucket, which preserves peaks and overall shape.
+    '''
+    length = len(x)
+    if threshold >= length or threshold < 3:
+        return x, y
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = length - 1
+
+    # Bucket boundaries for all points except first and last
+    edges = np.linspace(1, length - 1, threshold - 1).astype(np.int64)
+    previous = 0
+    for i in range(threshold - 2):
+        start, end = edges[i], max(edges[i + 1], edges[i] + 1)
+
+        # Average of next bucket, or the last point for the final bucket
+        if i + 2 < len(edges):
+            next_start, next_end = edges[i + 1], max(edges[i + 2], edges[i + 1] + 1)
+            avg_x = x[next_start:next_end].mean()
+            avg_y = y[next_start:next_end].mean()
+        else:
+            avg_x, avg_y = x[-1], y[-1]
+
+        areas = np.abs(
+            (x[previous] - avg_x) * (y[start:end] - y[previous])
+            - (x[previous] - x[start:end]) * (avg_y - y[previous])
+        )
+        previous = start + int(np.argmax(areas))
+        selected[i + 1] = previous
+
+    return x[selected], y[selected]
+
+
+def bucket_width(duration: float, max_buckets: int) -> int:
+    '''Smallest nice bucket width (in seconds) that fits duration in max_buckets.'''
+    for width in NICE_BUCKET_WIDTHS:
+        if duration / width < max_buckets:
+            return width
+    return int(np.ceil(duration / max_buckets))
+
+
+def bucket_mean(timestamps: np.ndarray, values: np.ndarray, start: float, width: float, count: int) -> np.ndarray:
+    '''Mean of values in each fixed width time bucket, NaN for empty buckets.'''
+    index = np.clip(((timestamps - start) // width).astype(np.int64), 0, count - 1)
+    sums = np.bincount(index, weights=values, minlength=count)
+    counts = np.bincount(index, minlength=count)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
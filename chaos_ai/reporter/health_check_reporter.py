@@ -1,53 +1,207 @@
 import os
+import multiprocessing
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
 from datetime import datetime
-import pandas as pd
+import numpy as np
 
-import seaborn as sns
-import matplotlib.pyplot as plt
-from matplotlib.colors import LinearSegmentedColormap, ListedColormap
-from matplotlib.dates import DateFormatter
-from matplotlib.ticker import MaxNLocator
-
-from typing import List
+from typing import TYPE_CHECKING, Deque, Dict, List, Optional, Tuple
 
 from chaos_ai.models.app import CommandRunResult
+from chaos_ai.models.health_check_samples import HealthCheckBaseline
+from chaos_ai.reporter.downsample import bucket_mean, bucket_width, lttb
 from chaos_ai.utils.logger import get_module_logger
 
+# pandas, seaborn and matplotlib are imported on first use, since they take
+# seconds to load and are not needed when plots are disabled
+if TYPE_CHECKING:
+    import pandas as pd
+
 logger = get_module_logger(__name__)
 
+# Renders allowed to wait in queue for each worker before plot_report blocks
+MAX_PENDING_PLOTS_PER_WORKER = 4
+
+FIGURE_SIZE = (15, 10)  # in inches
+LINE_POINTS_PER_PIXEL = 0.5  # Response time points drawn per horizontal pixel
+MAX_MARKERS = 200  # Draw point markers only for sparse lines
+MAX_HEATMAP_BUCKETS = 120  # Max time buckets (columns) in success heatmap
+
+
+def to_local_datetime(timestamps: np.ndarray) -> 'pd.DatetimeIndex':
+    '''Convert unix epoch seconds to naive local datetimes.'''
+    import pandas as pd
+
+    utc_offset = datetime.now().astimezone().utcoffset().total_seconds()
+    return pd.to_datetime(timestamps + utc_offset, unit='s')
+
+
+def format_elapsed(seconds: float) -> str:
+    '''Format elapsed seconds as mm:ss, or h:mm:ss for longer scenarios.'''
+    seconds = int(seconds)
+    hours, remainder = divmod(seconds, 3600)
+    minutes, seconds = divmod(remainder, 60)
+    if hours > 0:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+def render_plot(scenario_id: int, samples: List[Tuple], save_path: str, dpi: int):
+    '''
+    Render health check graph for a scenario. Runs in a worker process, so it
+    only receives compact sample arrays: (name, wall timestamps, response times, success).
+
+    Response times are downsampled to the horizontal pixel budget of the graph and
+    success is binned into adaptive time buckets, so rendering cost and image
+    size don't grow with scenario length.
+    '''
+    start = min(float(wall_timestamps[0]) for _, wall_timestamps, _, _ in samples if len(wall_timestamps) > 0)
+    end = max(float(wall_timestamps[-1]) for _, wall_timestamps, _, _ in samples if len(wall_timestamps) > 0)
+    duration = max(end - start, 1.0)
+    time_format = '%H:%M:%S' if duration >= 3600 else '%M:%S'
+    point_budget = int(FIGURE_SIZE[0] * dpi * LINE_POINTS_PER_PIXEL)
+
+    import matplotlib
+    matplotlib.use("Agg")
+    import pandas as pd
+    import seaborn as sns
+    import matplotlib.pyplot as plt
+    from matplotlib.colors import LinearSegmentedColormap
+    from matplotlib.dates import DateFormatter
+    from matplotlib.ticker import MaxNLocator
+
+    # Create larger figure with better proportions
+    fig, axes = plt.subplots(2, 1, figsize=FIGURE_SIZE)
+
+    try:
+        # Set main title for the entire plot
+        fig.suptitle(f'Health Check Results - Scenario {scenario_id}', fontsize=16, fontweight='bold')
+
+        # Plot 1: Line plot for response time
+        palette = sns.color_palette(n_colors=len(samples))
+        for color, (name, wall_timestamps, response_times, _) in zip(palette, samples):
+            # Results of earlier versions stored failed probes as -1, without a duration
+            responded = response_times >= 0
+            x, y = lttb(
+                wall_timestamps[responded].astype(np.float64),
+                response_times[responded].astype(np.float64),
+                point_budget // max(len(samples), 1),
+            )
+            axes[0].plot(
+                to_local_datetime(x), y,
+                label=name,
+                color=color,
+                marker="o" if len(x) <= MAX_MARKERS else None,
+                markersize=3,
+                linewidth=1,
+            )
+
+        # Format line plot result
+        axes[0].xaxis.set_major_locator(MaxNLocator())
+        axes[0].xaxis.set_major_formatter(DateFormatter(time_format))
+        axes[0].set_title("Response Time per Application Over Time", fontsize=14)
+        axes[0].set_xlabel("Time (%s)" % ("hh:mm:ss" if duration >= 3600 else "mm:ss"), fontsize=12)
+        axes[0].set_ylabel("Response Time (s)", fontsize=12)
+        axes[0].tick_params(axis='x', rotation=45, labelsize=10)
+        axes[0].grid(True, alpha=0.3)
+        axes[0].legend(title="application")
+
+        # Plot 2: Heatmap for success, binned into adaptive time buckets
+        width = bucket_width(duration, MAX_HEATMAP_BUCKETS)
+        bucket_count = int(duration // width) + 1
+        pivot = pd.DataFrame(
+            [
+                bucket_mean(wall_timestamps, success.astype(np.float64), start, width, bucket_count)
+                for _, wall_timestamps, _, success in samples
+            ],
+            index=pd.Index([name for name, _, _, _ in samples], name="application"),
+            columns=[format_elapsed(i * width) for i in range(bucket_count)],
+        )
+        green_white = LinearSegmentedColormap.from_list("green_red", ["red", "green"])
+        sns.heatmap(
+            pivot, cmap=green_white, vmin=0, vmax=1, cbar=True, ax=axes[1],
+            linewidths=0.3 if bucket_count <= 60 else 0, linecolor='gray', annot=False
+        )
+        axes[1].set_title("Success per Application Over Time (%ds buckets)" % width, fontsize=14)
+        axes[1].set_xlabel("Elapsed Time", fontsize=12)
+        axes[1].set_ylabel("Application", fontsize=12)
+        axes[1].tick_params(axis='x', rotation=45, labelsize=10)
+        axes[1].tick_params(axis='y', labelsize=10)
+        axes[1].xaxis.set_major_locator(MaxNLocator())
+
+        fig.tight_layout()
+
+        fig.savefig(save_path, dpi=dpi)
+    finally:
+        # Release figure memory, since worker processes are reused across scenarios
+        plt.close(fig)
+
+    return save_path
+
+
 class HealthCheckReporter:
-    def __init__(self, output_dir: str):
+    def __init__(
+        self,
+        output_dir: str,
+        plots_enabled: bool = True,
+        plot_dpi: int = 300,
+        plot_format: str = "png",
+        plot_workers: int = 2,
+    ):
         self.output_dir = os.path.join(output_dir, "reports")
         os.makedirs(self.output_dir, exist_ok=True)
+        self.plots_enabled = plots_enabled
+        self.plot_dpi = plot_dpi
+        self.plot_format = plot_format
+        self.plot_workers = plot_workers
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._pending: Deque[Future] = deque()
 
-    def save_report(self, fitness_results: List[CommandRunResult]):
+    def save_report(
+        self,
+        fitness_results: List[CommandRunResult],
+        baselines: Dict[str, HealthCheckBaseline] = None,
+    ):
         logger.debug("Saving health check report")
         results = []
 
         for fitness_result in fitness_results:
-            health_check_results = fitness_result.health_check_results.values()
             scenario_id = fitness_result.scenario_id
-            
-            for component_results in health_check_results:
-                if len(component_results) == 0:
+
+            for series in fitness_result.health_check_samples:
+                if len(series) == 0:
                     break
-                component_name = component_results[0].name
-                min_response_time = min([result.response_time for result in component_results])
-                max_response_time = max([result.response_time for result in component_results])
-                average_response_time = sum([result.response_time for result in component_results]) / len(component_results)
-                success_count = sum([result.success for result in component_results])
-                failure_count = len(component_results) - success_count
+                response_times = series.response_times
+                success_count = int(np.count_nonzero(series.success))
+                percentiles = series.latency_histogram().percentiles()
+
+                # Degradation relative to steady state measured between scenarios
+                baseline = (baselines or {}).get(series.url)
+                baseline_p99 = baseline.percentile(99.0) if baseline is not None else None
+                baseline_success_rate = baseline.success_rate if baseline is not None else None
+                success_rate = success_count / len(series)
 
                 results.append({
                     "scenario_id": scenario_id,
-                    "component_name": component_name,
-                    "min_response_time": min_response_time,
-                    "max_response_time": max_response_time,
-                    "average_response_time": average_response_time,
+                    "component_name": series.name,
+                    "min_response_time": float(response_times.min()),
+                    "max_response_time": float(response_times.max()),
+                    "average_response_time": float(response_times.mean(dtype=np.float64)),
+                    **{f"{name}_response_time": value for name, value in percentiles.items()},
                     "success_count": success_count,
-                    "failure_count": failure_count,
+                    "failure_count": len(series) - success_count,
+                    "missed_slots": series.missed_slots,
+                    "success_rate": success_rate,
+                    "baseline_success_rate": baseline_success_rate,
+                    "baseline_p99_response_time": baseline_p99,
+                    "p99_degradation": (
+                        (percentiles["p99"] - baseline_p99) / baseline_p99
+                        if baseline_p99 else None
+                    ),
                 })
 
+        import pandas as pd
+
         data = pd.DataFrame(results)
         report_path = os.path.join(self.output_dir, "health_check_report.csv")
         data.to_csv(report_path, index=False)
@@ -55,62 +209,57 @@ class HealthCheckReporter:
 
 
     def plot_report(self, result: CommandRunResult):
-        if len(result.health_check_results) == 0:
+        '''Queue health check graph of a scenario for rendering in background.'''
+        if not self.plots_enabled:
+            return
+
+        if sum(len(series) for series in result.health_check_samples) == 0:
             logger.debug("No health check results to plot")
             return
 
         logger.debug("Plotting health check result")
         output_dir = os.path.join(self.output_dir, "graphs")
         os.makedirs(output_dir, exist_ok=True)
-        save_path = os.path.join(output_dir, "scenario_%d.png" % result.scenario_id)
-
-        # Flatten the data
-        records = []
-        for _, health_check_results in result.health_check_results.items():
-            for health_check_result in health_check_results:
-                records.append({
-                    "application": health_check_result.name,
-                    "timestamp": pd.to_datetime(health_check_result.timestamp),
-                    "response_time": health_check_result.response_time,
-                    "success": 1 if health_check_result.success else 0,
-                })
-        df = pd.DataFrame(records)
-        df = df.sort_values("timestamp")
-        
-        # Create formatted timestamp strings for display
-        df['timestamp_str'] = df['timestamp'].dt.strftime('%M:%S')
-        
-        # Create larger figure with better proportions
-        fig, axes = plt.subplots(2, 1, figsize=(15, 10))
-        
-        # Set main title for the entire plot
-        fig.suptitle(f'Health Check Results - Scenario {result.scenario_id}', fontsize=16, fontweight='bold')
-        
-        # Plot 1: Line plot for response time
-        sns.lineplot(data=df, x="timestamp", y="response_time", hue="application", marker="o", ax=axes[0])
-        
-        # Format line plot result
-        axes[0].xaxis.set_major_locator(MaxNLocator())
-        axes[0].xaxis.set_major_formatter(DateFormatter('%M:%S'))
-        axes[0].set_title("Response Time per Application Over Time", fontsize=14)
-        axes[0].set_xlabel("Time (mm:ss)", fontsize=12)
-        axes[0].set_ylabel("Response Time (s)", fontsize=12)
-        axes[0].tick_params(axis='x', rotation=45, labelsize=10)
-        axes[0].grid(True, alpha=0.3)
-        
-        # Plot 2: Heatmap for success
-        green_white = LinearSegmentedColormap.from_list("green_red", ["red", "green"])
-        pivot = df.pivot_table(index="application", columns="timestamp_str", values="success", fill_value=1)
-        sns.heatmap(pivot, cmap=green_white, cbar=True, ax=axes[1], linewidths=0.3, linecolor='gray', annot=False)
-        axes[1].set_title("Success per Application Over Time", fontsize=14) 
-        # axes[1].set_xlabel("Time (mm:ss)", fontsize=12)
-        axes[1].set_ylabel("Application", fontsize=12)
-        axes[1].tick_params(axis='x', rotation=45, labelsize=10)
-        axes[1].tick_params(axis='y', labelsize=10)
-        axes[1].xaxis.set_major_locator(MaxNLocator())
+        save_path = os.path.join(output_dir, "scenario_%d.%s" % (result.scenario_id, self.plot_format))
+
+        samples = [
+            (series.name, series.wall_timestamps, series.response_times, series.success)
+            for series in result.health_check_samples
+            if len(series) > 0
+        ]
+
+        if self._executor is None:
+            # Spawn workers, since forking would copy running watcher and logging threads
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.plot_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        # Bound number of queued renders, so that samples don't pile up in memory
+        while len(self._pending) >= MAX_PENDING_PLOTS_PER_WORKER * self.plot_workers:
+            self._collect(self._pending.popleft())
+
+        self._pending.append(self._executor.submit(
+            render_plot,
+            result.scenario_id,
+            samples,
+            save_path,
+            self.plot_dpi,
+        ))
 
-        plt.tight_layout()
-        
-        plt.savefig(save_path, dpi=300)
+    def _collect(self, future: Future):
+        try:
+            save_path = future.result()
+            logger.debug("Health check graph saved to %s", save_path)
+        except Exception as error:
+            logger.error("Unable to plot health check results: %s", error)
 
-        logger.debug("Health check graph saved to %s", save_path)
+    def wait(self):
+        '''Wait for queued graphs to be rendered and release worker processes.'''
+        if len(self._pending) > 0:
+            logger.info("Waiting for %d health check graphs to render", len(self._pending))
+        while len(self._pending) > 0:
+            self._collect(self._pending.popleft())
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
@@ -0,0 +1,141 @@
+'''
+Append-only ledger of scenario results for a single run.
+
+Results are written to a SQLite database (results.db) in the output directory as
+soon as they are available, indexed by generation, scenario fingerprint and fitness.
+The per-scenario JSON/YAML files and log files are only produced on request by
+the exporter.
+'''
+
+import os
+import json
+import sqlite3
+import threading
+from typing import Dict, Iterator, List
+
+from chaos_ai.models.app import CommandRunResult
+from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.serialization import dump_data, model_to_json
+
+logger = get_module_logger(__name__)
+
+LEDGER_FILE_NAME = "results.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    scenario_id INTEGER PRIMARY KEY,
+    generation_id INTEGER NOT NULL,
+    fingerprint TEXT NOT NULL,
+    scenario TEXT NOT NULL,
+    fitness_score REAL NOT NULL,
+    returncode INTEGER,
+    start_time TEXT NOT NULL,
+    end_time TEXT NOT NULL,
+    result TEXT NOT NULL,
+    log TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_results_generation ON results (generation_id);
+CREATE INDEX IF NOT EXISTS idx_results_fingerprint ON results (fingerprint);
+CREATE INDEX IF NOT EXISTS idx_results_fitness ON results (fitness_score);
+"""
+
+
+class RunLedger:
+    def __init__(self, output_dir: str):
+        self.output_dir = output_dir
+        os.makedirs(output_dir, exist_ok=True)
+        self.path = os.path.join(output_dir, LEDGER_FILE_NAME)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.row_factory = sqlite3.Row
+        # WAL keeps appends cheap and lets readers inspect the ledger during a run
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(SCHEMA)
+
+    def append(self, result: CommandRunResult):
+        '''Append scenario result to the ledger.'''
+        with self._lock, self._connection:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO results "
+                "(scenario_id, generation_id, fingerprint, scenario, fitness_score, returncode, start_time, end_time, result, log) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    result.scenario_id,
+                    result.generation_id,
+                    result.scenario.fingerprint(),
+                    str(result.scenario),
+                    result.fitness_result.fitness_score,
+                    result.returncode,
+                    result.start_time.isoformat(),
+                    result.end_time.isoformat(),
+                    model_to_json(result, compact=True, exclude={'log'}),
+                    result.log,
+                )
+            )
+
+    def rows(self, order_by: str = "scenario_id") -> Iterator[sqlite3.Row]:
+        with self._lock:
+            rows = self._connection.execute(f"SELECT * FROM results ORDER BY {order_by}").fetchall()
+        return iter(rows)
+
+    def result(self, scenario_id: int) -> Dict:
+        '''Serialized result of a scenario, without its log.'''
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT result FROM results WHERE scenario_id = ?", (scenario_id,)
+            ).fetchone()
+        if row is None:
+            raise KeyError(scenario_id)
+        return json.loads(row["result"])
+
+    def top_scenarios(self, count: int) -> List[Dict]:
+        '''
+        Scenarios with the highest mean fitness score over their runs, as
+        {"result", "fitness_score", "runs"} with the latest result of each.
+        Skipped scenarios are not included.
+        '''
+        with self._lock:
+            rows = self._connection.execute(
+                "SELECT r.result, s.fitness_score, s.runs FROM ("
+                "  SELECT fingerprint, AVG(fitness_score) AS fitness_score, COUNT(*) AS runs,"
+                "  MAX(scenario_id) AS scenario_id"
+                "  FROM results WHERE returncode IS NULL OR returncode != -1 GROUP BY fingerprint"
+                ") s JOIN results r ON r.scenario_id = s.scenario_id "
+                "ORDER BY s.fitness_score DESC LIMIT ?", (count,)
+            ).fetchall()
+        return [
+            {"result": json.loads(row["result"]), "fitness_score": row["fitness_score"], "runs": row["runs"]}
+            for row in rows
+        ]
+
+    def export_files(self, format: str = 'yaml', compact: bool = False):
+        '''Export per-scenario result and log files (generation_N/scenario_X.format, logs/scenario_X.log).'''
+        logger.info("Exporting scenario results to %s files", format)
+        log_dir = os.path.join(self.output_dir, 'logs')
+        os.makedirs(log_dir, exist_ok=True)
+
+        for row in self.rows():
+            result = json.loads(row["result"])
+            # Convert scenario to string representation and replace it in scenario.name
+            result['scenario']['name'] = row["scenario"]
+            result['job_id'] = row["scenario_id"]
+
+            # Store log in a log file and update log location
+            log_save_path = os.path.join(log_dir, "scenario_%s.log" % row["scenario_id"])
+            with open(log_save_path, 'w', encoding='utf-8') as f:
+                f.write(row["log"] or "")
+            result['log'] = log_save_path
+
+            output_dir = os.path.join(self.output_dir, format, "generation_%s" % row["generation_id"])
+            os.makedirs(output_dir, exist_ok=True)
+            with open(
+                os.path.join(output_dir, "scenario_%s.%s" % (row["scenario_id"], format)),
+                "w",
+                encoding="utf-8"
+            ) as file_handler:
+                dump_data(result, file_handler, format, compact=compact)
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
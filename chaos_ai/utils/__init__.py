@@ -2,9 +2,10 @@ import shlex
 import subprocess
 from typing import Iterator
 
-from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.logger import SUBPROCESS_LOGGER_NAME, get_module_logger
 
 logger = get_module_logger(__name__)
+subprocess_logger = get_module_logger(SUBPROCESS_LOGGER_NAME)
 
 
 def id_generator() -> Iterator[int]:
@@ -14,20 +15,26 @@ def id_generator() -> Iterator[int]:
         i += 1
 
 
-def run_shell(command, do_not_log=False):
+def run_shell(command, do_not_log=False, on_start=None):
     '''
     Run shell command and get logs and statuscode in output.
+
+    on_start is called with the running process, so that callers can
+    terminate it before it completes on its own.
     '''
     logger.debug("Running command: %s", command)
-    logs = ""
+    logs = []
     command = shlex.split(command)
     process = subprocess.Popen(
         command, stdout=subprocess.PIPE, stderr=subprocess.STDOUT, text=True
     )
+    if on_start is not None:
+        on_start(process)
     for line in process.stdout:
         if not do_not_log:
-            logger.debug("%s", line.rstrip())
-        logs += line
+            # Queued for the logging thread, console output is rate limited
+            subprocess_logger.debug("%s", line.rstrip())
+        logs.append(line)
     process.wait()
     logger.debug("Run Status: %d", process.returncode)
-    return logs, process.returncode
+    return "".join(logs), process.returncode
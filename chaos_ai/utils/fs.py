@@ -1,8 +1,8 @@
 import os
-import yaml
 
 from chaos_ai.models.config import ConfigFile
 from chaos_ai.utils.logger import get_module_logger
+from chaos_ai.utils.serialization import load_yaml
 
 logger = get_module_logger(__name__)
 
@@ -25,7 +25,7 @@ def read_config_from_file(file_path: str, param: list[str] = None) -> ConfigFile
         ConfigFile: Config file object
     """
     with open(file_path, "r", encoding="utf-8") as stream:
-        config = yaml.safe_load(stream)
+        config = load_yaml(stream)
     if param:
         # Keep track of parameters in config file
         config['parameters'] = {}
@@ -1,5 +1,42 @@
-import click
+'''
+Logging setup for Chaos AI.
+
+Log records are put on a queue by a single QueueHandler attached to the
+package logger, and written to the console (and per-scenario log files) by a
+QueueListener thread, so runners and watcher threads never block on I/O.
+'''
+
+import os
+import time
+import queue
+import atexit
 import logging
+import threading
+import contextvars
+from contextlib import contextmanager
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, Optional, TextIO
+
+ROOT_LOGGER_NAME = "chaos_ai"
+
+# Logger used for output of subprocesses (krknctl, podman), rate limited on console
+SUBPROCESS_LOGGER_NAME = "chaos_ai.subprocess"
+
+LOG_FORMAT = '%(asctime)s %(name)-12s %(levelname)-8s %(message)s'
+
+# Subprocess lines allowed on console per second, and burst allowance
+SUBPROCESS_CONSOLE_RATE = 20
+SUBPROCESS_CONSOLE_BURST = 100
+
+# Scenario ID of the currently running scenario, stamped on each log record
+current_scenario_id: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar(
+    "current_scenario_id", default=None
+)
+
+_lock = threading.Lock()
+_queue: "queue.Queue[logging.LogRecord]" = queue.Queue(-1)
+_listener: Optional[QueueListener] = None
+
 
 def verbosity_to_level(verbosity: int) -> int:
     if verbosity == 0:
@@ -7,23 +44,161 @@ def verbosity_to_level(verbosity: int) -> int:
     else:
         return logging.DEBUG
 
+
+class ScenarioContextFilter(logging.Filter):
+    '''Stamps log records with the ID of the scenario being run.'''
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.scenario_id = current_scenario_id.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    '''
+    Token bucket limiting console output of subprocess logs. Other loggers are
+    never limited. Number of dropped lines is reported on the next line shown.
+    '''
+
+    def __init__(self, rate: float = SUBPROCESS_CONSOLE_RATE, burst: int = SUBPROCESS_CONSOLE_BURST):
+        super().__init__()
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._suppressed = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if not record.name.startswith(SUBPROCESS_LOGGER_NAME):
+            return True
+
+        now = time.monotonic()
+        self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+        self._updated = now
+        if self._tokens < 1:
+            self._suppressed += 1
+            return False
+
+        self._tokens -= 1
+        if self._suppressed > 0:
+            record.msg = "(%d lines suppressed) %s" % (self._suppressed, record.getMessage())
+            record.args = None
+            self._suppressed = 0
+        return True
+
+
+class ScenarioFileHandler(logging.Handler):
+    '''Writes records stamped with a scenario ID to <log_dir>/scenario_<id>.log.'''
+
+    def __init__(self, log_dir: str):
+        super().__init__(logging.DEBUG)
+        self.log_dir = log_dir
+        os.makedirs(log_dir, exist_ok=True)
+        self._files: Dict[int, TextIO] = {}
+
+    def emit(self, record: logging.LogRecord):
+        scenario_id = getattr(record, "scenario_id", None)
+        if scenario_id is None:
+            return
+        try:
+            stream = self._files.get(scenario_id)
+            if stream is None:
+                # Only the latest scenario is written to, close files of earlier ones
+                self._close_files()
+                stream = open(
+                    os.path.join(self.log_dir, "scenario_%d.log" % scenario_id), "a", encoding="utf-8"
+                )
+                self._files[scenario_id] = stream
+            stream.write(self.format(record) + "\n")
+            stream.flush()
+        except Exception:
+            self.handleError(record)
+
+    def _close_files(self):
+        for stream in self._files.values():
+            stream.close()
+        self._files = {}
+
+    def close(self):
+        self._close_files()
+        super().close()
+
+
+def setup_logging(level: int = logging.INFO, scenario_log_dir: Optional[str] = None):
+    '''
+    Configure the logging pipeline. Safe to call multiple times, each call
+    replaces the console level and per-scenario log directory.
+
+    Args:
+        level: Console log level
+        scenario_log_dir: Directory for per-scenario log files, disabled if None
+    '''
+    global _listener
+
+    with _lock:
+        root = logging.getLogger(ROOT_LOGGER_NAME)
+        if not any(isinstance(handler, QueueHandler) for handler in root.handlers):
+            queue_handler = QueueHandler(_queue)
+            queue_handler.addFilter(ScenarioContextFilter())
+            root.addHandler(queue_handler)
+            root.propagate = False
+
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+
+        formatter = logging.Formatter(LOG_FORMAT)
+        console = logging.StreamHandler()
+        console.setLevel(level)
+        console.setFormatter(formatter)
+        console.addFilter(RateLimitFilter())
+        handlers = [console]
+
+        if scenario_log_dir is not None:
+            scenario_files = ScenarioFileHandler(scenario_log_dir)
+            scenario_files.setFormatter(formatter)
+            handlers.append(scenario_files)
+            # Scenario log files keep debug output regardless of console level
+            root.setLevel(logging.DEBUG)
+        else:
+            root.setLevel(level)
+
+        _listener = QueueListener(_queue, *handlers, respect_handler_level=True)
+        _listener.start()
+
+
+def shutdown_logging():
+    '''Flush queued records and stop the listener thread.'''
+    global _listener
+    with _lock:
+        if _listener is not None:
+            _listener.stop()
+            for handler in _listener.handlers:
+                handler.close()
+            _listener = None
+
+
+atexit.register(shutdown_logging)
+
+
+@contextmanager
+def scenario_logging(scenario_id: int):
+    '''Route log records emitted within the block to the scenario's log file.'''
+    token = current_scenario_id.set(scenario_id)
+    try:
+        yield
+    finally:
+        current_scenario_id.reset(token)
+
+
 def get_module_logger(mod_name):
     '''Main Logging module'''
-    try:
-        ctx = click.get_current_context()
-    except RuntimeError:
-        ctx = None
-
-    logger = logging.getLogger(mod_name)
-    handler = logging.StreamHandler()
-    formatter = logging.Formatter(
-        '%(asctime)s %(name)-12s %(levelname)-8s %(message)s')
-    handler.setFormatter(formatter)
-    logger.addHandler(handler)
-    
-    if ctx:
-        logger.setLevel(ctx.obj.verbose)
-    else:
-        logger.setLevel(logging.INFO)
+    # Pipeline is set up with defaults until the CLI configures it
+    if _listener is None:
+        setup_logging()
 
-    return logger
+    # Loggers don't get handlers of their own, records propagate to the package
+    # logger's queue handler, so repeated calls never duplicate messages
+    if mod_name == ROOT_LOGGER_NAME or mod_name.startswith(ROOT_LOGGER_NAME + "."):
+        return logging.getLogger(mod_name)
+    return logging.getLogger("%s.%s" % (ROOT_LOGGER_NAME, mod_name))
@@ -0,0 +1,60 @@
+'''
+Serialization helpers for configs and results.
+
+- YAML uses the libyaml C loader/dumper when PyYAML is built with it.
+- Pydantic models are dumped to JSON by pydantic-core, which handles
+  datetimes, enums and computed fields natively.
+- Compact mode drops indentation (and uses YAML flow style) for output that is
+  consumed by machines rather than read by people.
+'''
+
+import json
+from typing import IO, Any, Optional
+
+import yaml
+from pydantic import BaseModel
+
+# Prefer libyaml bindings, falling back to pure Python implementation
+YamlLoader = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+YamlDumper = getattr(yaml, "CSafeDumper", yaml.SafeDumper)
+
+JSON_INDENT = 4
+
+
+def load_yaml(stream: IO) -> Any:
+    return yaml.load(stream, Loader=YamlLoader)
+
+
+def dump_yaml(data: Any, stream: Optional[IO] = None, compact: bool = False) -> Optional[str]:
+    '''Dump plain data (dicts, lists, scalars) to YAML, returns string if no stream is given.'''
+    return yaml.dump(
+        data,
+        stream,
+        Dumper=YamlDumper,
+        sort_keys=False,
+        default_flow_style=True if compact else False,
+        width=2 ** 31 - 1 if compact else None,  # Keep flow collections on a single line
+    )
+
+
+def dump_json(data: Any, stream: Optional[IO] = None, compact: bool = False) -> Optional[str]:
+    '''Dump plain data to JSON, returns string if no stream is given.'''
+    kwargs = {"separators": (",", ":")} if compact else {"indent": JSON_INDENT}
+    if stream is None:
+        return json.dumps(data, **kwargs)
+    json.dump(data, stream, **kwargs)
+
+
+def model_to_json(model: BaseModel, compact: bool = False, exclude: Optional[set] = None) -> str:
+    '''Dump pydantic model to JSON string with pydantic-core.'''
+    return model.model_dump_json(indent=None if compact else JSON_INDENT, exclude=exclude)
+
+
+def dump_data(data: Any, stream: IO, format: str, compact: bool = False):
+    '''Write plain data to stream as JSON or YAML.'''
+    if format == 'json':
+        dump_json(data, stream, compact=compact)
+    elif format == 'yaml':
+        dump_yaml(data, stream, compact=compact)
+    else:
+        raise ValueError(f"Unsupported format: {format}")
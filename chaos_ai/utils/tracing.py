@@ -0,0 +1,116 @@
+'''
+Timing spans for phases of a Chaos AI run.
+
+A SpanRecorder is made current with recording(), then any code running in that
+context (including threads started with a copied context) can time a phase with
+span(). Recorders forward spans to the recorder that was current when they were
+created, so a run level recorder collects spans of every scenario.
+
+Spans can be exported in the Chrome trace event format, viewable in
+chrome://tracing or https://ui.perfetto.dev.
+'''
+
+import os
+import time
+import threading
+import contextvars
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from chaos_ai.models.app import TimingSpan
+from chaos_ai.utils.serialization import dump_json
+
+TRACE_FILE_NAME = "trace.json"
+
+current_recorder: contextvars.ContextVar[Optional["SpanRecorder"]] = contextvars.ContextVar(
+    "current_recorder", default=None
+)
+
+
+class SpanRecorder:
+    def __init__(
+        self,
+        scenario_id: Optional[int] = None,
+        spans: Optional[List[TimingSpan]] = None,
+        parent: Optional["SpanRecorder"] = None,
+    ):
+        self.scenario_id = scenario_id
+        # Spans can be recorded directly into an existing list, such as CommandRunResult.spans
+        self.spans: List[TimingSpan] = spans if spans is not None else []
+        self.parent = parent if parent is not None else current_recorder.get()
+        self._lock = threading.Lock()
+
+    def record(self, span: TimingSpan):
+        if span.scenario_id is None:
+            span.scenario_id = self.scenario_id
+        with self._lock:
+            self.spans.append(span)
+        if self.parent is not None:
+            self.parent.record(span)
+
+
+@contextmanager
+def recording(recorder: SpanRecorder):
+    '''Make recorder current for spans started within the block.'''
+    token = current_recorder.set(recorder)
+    try:
+        yield recorder
+    finally:
+        current_recorder.reset(token)
+
+
+@contextmanager
+def span(name: str, **attributes):
+    '''Time the block and record it on the current recorder, no-op without one.'''
+    recorder = current_recorder.get()
+    if recorder is None:
+        yield
+        return
+
+    start = time.time()
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        recorder.record(TimingSpan(
+            name=name,
+            start=start,
+            duration=time.perf_counter() - started,
+            thread=threading.current_thread().name,
+            attributes=attributes,
+        ))
+
+
+def to_chrome_trace(spans: List[TimingSpan]) -> Dict:
+    '''Convert spans to Chrome trace event format, one track per thread.'''
+    threads: Dict[str, int] = {}
+    events = []
+    for item in sorted(spans, key=lambda x: x.start):
+        tid = threads.setdefault(item.thread, len(threads) + 1)
+        args = dict(item.attributes)
+        if item.scenario_id is not None:
+            args["scenario_id"] = item.scenario_id
+        events.append({
+            "name": item.name,
+            "cat": "scenario" if item.scenario_id is not None else "run",
+            "ph": "X",
+            "ts": item.start * 1e6,
+            "dur": item.duration * 1e6,
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": args,
+        })
+    for thread, tid in threads.items():
+        events.append({
+            "name": "thread_name",
+            "ph": "M",
+            "pid": os.getpid(),
+            "tid": tid,
+            "args": {"name": thread},
+        })
+    return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+
+def write_chrome_trace(path: str, spans: List[TimingSpan]):
+    with open(path, "w", encoding="utf-8") as file_handler:
+        dump_json(to_chrome_trace(spans), file_handler, compact=True)
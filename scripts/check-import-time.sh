@@ -0,0 +1,83 @@
+#!/bin/bash
+
+#******************************************************************************
+# File: check-import-time.sh
+#
+# Description:
+# Check that Chaos AI entry points import quickly and do not pull in heavy
+# dependencies (pandas, matplotlib, seaborn, krkn-lib) at module load.
+# Heavy modules must be imported on first use instead.
+#
+# Usage:
+# ./scripts/check-import-time.sh
+#
+# Environment:
+# - PYTHON: Python interpreter to use (default: python)
+# - CLI_IMPORT_BUDGET_MS: Import time budget of chaos_ai.cli (default: 300)
+# - RUN_IMPORT_BUDGET_MS: Import time budget of chaos_ai.algorithm.genetic (default: 1000)
+#
+#******************************************************************************
+
+set -e  # Exit on error
+
+PYTHON=${PYTHON:-python}
+CLI_IMPORT_BUDGET_MS=${CLI_IMPORT_BUDGET_MS:-300}
+RUN_IMPORT_BUDGET_MS=${RUN_IMPORT_BUDGET_MS:-1000}
+
+# Modules which are only allowed to load on first use
+HEAVY_MODULES="pandas matplotlib seaborn krkn_lib"
+
+FAILED=0
+
+# function to measure cumulative import time of a module in milliseconds
+function import_time_ms() {
+    local module=$1
+    # Last line reported for the module itself holds the cumulative time (in us)
+    $PYTHON -X importtime -c "import $module" 2>&1 >/dev/null \
+        | awk -F'|' -v module="$module" '{ gsub(/ /, "", $3) } $3 == module { total = $2 } END { printf "%d", total / 1000 }'
+}
+
+# function to list heavy modules loaded by importing a module
+function loaded_heavy_modules() {
+    local module=$1
+    $PYTHON -c "
+import sys
+import $module
+print(' '.join(m for m in '$HEAVY_MODULES'.split() if m in sys.modules))
+"
+}
+
+function check_module() {
+    local module=$1
+    local budget_ms=$2
+
+    local heavy=$(loaded_heavy_modules $module)
+    if [ -n "$heavy" ]; then
+        echo "$module FAILED: imports heavy modules at load time: $heavy"
+        FAILED=1
+    fi
+
+    # Take the best of a few runs to reduce noise from cold caches
+    local best=""
+    for _ in 1 2 3; do
+        local elapsed=$(import_time_ms $module)
+        if [ -z "$best" ] || [ $elapsed -lt $best ]; then
+            best=$elapsed
+        fi
+    done
+
+    if [ $best -gt $budget_ms ]; then
+        echo "$module FAILED: import took ${best}ms (budget ${budget_ms}ms)"
+        FAILED=1
+    else
+        echo "$module OK: import took ${best}ms (budget ${budget_ms}ms)"
+    fi
+}
+
+# CLI entry point, used by --help and argument validation
+check_module chaos_ai.cli $CLI_IMPORT_BUDGET_MS
+
+# Everything needed before the first scenario starts
+check_module chaos_ai.algorithm.genetic $RUN_IMPORT_BUDGET_MS
+
+exit $FAILED
@@ -0,0 +1,70 @@
+import datetime
+
+import pytest
+
+from chaos_ai.models.app import CommandRunResult, FitnessResult
+from chaos_ai.models.base_scenario import BaseScenario, ScenarioFactory
+from chaos_ai.models.config import ConfigFile
+
+
+def config_data(**overrides) -> dict:
+    '''Minimal config with pod scenarios and node CPU hogs.'''
+    data = {
+        "kubeconfig_file_path": "./kubeconfig.yaml",
+        "fitness_function": {"query": "up"},
+        "health_checks": {},
+        "scenario": {
+            "pod-scenarios": {
+                "namespace": ["robot-shop", "payments"],
+                "pod_label": ["service=cart", "service=user"],
+                "name_pattern": [".*"],
+            },
+            "node-cpu-hog": {
+                "node_selector": ["node-role.kubernetes.io/worker="],
+                "taints": ["[]"],
+            },
+        },
+    }
+    data.update(overrides)
+    return data
+
+
+@pytest.fixture
+def config() -> ConfigFile:
+    return ConfigFile(**config_data())
+
+
+@pytest.fixture
+def make_config():
+    return lambda **overrides: ConfigFile(**config_data(**overrides))
+
+
+@pytest.fixture
+def make_scenario(config):
+    '''Scenario of given type of the config, with parameter values overridden by name.'''
+    def make(name: str = "pod-scenarios", **values) -> BaseScenario:
+        sections = ScenarioFactory.available_scenarios(config)
+        scenario = ScenarioFactory.create_scenario(name, sections[name])
+        for parameter in scenario.parameters:
+            if parameter.name in values:
+                parameter.value = values[parameter.name]
+        return scenario
+    return make
+
+
+@pytest.fixture
+def make_result():
+    def make(scenario: BaseScenario, fitness_score: float, generation_id: int = 0, **kwargs) -> CommandRunResult:
+        now = datetime.datetime(2024, 1, 1)
+        return CommandRunResult(**{
+            "generation_id": generation_id,
+            "scenario": scenario,
+            "cmd": "krknctl run",
+            "log": "log of scenario",
+            "returncode": 0,
+            "start_time": now,
+            "end_time": now + datetime.timedelta(seconds=60),
+            "fitness_result": FitnessResult(fitness_score=fitness_score),
+            **kwargs,
+        })
+    return make
@@ -0,0 +1,63 @@
+import random
+from collections import Counter
+
+from chaos_ai.algorithm.bandit import Bandit, ScenarioBandit
+from chaos_ai.models.base_scenario import CompositeDependency, CompositeScenario
+from chaos_ai.models.config import BanditConfig, BanditStrategy
+
+
+def test_untried_arms_first():
+    random.seed(0)
+    bandit = Bandit(BanditStrategy.ucb1, exploration=1.414, min_probability=0.0)
+    bandit.update("a", 1.0)
+    assert bandit.choose(["a", "b"]) == "b"
+
+
+def test_ucb1_prefers_rewarding_arm():
+    random.seed(0)
+    bandit = Bandit(BanditStrategy.ucb1, exploration=0.1, min_probability=0.0)
+    for _ in range(20):
+        bandit.update("a", 10.0)
+        bandit.update("b", 1.0)
+    assert bandit.choose(["a", "b"]) == "a"
+
+
+def test_thompson_prefers_rewarding_arm():
+    random.seed(0)
+    bandit = Bandit(BanditStrategy.thompson, exploration=0.0, min_probability=0.0)
+    for _ in range(50):
+        bandit.update("a", 10.0)
+        bandit.update("b", 0.0)
+    picks = Counter(bandit.choose(["a", "b"]) for _ in range(200))
+    assert picks["a"] > 180
+
+
+def test_min_probability_keeps_exploring():
+    random.seed(0)
+    bandit = Bandit(BanditStrategy.ucb1, exploration=0.0, min_probability=0.2)
+    for _ in range(20):
+        bandit.update("a", 10.0)
+        bandit.update("b", 0.0)
+    picks = Counter(bandit.choose(["a", "b"]) for _ in range(1000))
+    # Uniform pick with probability 0.4, half of which is b
+    assert 120 < picks["b"] < 280
+
+
+def test_scenario_bandit_observes_types_and_targets(make_scenario):
+    bandit = ScenarioBandit(BanditConfig(enabled=True, targets=True))
+    pod = make_scenario("pod-scenarios", POD_LABEL="service=cart")
+    hog = make_scenario("node-cpu-hog")
+    bandit.observe(pod, 0.5)
+    bandit.observe(hog, 0.1)
+    # Composite scores are not credited to either type
+    bandit.observe(CompositeScenario.of(pod, hog, CompositeDependency.NONE), 5.0)
+
+    assert bandit.types.arms["pod-scenarios"].count == 1
+    assert bandit.types.arms["node-cpu-hog"].mean == 0.1
+    assert bandit.targets["pod-scenarios"].arms["service=cart"].mean == 0.5
+    assert bandit.choose_target("pod-scenarios", ["service=cart", "service=user"]) in ("service=cart", "service=user")
+
+
+def test_targets_disabled():
+    bandit = ScenarioBandit(BanditConfig(enabled=True, targets=False))
+    assert bandit.choose_target("pod-scenarios", ["service=cart"]) is None
@@ -0,0 +1,132 @@
+import pytest
+
+from chaos_ai.chaos_engines.cluster_inventory import ClusterInventory, match_label_selector, match_pod_selector
+from chaos_ai.models.base_scenario import CompositeDependency, CompositeScenario
+
+
+def pod(namespace: str, name: str, **labels) -> dict:
+    return {
+        "metadata": {"namespace": namespace, "name": name, "labels": labels},
+        "spec": {"containers": [{"name": name.split("-")[0]}], "nodeName": "worker-0"},
+    }
+
+
+PODS = [
+    pod("robot-shop", "cart-1", service="cart"),
+    pod("robot-shop", "cart-2", service="cart"),
+    pod("robot-shop", "cart-3", service="cart"),
+    pod("robot-shop", "web-1", app="web"),
+]
+NODES = [
+    {"metadata": {"name": "worker-0", "labels": {"node-role.kubernetes.io/worker": ""}}},
+]
+
+
+class FakeApi:
+    '''Serves fixed pods and nodes in place of the Kubernetes API.'''
+
+    def __init__(self, pods=PODS, nodes=NODES):
+        self.resources = {"pods": pods, "nodes": nodes}
+        self.calls = 0
+
+    def __call__(self, kind: str):
+        self.calls += 1
+        return self.resources[kind]
+
+
+@pytest.mark.parametrize("selector,expected", [
+    ("service=cart", True),
+    ("service==cart", True),
+    ("service=user", False),
+    ("service!=cart", False),
+    ("service", True),
+    ("!service", False),
+    ("service=cart,tier=backend", False),
+    ("", True),
+    ("service in (cart, user)", True),  # Set based selectors are not evaluated
+])
+def test_match_label_selector(selector, expected):
+    assert match_label_selector(selector, {"service": "cart"}) is expected
+
+
+def test_match_pod_selector():
+    assert match_pod_selector("{app: web}", {"app": "web", "tier": "frontend"})
+    assert not match_pod_selector("{app: web, tier: backend}", {"app": "web", "tier": "frontend"})
+    # Plain label selectors are accepted too
+    assert match_pod_selector("app=web", {"app": "web"})
+
+
+def test_scenario_with_targets_is_kept(config, make_scenario):
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    scenario = make_scenario(NAMESPACE="robot-shop", POD_LABEL="service=cart")
+    checked, reason = inventory.check(scenario)
+    assert reason is None
+    assert str(checked) == str(scenario)
+    # Disruption count may be searched up to the number of matching pods
+    assert {parameter.name: parameter for parameter in checked.parameters}["DISRUPTION_COUNT"].max_value == 3
+    # Nothing changes once checked, the same scenario is returned
+    assert inventory.check(checked) == (checked, None)
+
+
+def test_scenario_without_targets_is_repaired(config, make_scenario):
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    scenario = make_scenario(NAMESPACE="robot-shop", POD_LABEL="service=user")
+    checked, reason = inventory.check(scenario)
+    assert reason is None
+    assert {parameter.name: parameter.value for parameter in checked.parameters}["POD_LABEL"] == "service=cart"
+    # Scenario is copied, not modified in place
+    assert {parameter.name: parameter.value for parameter in scenario.parameters}["POD_LABEL"] == "service=user"
+
+
+def test_scenario_without_targets_is_pruned(make_config, make_scenario):
+    config = make_config(inventory={"enabled": True, "repair": False})
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    scenario = make_scenario(NAMESPACE="payments", POD_LABEL="service=cart")
+    checked, reason = inventory.check(scenario)
+    assert reason is not None and "targets no pods" in reason
+    assert checked is scenario
+
+    # A composite is skipped if any of its parts would be
+    composite = CompositeScenario.of(make_scenario(NAMESPACE="robot-shop"), scenario, CompositeDependency.NONE)
+    assert inventory.check(composite)[1] is not None
+
+
+def test_disruption_count_capped_at_targets(make_config, make_scenario):
+    config = make_config(parameter_ranges={"DISRUPTION_COUNT": {"min": 1, "max": 5}})
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    scenario = make_scenario(NAMESPACE="robot-shop", POD_LABEL="service=cart", DISRUPTION_COUNT=5)
+    checked, reason = inventory.check(scenario)
+    count = {parameter.name: parameter for parameter in checked.parameters}["DISRUPTION_COUNT"]
+    assert reason is None
+    assert count.max_value == 3
+    assert count.value == 3
+
+    # Configured max below the number of targets is kept
+    config = make_config(parameter_ranges={"DISRUPTION_COUNT": {"min": 1, "max": 2}})
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    checked, _ = inventory.check(make_scenario(NAMESPACE="robot-shop", POD_LABEL="service=cart", DISRUPTION_COUNT=2))
+    assert {parameter.name: parameter for parameter in checked.parameters}["DISRUPTION_COUNT"].max_value == 2
+
+
+def test_node_scenario(config, make_scenario):
+    inventory = ClusterInventory(config, fetcher=FakeApi())
+    assert inventory.check(make_scenario("node-cpu-hog"))[1] is None
+    inventory = ClusterInventory(config, fetcher=FakeApi(nodes=[]))
+    assert inventory.check(make_scenario("node-cpu-hog"))[1] is not None
+
+
+def test_failed_fetch_skips_checks(config, make_scenario):
+    def fetcher(kind):
+        raise RuntimeError("connection refused")
+
+    inventory = ClusterInventory(config, fetcher=fetcher)
+    scenario = make_scenario(NAMESPACE="payments")
+    assert inventory.check(scenario) == (scenario, None)
+
+
+def test_snapshot_refreshed_on_interval(make_config):
+    api = FakeApi()
+    inventory = ClusterInventory(make_config(inventory={"enabled": True, "refresh_interval": 3600}), fetcher=api)
+    inventory.snapshot()
+    inventory.snapshot()
+    assert api.calls == 2  # pods and nodes, fetched once
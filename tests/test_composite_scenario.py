@@ -0,0 +1,35 @@
+from chaos_ai.models.base_scenario import CompositeDependency, CompositeScenario
+
+
+def test_of_interns_equal_composites(make_scenario):
+    a, b = make_scenario(NAMESPACE="robot-shop"), make_scenario(NAMESPACE="payments")
+    composite = CompositeScenario.of(a, b, CompositeDependency.NONE)
+    # Equal children built separately resolve to the same node
+    equal = CompositeScenario.of(a.model_copy(deep=True), b.model_copy(deep=True), CompositeDependency.NONE)
+    assert equal is composite
+    assert CompositeScenario.of(a, b, CompositeDependency.A_ON_B) is not composite
+    assert CompositeScenario.of(b, a, CompositeDependency.NONE).fingerprint() != composite.fingerprint()
+
+
+def test_depth_and_leaf_count(make_scenario):
+    leaf = make_scenario()
+    assert (leaf.depth(), leaf.leaf_count()) == (0, 1)
+    pair = CompositeScenario.of(leaf, make_scenario("node-cpu-hog"), CompositeDependency.NONE)
+    assert (pair.depth(), pair.leaf_count()) == (1, 2)
+    nested = CompositeScenario.of(
+        pair, CompositeScenario.of(pair, leaf, CompositeDependency.B_ON_A), CompositeDependency.A_ON_B
+    )
+    assert (nested.depth(), nested.leaf_count()) == (3, 5)
+
+
+def test_replace(make_scenario):
+    # Namespaces not used by other tests, so that no equal node is interned already
+    composite = CompositeScenario.of(
+        make_scenario(NAMESPACE="replace-a"), make_scenario(NAMESPACE="replace-b"), CompositeDependency.NONE
+    )
+    assert composite.replace(composite.scenario_a, composite.scenario_b) is composite
+    replaced = composite.replace(composite.scenario_a, make_scenario(NAMESPACE="replace-c"))
+    assert replaced is not composite
+    assert replaced.dependency == composite.dependency
+    # Unchanged subtree is shared, not copied
+    assert replaced.scenario_a is composite.scenario_a
@@ -0,0 +1,124 @@
+import threading
+import time
+
+import pytest
+
+from chaos_ai.chaos_engines.agent import RunnerAgent
+from chaos_ai.chaos_engines.coordinator import Coordinator
+from chaos_ai.models.app import KrknRunnerType
+
+
+@pytest.fixture
+def agent_config(make_config):
+    # Fitness computed from health checks, so that mock runs do not need Prometheus
+    return make_config(fitness_function={"items": [{"type": "failure_ratio"}]})
+
+
+@pytest.fixture
+def coordinator(agent_config):
+    def start(**kwargs) -> Coordinator:
+        coordinator = Coordinator(agent_config, port=0, host="127.0.0.1", **kwargs)
+        coordinator.start()
+        started.append(coordinator)
+        return coordinator
+
+    started = []
+    yield start
+    for coordinator in started:
+        coordinator.stop(grace_period=5)
+
+
+def evaluate_in_background(coordinator: Coordinator, scenarios, generation_id: int = 0):
+    '''Queue scenarios, results are collected by a background thread.'''
+    results = {}
+    thread = threading.Thread(
+        target=lambda: results.update(coordinator.evaluate(scenarios, generation_id)),
+        daemon=True,
+    )
+    thread.start()
+    # Scenarios are queued on first iteration of evaluate
+    deadline = time.time() + 5
+    while coordinator.status()["queued"] < len(scenarios) and time.time() < deadline:
+        time.sleep(0.01)
+    return thread, results
+
+
+def test_agents_on_localhost(monkeypatch, tmp_path, agent_config, coordinator, make_scenario):
+    monkeypatch.setenv("MOCK_RUN", "1")
+    coordinator = coordinator()
+    agents = [
+        RunnerAgent(
+            "http://127.0.0.1:%d" % coordinator.port,
+            output_dir=str(tmp_path / name),
+            name=name,
+            config=agent_config,
+            runner_type=KrknRunnerType.CLI_RUNNER,
+            poll_interval=0.1,
+        )
+        for name in ("agent-1", "agent-2")
+    ]
+    threads = [threading.Thread(target=agent.run, daemon=True) for agent in agents]
+    for thread in threads:
+        thread.start()
+
+    scenarios = [make_scenario(NAMESPACE=namespace) for namespace in ("a", "b", "c", "d")]
+    results = dict(coordinator.evaluate(scenarios, generation_id=3))
+    assert sorted(results) == [0, 1, 2, 3]
+    for index, result in results.items():
+        assert result.returncode == 0
+        assert result.generation_id == 3
+        assert str(result.scenario) == str(scenarios[index])
+    # Scenario IDs are assigned by the coordinator, unique across agents
+    assert len({result.scenario_id for result in results.values()}) == 4
+
+    coordinator.stop(grace_period=5)
+    for thread in threads:
+        thread.join(timeout=10)
+        assert not thread.is_alive()
+    assert sum(agent["completed"] for agent in coordinator.status()["agents"]) == 4
+
+
+def test_expired_lease_is_queued_again(coordinator, make_scenario):
+    coordinator = coordinator(lease_timeout=0.5)
+    thread, results = evaluate_in_background(coordinator, [make_scenario()])
+
+    lost = coordinator.lease({"agent": "ghost"})["task"]
+    time.sleep(0.6)
+    # Lease expired without heartbeat, next agent gets the same task
+    task = coordinator.lease({"agent": "agent-1"})["task"]
+    assert task["task_id"] == lost["task_id"]
+    assert coordinator.heartbeat({"agent": "ghost", "task_id": lost["task_id"]}) == {"ok": False}
+    assert coordinator.heartbeat({"agent": "agent-1", "task_id": task["task_id"]}) == {"ok": True}
+
+    result = {
+        "generation_id": 0,
+        "scenario_id": task["scenario_id"],
+        "cmd": "",
+        "log": "",
+        "returncode": 0,
+        "start_time": "2024-01-01T00:00:00",
+        "end_time": "2024-01-01T00:01:00",
+        "fitness_result": {"fitness_score": 0.7},
+    }
+    assert coordinator.complete({"agent": "agent-1", "task_id": task["task_id"], "result": result}) == {"ok": True}
+    thread.join(timeout=5)
+    assert results[0].fitness_result.fitness_score == 0.7
+
+    # Late result of the agent whose lease expired is ignored
+    late = {**result, "fitness_result": {"fitness_score": 0.1}}
+    assert coordinator.complete({"agent": "ghost", "task_id": lost["task_id"], "result": late}) == {"ok": False}
+    assert results[0].fitness_result.fitness_score == 0.7
+
+
+def test_task_fails_after_max_attempts(coordinator, make_scenario):
+    coordinator = coordinator(lease_timeout=0.3, max_attempts=2)
+    thread, results = evaluate_in_background(coordinator, [make_scenario()])
+
+    for agent in ("ghost-1", "ghost-2"):
+        assert coordinator.lease({"agent": agent})["task"] is not None
+        time.sleep(0.4)
+    thread.join(timeout=5)
+
+    assert results[0].returncode == -1
+    assert "lost by 2 agents" in results[0].log
+    assert coordinator.lease({"agent": "agent-1"})["task"] is None
@@ -0,0 +1,45 @@
+import numpy as np
+
+from chaos_ai.reporter.downsample import bucket_mean, bucket_width, lttb
+
+
+def test_lttb_keeps_endpoints_and_peaks():
+    x = np.arange(10000, dtype=np.float64)
+    y = np.zeros_like(x)
+    y[1234] = 100.0  # Single spike, e.g. a latency outlier
+    y[8765] = -50.0
+
+    sampled_x, sampled_y = lttb(x, y, 200)
+    assert len(sampled_x) == 200
+    assert sampled_x[0] == 0 and sampled_x[-1] == 9999
+    assert np.all(np.diff(sampled_x) > 0)
+    assert 100.0 in sampled_y
+    assert -50.0 in sampled_y
+
+
+def test_lttb_returns_short_series_unchanged():
+    x = np.arange(10, dtype=np.float64)
+    y = x * 2
+    sampled_x, sampled_y = lttb(x, y, 50)
+    assert sampled_x is x and sampled_y is y
+    # Fewer than 3 points can not be triangulated
+    sampled_x, _ = lttb(x, y, 2)
+    assert sampled_x is x
+
+
+def test_bucket_width():
+    assert bucket_width(100, 200) == 1
+    assert bucket_width(3600, 200) == 30
+    # Longer than the largest nice width allows
+    assert bucket_width(86400 * 1000, 200) == 432000
+
+
+def test_bucket_mean():
+    timestamps = np.array([0.0, 0.5, 1.0, 3.5, 10.0])
+    values = np.array([1.0, 3.0, 5.0, 7.0, 9.0])
+    means = bucket_mean(timestamps, values, start=0.0, width=1.0, count=4)
+    assert means[0] == 2.0
+    assert means[1] == 5.0
+    assert np.isnan(means[2])
+    # Values after the last bucket are clamped into it
+    assert means[3] == 8.0
@@ -0,0 +1,69 @@
+import datetime
+
+from chaos_ai.chaos_engines.fitness_sampler import FitnessSampler
+from chaos_ai.models.config import FitnessFunction, FitnessFunctionItem, FitnessSamplingConfig
+
+START = datetime.datetime(2024, 1, 1)
+
+
+class FakeProcess:
+    def __init__(self):
+        self.terminated = False
+
+    def poll(self):
+        return 0 if self.terminated else None
+
+    def terminate(self):
+        self.terminated = True
+
+
+def sampler(values, **sampling) -> FitnessSampler:
+    '''Sampler whose query returns the given values one after another.'''
+    values = iter(values)
+    return FitnessSampler(
+        FitnessFunction(query="up", sampling=FitnessSamplingConfig(enabled=True, **sampling)),
+        lambda start, end, query, fitness_type: next(values),
+        START,
+    )
+
+
+def test_threshold_stops():
+    fitness_sampler = sampler([1.0, 5.0], threshold=4.0)
+    fitness_sampler.sample(START + datetime.timedelta(seconds=15))
+    assert not fitness_sampler.should_stop()
+    fitness_sampler.sample(START + datetime.timedelta(seconds=30))
+    assert fitness_sampler.should_stop()
+
+
+def test_saturation_needs_unchanged_samples():
+    fitness_sampler = sampler([1.0, 2.0, 2.0, 2.05], saturation_samples=2, saturation_tolerance=0.1)
+    stops = []
+    for i in range(4):
+        fitness_sampler.sample(START + datetime.timedelta(seconds=15 * (i + 1)))
+        stops.append(fitness_sampler.should_stop())
+    assert stops == [False, False, False, True]
+
+
+def test_weighted_items_and_final_sample():
+    fitness_function = FitnessFunction(items=[
+        FitnessFunctionItem(id=1, query="a", weight=0.5),
+        FitnessFunctionItem(id=2, query="b", weight=0.25),
+    ])
+    scores = {"a": 4.0, "b": 8.0}
+    fitness_sampler = FitnessSampler(
+        fitness_function,
+        lambda start, end, query, fitness_type: scores[query],
+        START,
+    )
+    result = fitness_sampler.stop(START + datetime.timedelta(seconds=60))
+    assert result.fitness_score == 4.0
+    assert [score.weighted_score for score in result.scores] == [2.0, 2.0]
+    assert len(result.samples) == 1
+
+
+def test_attach_after_early_stop_terminates_process():
+    fitness_sampler = sampler([])
+    fitness_sampler.result.early_stopped = True
+    process = FakeProcess()
+    fitness_sampler.attach(process)
+    assert process.terminated
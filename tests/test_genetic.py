@@ -0,0 +1,145 @@
+import datetime
+from collections import Counter
+
+import pytest
+
+from chaos_ai.algorithm.genetic import GeneticAlgorithm
+from chaos_ai.algorithm.warm_start import WarmStart
+from chaos_ai.models.base_scenario import CompositeScenario
+from chaos_ai.models.app import FitnessResult, FitnessSample, KrknRunnerType
+from chaos_ai.models.health_check_samples import HealthCheckSamples
+from chaos_ai.reporter.run_ledger import RunLedger
+
+
+@pytest.fixture
+def make_genetic(tmp_path, make_result):
+    def make(config, scores, **kwargs) -> GeneticAlgorithm:
+        '''Genetic algorithm whose runner scores the n-th run of a scenario with scores[n].'''
+        genetic = GeneticAlgorithm(
+            config,
+            output_dir=str(tmp_path),
+            format="yaml",
+            runner_type=KrknRunnerType.CLI_RUNNER,
+            plots_enabled=False,
+            **kwargs,
+        )
+        runs = Counter()
+
+        def run(scenario, generation_id, **kwargs):
+            fitness_score = scores[runs[scenario.fingerprint()]]
+            runs[scenario.fingerprint()] += 1
+            return make_result(scenario, fitness_score, generation_id=generation_id)
+
+        genetic.krkn_client.run = run
+        return genetic
+    return make
+
+
+def test_reevaluated_results_are_kept(make_config, make_genetic, make_scenario):
+    config = make_config(reevaluation={"enabled": True, "top_k": 1, "max_runs": 2})
+    genetic = make_genetic(config, scores=[0.5, 0.9])
+    genetic.population = [make_scenario(NAMESPACE="robot-shop"), make_scenario(NAMESPACE="payments")]
+    genetic.evaluate_generation(0)
+
+    # Both scenarios were run again, their latest results are the ones reused
+    for scenario in genetic.population:
+        assert genetic.racing.stats[scenario.fingerprint()].count == 2
+        assert genetic.seen_population[scenario].fitness_result.fitness_score == 0.9
+    genetic.ledger.close()
+
+
+def test_seen_scenarios_are_not_run_again(make_config, make_genetic, make_scenario):
+    genetic = make_genetic(make_config(), scores=[0.5, 0.9])
+    scenario = make_scenario()
+    genetic.population = [scenario]
+    first = genetic.evaluate_generation(0)
+    genetic.population = [scenario]
+    second = genetic.evaluate_generation(1)
+
+    assert second[0].fitness_result.fitness_score == first[0].fitness_result.fitness_score == 0.5
+    assert second[0].generation_id == 1
+    assert len(list(genetic.ledger.rows())) == 1
+    genetic.ledger.close()
+
+
+def test_initial_population_has_no_duplicates(tmp_path, make_config, make_genetic, make_scenario, make_result):
+    # 4 pod scenarios, 2 of them seeded from a previous run
+    config = make_config(
+        population_size=4,
+        scenario={"pod-scenarios": {"namespace": ["a", "b"], "pod_label": ["app=x"], "name_pattern": [".*"]}},
+        parameter_ranges={"KILL_TIMEOUT": {"min": 60, "max": 61}},
+    )
+    previous = tmp_path / "previous"
+    ledger = RunLedger(str(previous))
+    for scenario_id, namespace in enumerate(("a", "b")):
+        ledger.append(make_result(make_scenario(NAMESPACE=namespace, KILL_TIMEOUT=60), 0.5, scenario_id=scenario_id))
+    ledger.close()
+
+    warm_start = WarmStart(config, [str(previous)], fraction=0.5)
+    genetic = make_genetic(config, scores=[0.5], warm_start=warm_start)
+    genetic.create_initial_population()
+    fingerprints = [scenario.fingerprint() for scenario in genetic.population]
+    assert len(fingerprints) == 4
+    assert len(set(fingerprints)) == 4
+    genetic.ledger.close()
+
+
+def test_partial_fitness_is_kept_while_running(make_config, make_genetic, make_scenario, make_result):
+    genetic = make_genetic(make_config(), scores=[0.5])
+    scenario = make_scenario()
+    estimates = []
+
+    def run(scenario, generation_id, on_partial_fitness=None, **kwargs):
+        on_partial_fitness(FitnessResult(fitness_score=0.2))
+        estimates.append(genetic.running_estimates[scenario].fitness_score)
+        return make_result(scenario, 0.5, generation_id=generation_id)
+
+    genetic.krkn_client.run = run
+    genetic.population = [scenario]
+    genetic.evaluate_generation(0)
+    assert estimates == [0.2]
+    # Estimate is dropped once the final result is recorded
+    assert genetic.running_estimates == {}
+    genetic.ledger.close()
+
+
+def test_result_summary_spills_samples(tmp_path, make_config, make_genetic, make_scenario, make_result):
+    genetic = make_genetic(make_config(), scores=[0.5])
+    samples = HealthCheckSamples()
+    series = samples.series("cart", "http://cart", expected_interval=1.0)
+    for t in range(5):
+        series.append(float(t), 0.1, 200, success=t != 2)
+    fitness_result = FitnessResult(
+        fitness_score=0.5,
+        samples=[FitnessSample(timestamp=datetime.datetime(2024, 1, 1), value=0.5)],
+    )
+    result = make_result(make_scenario(), 0.5, health_check_samples=samples, fitness_result=fitness_result)
+
+    summary = genetic.record_result(result.scenario, result)
+    assert summary.samples_path == str(tmp_path / "samples" / ("scenario_%d.npz" % result.scenario_id))
+    # Sampled series are not kept in memory, health check samples are loaded on access
+    assert summary.fitness_result.samples == []
+    assert "health_check_samples" not in summary.model_dump()
+    loaded = next(iter(summary.health_check_samples))
+    assert list(loaded.success) == [True, True, False, True, True]
+
+    # Nothing is spilled for runs without health checks
+    empty = genetic.record_result(result.scenario, make_result(make_scenario(), 0.1))
+    assert empty.samples_path is None
+    assert len(empty.health_check_samples) == 0
+    genetic.reporter.wait()
+    genetic.ledger.close()
+
+
+def test_genetic_keeps_composites_within_bounds(make_config, make_genetic, make_scenario):
+    genetic = make_genetic(
+        make_config(composition={"max_depth": 1, "max_leaves": 3}, mutation_rate=0.0), scores=[0.5]
+    )
+    a, b = make_scenario(NAMESPACE="robot-shop"), make_scenario(NAMESPACE="payments")
+    pair = genetic.composition(a, b)
+    assert isinstance(pair, CompositeScenario) and pair.leaf_count() == 2
+    # Composite of a composite exceeds max_depth, the first parent is kept
+    assert genetic.composition(pair, a) is pair
+    # Mutation without any mutated parameter returns the same node
+    assert genetic.mutate(pair) is pair
+    genetic.ledger.close()
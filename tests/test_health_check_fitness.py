@@ -0,0 +1,100 @@
+import pytest
+
+from chaos_ai.chaos_engines.health_check_fitness import calculate_health_check_fitness
+from chaos_ai.chaos_engines.krkn_runner import KrknRunner
+from chaos_ai.models.app import KrknRunnerType
+from chaos_ai.models.config import FitnessFunctionItem
+from chaos_ai.models.health_check_samples import HealthCheckBaseline, HealthCheckSamples
+
+URL = "http://cart/health"
+
+
+def samples(*probes, name: str = "cart", url: str = URL, into: HealthCheckSamples = None) -> HealthCheckSamples:
+    '''Samples of probes given as (success, response_time), taken every second from t=0.'''
+    samples = into if into is not None else HealthCheckSamples()
+    series = samples.series(name, url, expected_interval=1.0)
+    for timestamp, (success, response_time) in enumerate(probes):
+        series.append(float(timestamp), response_time, 200 if success else -1, success)
+    return samples
+
+
+def fitness(type: str, health_check_samples: HealthCheckSamples, baselines=None, **item) -> float:
+    return calculate_health_check_fitness(
+        FitnessFunctionItem(type=type, **item), health_check_samples, baselines=baselines
+    )
+
+
+UP, DOWN = (True, 0.1), (False, 1.0)
+
+
+def test_failure_ratio():
+    assert fitness("failure_ratio", samples(DOWN, DOWN, DOWN)) == 1.0
+    # Computed over all probes of all applications
+    both = samples(UP, UP, UP, DOWN)
+    samples(UP, UP, UP, UP, name="user", url="http://user/health", into=both)
+    assert fitness("failure_ratio", both) == 0.125
+    assert fitness("failure_ratio", both, application="user") == 0.0
+    assert fitness("failure_ratio", HealthCheckSamples()) == 0.0
+
+
+def test_outage_streak():
+    assert fitness("outage_streak", samples(UP, DOWN, DOWN, UP, DOWN, UP)) == 2.0
+    # Outage that never recovers lasts until one interval after the last probe
+    assert fitness("outage_streak", samples(UP, UP, DOWN, DOWN, DOWN)) == 3.0
+    assert fitness("outage_streak", samples(UP, UP)) == 0.0
+
+
+def test_time_to_recover():
+    # From the first failure to the final recovery, including flapping in between
+    assert fitness("time_to_recover", samples(UP, DOWN, UP, DOWN, DOWN, UP)) == 4.0
+    assert fitness("time_to_recover", samples(UP, DOWN, UP, DOWN, DOWN)) == 4.0
+    assert fitness("time_to_recover", samples(UP, UP)) == 0.0
+
+
+def test_latency_degradation():
+    slow = samples(*[(True, 0.2)] * 10)
+    assert fitness("latency_degradation", slow, baseline=0.1) == pytest.approx(1.0, rel=0.02)
+
+    # Measured baseline of the endpoint is used when none is configured
+    baseline = HealthCheckBaseline("cart", URL)
+    for _ in range(10):
+        baseline.record(0.05, True)
+    assert fitness("latency_degradation", slow, {URL: baseline}) == pytest.approx(3.0, rel=0.02)
+
+    # Nothing to compare with, e.g. no steady state was observed
+    assert fitness("latency_degradation", slow, {URL: HealthCheckBaseline("cart", URL)}) == 0.0
+    assert fitness("latency_degradation", slow) == 0.0
+
+
+def test_latency_degradation_counts_timeouts():
+    # Probes that timed out carry the time waited, so an outage shows as degradation
+    timeouts = samples(*[UP] * 9, (False, 5.0))
+    assert fitness("latency_degradation", timeouts, baseline=0.1) > 10
+
+
+def test_mixed_prometheus_and_health_check_items(tmp_path, config):
+    runner = KrknRunner(config, output_dir=str(tmp_path), runner_type=KrknRunnerType.CLI_RUNNER)
+    queries = []
+
+    def query(start, end, query, fitness_type):
+        queries.append(query)
+        return 4.0
+
+    runner.calculate_fitness_value = query
+    items = [
+        FitnessFunctionItem(id=1, query="restarts", weight=0.5),
+        FitnessFunctionItem(id=2, type="failure_ratio", weight=0.25),
+    ]
+    result = runner.calculate_fitness_score_for_items(
+        start=None, end=None, health_check_samples=samples(UP, DOWN), items=items
+    )
+    # Only PromQL items query Prometheus
+    assert queries == ["restarts"]
+    assert [(score.id, score.fitness_score, score.weighted_score) for score in result.scores] == [
+        (1, 4.0, 2.0), (2, 0.5, 0.125)
+    ]
+    assert result.fitness_score == 2.125
+
+    # Health check items without samples score 0
+    result = runner.calculate_fitness_score_for_items(start=None, end=None, items=items[1:])
+    assert result.fitness_score == 0.0
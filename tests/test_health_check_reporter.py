@@ -0,0 +1,49 @@
+import logging
+import os
+
+from chaos_ai.models.health_check_samples import HealthCheckSamples
+from chaos_ai.reporter.health_check_reporter import HealthCheckReporter
+
+
+def samples_of(count: int = 30) -> HealthCheckSamples:
+    samples = HealthCheckSamples()
+    for name in ("cart", "user"):
+        series = samples.series(name, "http://%s/health" % name, expected_interval=1.0)
+        for t in range(count):
+            series.append(1000.0 + t, 0.01 * (t % 7), 200, success=t % 5 != 0)
+    return samples
+
+
+def test_plots_rendered_in_worker(tmp_path, make_scenario, make_result):
+    reporter = HealthCheckReporter(str(tmp_path), plot_dpi=20, plot_workers=1)
+    results = [
+        make_result(make_scenario(), 0.5, health_check_samples=samples_of())
+        for _ in range(2)
+    ]
+    for result in results:
+        reporter.plot_report(result)
+    reporter.wait()
+
+    for result in results:
+        path = tmp_path / "reports" / "graphs" / ("scenario_%d.png" % result.scenario_id)
+        assert os.path.getsize(path) > 0
+    # Pool is released once rendering is done
+    assert reporter._executor is None
+
+
+def test_worker_failure_is_logged(tmp_path, make_scenario, make_result, caplog):
+    # Unknown image format makes rendering fail in the worker
+    reporter = HealthCheckReporter(str(tmp_path), plot_dpi=20, plot_format="nope", plot_workers=1)
+    reporter.plot_report(make_result(make_scenario(), 0.5, health_check_samples=samples_of()))
+    with caplog.at_level(logging.ERROR):
+        reporter.wait()
+    assert "Unable to plot health check results" in caplog.text
+    assert reporter._executor is None
+
+
+def test_nothing_queued_without_samples(tmp_path, make_scenario, make_result):
+    reporter = HealthCheckReporter(str(tmp_path))
+    reporter.plot_report(make_result(make_scenario(), 0.5))
+    disabled = HealthCheckReporter(str(tmp_path), plots_enabled=False)
+    disabled.plot_report(make_result(make_scenario(), 0.5, health_check_samples=samples_of()))
+    assert reporter._executor is None and disabled._executor is None
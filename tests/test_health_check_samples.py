@@ -0,0 +1,92 @@
+import numpy as np
+
+from chaos_ai.models.health_check_samples import HealthCheckSamples, HealthCheckSeries
+
+
+def fill(series: HealthCheckSeries, count: int, start: int = 0):
+    '''Append probes at t=start.., failing every third one with an error.'''
+    for t in range(start, start + count):
+        success = t % 3 != 0
+        series.append(
+            float(t),
+            response_time=t / 100,
+            status_code=200 if success else 500,
+            success=success,
+            error=None if success else "error %d" % t,
+        )
+
+
+def test_ring_buffer_wraps_around():
+    series = HealthCheckSeries("cart", "http://cart", capacity=5)
+    fill(series, 12)
+    assert len(series) == 5
+    assert series.dropped == 7
+    # Oldest samples were overwritten, remaining ones are in insertion order
+    assert list(series.timestamps) == [7.0, 8.0, 9.0, 10.0, 11.0]
+    assert np.allclose(series.response_times, [0.07, 0.08, 0.09, 0.10, 0.11])
+    assert list(series.status_codes) == [200, 200, 500, 200, 200]
+    assert list(series.success) == [True, True, False, True, True]
+    # Errors of overwritten samples are dropped with them
+    assert [result.error for result in series.to_results()] == [None, None, "error 9", None, None]
+    assert len(series._errors) == 1
+
+
+def test_success_bitset_spans_bytes():
+    # Capacity not a multiple of 8, so the bitset has a partially used last byte
+    series = HealthCheckSeries("cart", "http://cart", capacity=11)
+    fill(series, 11)
+    assert list(series.success) == [t % 3 != 0 for t in range(11)]
+    # Overwriting flips bits of the reused slots, both ways
+    for t in range(11, 22):
+        series.append(float(t), 0.0, 200 if t % 2 else 500, success=bool(t % 2))
+    assert list(series.success) == [bool(t % 2) for t in range(11, 22)]
+
+
+def test_missed_slots_and_slice():
+    series = HealthCheckSeries("cart", "http://cart", capacity=4, expected_interval=1.0)
+    series.add_missed_slots(3)  # Nothing to attach to yet
+    fill(series, 6)
+    series.add_missed_slots(2)
+    assert series.missed_slots == 2
+
+    window = series.slice(3.0, 4.0)
+    assert list(window.timestamps) == [3.0, 4.0]
+    assert list(window.success) == [False, True]
+    assert window.expected_interval == 1.0
+    assert [result.error for result in window.to_results()] == ["error 3", None]
+
+
+def test_from_results_round_trip():
+    samples = HealthCheckSamples(capacity=8)
+    fill(samples.series("cart", "http://cart"), 4)
+    rebuilt = HealthCheckSamples.from_results(samples.to_results())
+    series = next(iter(rebuilt))
+    # Timestamps go through ISO strings, precise to the microsecond
+    assert np.allclose(series.timestamps, next(iter(samples)).timestamps, rtol=0, atol=1e-5)
+    assert list(series.success) == [False, True, True, False]
+    assert [result.error for result in series.to_results()] == ["error 0", None, None, "error 3"]
+
+
+def test_save_and_load(tmp_path):
+    samples = HealthCheckSamples(capacity=4)
+    cart = samples.series("cart", "http://cart", expected_interval=2.0)
+    fill(cart, 6)
+    cart.add_missed_slots(1)
+    fill(samples.series("user", "http://user"), 2)
+    path = str(tmp_path / "scenario_1.npz")
+    samples.save(path)
+
+    loaded = HealthCheckSamples.load(path)
+    assert loaded.capacity == 4
+    for original, restored in zip(samples, loaded):
+        assert (restored.name, restored.url, restored.expected_interval) == (
+            original.name, original.url, original.expected_interval
+        )
+        assert np.allclose(restored.timestamps, original.timestamps)
+        assert np.allclose(restored.response_times, original.response_times)
+        assert list(restored.status_codes) == list(original.status_codes)
+        assert list(restored.success) == list(original.success)
+        assert restored.missed_slots == original.missed_slots
+        assert [r.error for r in restored.to_results()] == [r.error for r in original.to_results()]
+    # Only samples still in the ring buffer are saved
+    assert list(next(iter(loaded)).timestamps) == [2.0, 3.0, 4.0, 5.0]
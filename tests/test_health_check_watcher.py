@@ -0,0 +1,113 @@
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from chaos_ai.chaos_engines.health_check_watcher import HealthCheckWatcher
+from chaos_ai.models.config import HealthCheckApplicationConfig, HealthCheckConfig
+
+# Nothing listens on port 1, probes fail right away with connection refused
+DEAD_URL = "http://127.0.0.1:1/health"
+
+
+def watcher(**kwargs) -> HealthCheckWatcher:
+    config = HealthCheckConfig(
+        applications=[HealthCheckApplicationConfig(name="dead", url=DEAD_URL, timeout=1, interval=1)],
+        baseline_cooldown=0,
+        **kwargs,
+    )
+    return HealthCheckWatcher(config)
+
+
+def test_baseline_counts_failed_probes():
+    health_check_watcher = watcher()
+    health_check_watcher.run()
+    try:
+        time.sleep(1.5)
+    finally:
+        health_check_watcher.stop()
+
+    baseline = health_check_watcher.get_baselines()[DEAD_URL]
+    assert baseline.total_count >= 1
+    assert baseline.success_rate == 0.0
+    # Connection is refused right away
+    assert baseline.percentile(50) < 0.5
+
+
+def test_timeout_keeps_waited_time():
+    # Connections are queued by the kernel but never accepted, so requests time out
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen(8)
+    url = "http://127.0.0.1:%d/health" % server.getsockname()[1]
+    health_check_watcher = HealthCheckWatcher(HealthCheckConfig(
+        applications=[HealthCheckApplicationConfig(name="stalled", url=url, timeout=1, interval=2)],
+    ))
+    health_check_watcher.run()
+    try:
+        time.sleep(1.5)
+    finally:
+        health_check_watcher.stop()
+        server.close()
+
+    series = next(iter(health_check_watcher.get_samples()))
+    assert list(series.success) == [False]
+    assert series.response_times[0] == pytest.approx(1.0, abs=0.2)
+    assert series.latency_histogram().percentile(99) == pytest.approx(1.0, abs=0.2)
+
+
+def test_stop_on_failure_only_stops_current_window():
+    health_check_watcher = watcher(stop_watcher_on_failure=True)
+    health_check_watcher.run()
+    try:
+        start = health_check_watcher.begin_window()
+        time.sleep(2.5)
+        first = health_check_watcher.end_window(start)
+
+        start = health_check_watcher.begin_window()
+        time.sleep(1.5)
+        second = health_check_watcher.end_window(start)
+    finally:
+        health_check_watcher.stop()
+
+    # Probing stopped after the first failure of each window, and resumed with the next one
+    assert [len(series) for series in first] == [1]
+    assert [len(series) for series in second] == [1]
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200 if self.path == "/ok" else 503)
+        self.end_headers()
+        self.wfile.write(b"body")
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_probes_applications_concurrently():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HealthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = "http://127.0.0.1:%d" % server.server_address[1]
+    health_check_watcher = HealthCheckWatcher(HealthCheckConfig(applications=[
+        HealthCheckApplicationConfig(name="ok", url=base + "/ok", interval=1),
+        HealthCheckApplicationConfig(name="down", url=base + "/down", interval=1),
+    ]))
+    threads = threading.active_count()
+    health_check_watcher.run()
+    try:
+        # Both applications are probed from a single event loop thread
+        assert threading.active_count() == threads + 1
+        time.sleep(1.5)
+    finally:
+        health_check_watcher.stop()
+        server.shutdown()
+
+    results = health_check_watcher.get_results()
+    assert len(results[base + "/ok"]) == 2
+    assert all(result.success and result.status_code == 200 for result in results[base + "/ok"])
+    assert all(not result.success and result.status_code == 503 for result in results[base + "/down"])
+    # Connection setup is measured apart from server latency
+    assert all(result.probe_overhead >= 0 for result in results[base + "/ok"])
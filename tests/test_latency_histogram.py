@@ -0,0 +1,63 @@
+import pytest
+
+from chaos_ai.models.latency_histogram import LatencyHistogram
+
+
+def test_percentiles_within_precision():
+    histogram = LatencyHistogram()
+    histogram.record_values([i / 1000 for i in range(1, 1001)])  # 1ms .. 1s
+    assert histogram.total_count == 1000
+    assert histogram.percentile(50) == pytest.approx(0.5, rel=0.01)
+    assert histogram.percentile(99) == pytest.approx(0.99, rel=0.01)
+    assert histogram.percentile(100) == pytest.approx(1.0, rel=0.01)
+
+
+def test_empty_histogram():
+    histogram = LatencyHistogram()
+    assert histogram.percentile(99) == 0.0
+    histogram.record_values([-1.0])  # Results of earlier versions stored failed probes as -1
+    assert histogram.total_count == 0
+
+
+def test_timeout_lands_in_top_percentile():
+    histogram = LatencyHistogram()
+    # Probes every second, a single one timing out after 5s
+    histogram.record_values([0.01] * 99 + [5.0], expected_interval=1.0)
+    # The timeout and the 4 probes it held back exceed the fast responses
+    assert histogram.total_count == 104
+    assert histogram.percentile(95) == pytest.approx(0.01, rel=0.01)
+    assert histogram.percentile(99) >= 1.0
+    assert histogram.percentile(100) == pytest.approx(5.0, rel=0.01)
+
+
+def test_values_clamped_to_max_value():
+    histogram = LatencyHistogram(max_value=10.0)
+    histogram.record_value(60.0)
+    assert histogram.percentile(100) == 10.0
+
+
+def test_coordinated_omission_correction():
+    histogram = LatencyHistogram()
+    # A 10s stall with probes expected every second also records the hidden 9s .. 1s probes
+    histogram.record_value(10.0, expected_interval=1.0)
+    assert histogram.total_count == 10
+    assert histogram.percentile(50) == pytest.approx(5.0, rel=0.01)
+    assert histogram.percentile(100) == pytest.approx(10.0, rel=0.01)
+
+    # Values below twice the interval are not corrected
+    histogram = LatencyHistogram()
+    histogram.record_value(1.5, expected_interval=1.0)
+    assert histogram.total_count == 1
+
+
+def test_merge():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    a.record_values([0.1] * 90)
+    b.record_values([1.0] * 10)
+    a.merge(b)
+    assert a.total_count == 100
+    assert a.percentile(90) == pytest.approx(0.1, rel=0.01)
+    assert a.percentile(91) == pytest.approx(1.0, rel=0.01)
+
+    with pytest.raises(ValueError):
+        a.merge(LatencyHistogram(significant_digits=3))
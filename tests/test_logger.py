@@ -0,0 +1,52 @@
+import logging
+
+from chaos_ai.utils.logger import (
+    SUBPROCESS_LOGGER_NAME,
+    RateLimitFilter,
+    get_module_logger,
+    scenario_logging,
+    setup_logging,
+)
+
+
+def record(name: str, message: str) -> logging.LogRecord:
+    return logging.LogRecord(name, logging.INFO, __file__, 1, message, None, None)
+
+
+def test_scenario_logs_routed_to_files(tmp_path):
+    logger = get_module_logger("tests.routing")
+    setup_logging(scenario_log_dir=str(tmp_path))
+    try:
+        logger.info("before any scenario")
+        with scenario_logging(7):
+            logger.debug("debug of 7")
+            with scenario_logging(8):
+                logger.info("nested 8")
+            logger.info("back to 7")
+    finally:
+        # Replacing the pipeline flushes queued records and closes scenario files
+        setup_logging()
+
+    with open(tmp_path / "scenario_7.log", encoding="utf-8") as f:
+        lines = f.read().splitlines()
+    # Debug output is kept in scenario files regardless of console level
+    assert len(lines) == 2
+    assert lines[0].endswith("DEBUG    debug of 7")
+    assert lines[1].endswith("INFO     back to 7")
+    with open(tmp_path / "scenario_8.log", encoding="utf-8") as f:
+        assert "nested 8" in f.read()
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["scenario_7.log", "scenario_8.log"]
+
+
+def test_subprocess_output_rate_limited():
+    rate_limit = RateLimitFilter(rate=0, burst=2)
+    subprocess = SUBPROCESS_LOGGER_NAME + ".krknctl"
+    assert [rate_limit.filter(record(subprocess, "line %d" % i)) for i in range(4)] == [True, True, False, False]
+    # Other loggers are never limited
+    assert rate_limit.filter(record("chaos_ai.genetic", "generation done"))
+
+    # Next line shown reports how many were dropped
+    rate_limit._tokens = 1
+    shown = record(subprocess, "line 4")
+    assert rate_limit.filter(shown)
+    assert shown.getMessage() == "(2 lines suppressed) line 4"
@@ -0,0 +1,71 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from chaos_ai.utils.metrics import CONTENT_TYPE, MetricsRegistry, MetricsServer
+
+
+@pytest.fixture
+def registry() -> MetricsRegistry:
+    return MetricsRegistry()
+
+
+def test_exposition_format(registry):
+    runs = registry.counter("runs", "Scenario runs.", ["returncode"])
+    generation = registry.gauge("generation", "Current generation.")
+    duration = registry.histogram("duration_seconds", "Run duration.", buckets=(1.0, 10.0))
+    runs.inc(returncode=0)
+    runs.inc(2, returncode=1)
+    generation.set(3)
+    duration.observe(0.5)
+    duration.observe(5.0)
+    duration.observe(50.0)
+
+    assert registry.expose() == "".join([
+        '# HELP duration_seconds Run duration.\n',
+        '# TYPE duration_seconds histogram\n',
+        'duration_seconds_bucket{le="1.0"} 1.0\n',
+        'duration_seconds_bucket{le="10.0"} 2.0\n',
+        'duration_seconds_bucket{le="+Inf"} 3.0\n',
+        'duration_seconds_sum 55.5\n',
+        'duration_seconds_count 3.0\n',
+        '# HELP generation Current generation.\n',
+        '# TYPE generation gauge\n',
+        'generation 3.0\n',
+        '# HELP runs Scenario runs.\n',
+        '# TYPE runs counter\n',
+        'runs_total{returncode="0"} 1.0\n',
+        'runs_total{returncode="1"} 2.0\n',
+    ])
+
+
+def test_labels_escaped_and_checked(registry):
+    probes = registry.counter("probes", "Probes.", ["application"])
+    probes.inc(application='say "hi"\n')
+    assert 'probes_total{application="say \\"hi\\"\\n"} 1.0' in registry.expose()
+    with pytest.raises(ValueError):
+        probes.inc(app="cart")
+    with pytest.raises(ValueError):
+        probes.inc(-1, application="cart")
+
+
+def test_unlabelled_metrics_start_at_zero(registry):
+    registry.counter("evaluations", "Evaluations.")
+    assert "evaluations_total 0.0\n" in registry.expose()
+    # Registering again returns the existing metric, e.g. on module reload
+    assert registry.gauge("pending", "Pending.") is registry.gauge("pending", "Pending.")
+
+
+def test_served_over_http(registry):
+    registry.gauge("generation", "Current generation.").set(1)
+    server = MetricsServer(port=0, registry=registry)
+    server.start()
+    try:
+        with urllib.request.urlopen("http://127.0.0.1:%d/metrics" % server.port) as response:
+            assert response.headers["Content-Type"] == CONTENT_TYPE
+            assert "generation 1.0\n" in response.read().decode("utf-8")
+        with pytest.raises(urllib.error.HTTPError):
+            urllib.request.urlopen("http://127.0.0.1:%d/other" % server.port)
+    finally:
+        server.stop()
@@ -0,0 +1,61 @@
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from chaos_ai.models.base_scenario_parameter import DurationParameter, NodeCPUCoreParameter
+from chaos_ai.models.config import ParameterRangeConfig
+
+
+def test_apply_range_clamps_value():
+    parameter = DurationParameter(value=60)
+    parameter.apply_range(ParameterRangeConfig(min=100, max=200))
+    assert parameter.value == 100
+
+
+def test_apply_range_checks_resulting_range():
+    # Log scale is the default of NODE_CPU_CORE, not part of the override
+    with pytest.raises(ValueError, match="positive min"):
+        NodeCPUCoreParameter().apply_range(ParameterRangeConfig(min=0))
+    with pytest.raises(ValueError, match="greater than max"):
+        DurationParameter().apply_range(ParameterRangeConfig(min=700))
+
+
+def test_invalid_parameter_range_rejects_config(make_config):
+    with pytest.raises(ValidationError, match="positive min"):
+        make_config(parameter_ranges={"NODE_CPU_CORE": {"min": 0}})
+    make_config(parameter_ranges={"NODE_CPU_CORE": {"min": 2, "max": 8}})
+
+
+@pytest.mark.parametrize("scale", ["integer", "log"])
+@pytest.mark.parametrize("distribution", ["gaussian", "polynomial", "uniform"])
+def test_mutation_changes_value_within_range(scale, distribution):
+    random.seed(0)
+    parameter = DurationParameter(value=60)
+    parameter.apply_range(ParameterRangeConfig(min=10, max=20, scale=scale, distribution=distribution))
+    for _ in range(200):
+        previous = parameter.value
+        parameter.mutate()
+        assert parameter.value != previous
+        assert isinstance(parameter.value, int)
+        assert 10 <= parameter.value <= 20
+
+
+def test_single_value_range_does_not_mutate():
+    parameter = DurationParameter(value=60)
+    parameter.apply_range(ParameterRangeConfig(min=30, max=30))
+    parameter.mutate()
+    assert parameter.value == 30
+
+
+def test_clamp_and_random_value():
+    random.seed(0)
+    parameter = DurationParameter(value=60)
+    parameter.apply_range(ParameterRangeConfig(min=10.5, max=20.5, scale="log"))
+    # Int-valued parameters round inside fractional bounds
+    assert parameter.clamp(10.6) == 11
+    assert parameter.clamp(5) == 11
+    assert parameter.clamp(25) == 20
+    values = {parameter.random_value() for _ in range(200)}
+    assert values <= set(range(11, 21))
+    assert len(values) > 1
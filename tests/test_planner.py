@@ -0,0 +1,106 @@
+import datetime
+
+import pytest
+
+from chaos_ai.algorithm.planner import (
+    DEFAULT_OVERHEAD,
+    DUMMY_DURATION,
+    CostModel,
+    RunPlanner,
+    _fit,
+    compose,
+    format_duration,
+    makespan,
+    parse_duration,
+)
+from chaos_ai.models.app import RunEstimate
+from chaos_ai.models.base_scenario import CompositeDependency, CompositeScenario
+from chaos_ai.reporter.run_ledger import RunLedger
+
+
+def test_parse_duration():
+    assert parse_duration("90") == 5400  # Plain numbers are minutes
+    assert parse_duration("90m") == 5400
+    assert parse_duration("1h30m") == 5400
+    assert parse_duration(" 3600S ") == 3600
+    assert parse_duration("1.5h") == 5400
+    for value in ("", "h", "1d", "30m1h"):
+        with pytest.raises(ValueError):
+            parse_duration(value)
+
+
+def test_format_duration():
+    assert format_duration(5400) == "1h30m"
+    assert format_duration(59) == "1m"
+    assert format_duration(3600 * 25) == "25h00m"
+
+
+def test_makespan():
+    assert makespan([3, 1, 2], 1) == 6
+    # Agents pick the next scenario once idle
+    assert makespan([3, 1, 2], 2) == 3
+    assert makespan([3, 1, 2], 5) == 3
+
+
+def test_critical_path(make_scenario):
+    cost_model = CostModel(default_overhead=10.0)
+    a, b = make_scenario(KILL_TIMEOUT=60), make_scenario(KILL_TIMEOUT=120)
+    assert cost_model.estimate(a) == 70
+    sequential = CompositeScenario(name="", scenario_a=a, scenario_b=b, dependency=CompositeDependency.A_ON_B)
+    assert cost_model.estimate(sequential) == 70 + 130
+    parallel = CompositeScenario(name="", scenario_a=a, scenario_b=b, dependency=CompositeDependency.NONE)
+    assert cost_model.estimate(parallel) == DUMMY_DURATION + 130
+    assert compose(70, 130, CompositeDependency.NONE, DUMMY_DURATION) == cost_model.estimate(parallel)
+
+
+def test_cost_model_from_history(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    # Results run 60s, pod scenarios ran for longer than nominal
+    for scenario_id, kill_timeout in enumerate((30, 40, 50)):
+        ledger.append(make_result(make_scenario(KILL_TIMEOUT=kill_timeout), 0.5, scenario_id=scenario_id))
+    ledger.close()
+    cost_model = CostModel.from_history([str(tmp_path)])
+    assert cost_model.overheads == {"pod-scenarios": 20.0}
+    assert cost_model.default_overhead == 20.0
+
+
+def test_cost_model_overhead_not_negative(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    # Early stopped runs are shorter than their nominal duration
+    ledger.append(make_result(make_scenario(KILL_TIMEOUT=300), 0.5, scenario_id=1))
+    ledger.append(make_result(make_scenario(KILL_TIMEOUT=300), 0.0, scenario_id=2, returncode=-1))
+    ledger.close()
+    cost_model = CostModel.from_history([str(tmp_path)])
+    assert cost_model.overheads == {"pod-scenarios": 0.0}
+    assert cost_model.default_overhead == 0.0
+    assert CostModel.from_history([str(tmp_path / "empty")]).default_overhead == DEFAULT_OVERHEAD
+
+
+def test_fit():
+    def estimate(value: int) -> RunEstimate:
+        return RunEstimate(
+            generations=value,
+            population_size=2,
+            evaluations=value * 2,
+            cluster_seconds=value * 10,
+            wall_clock_seconds=value * 10,
+            wall_clock_p90_seconds=value * 10,
+        )
+
+    assert _fit(estimate, 95, 100).generations == 9
+    assert _fit(estimate, 100, 100).generations == 10
+    assert _fit(estimate, 10000, 5).generations == 5
+    assert _fit(estimate, 5, 100) is None
+
+
+def test_small_search_space_is_enumerated(make_config):
+    config = make_config(
+        scenario={"pod-scenarios": {"namespace": ["a", "b"], "pod_label": ["app=x"], "name_pattern": [".*"]}},
+        parameter_ranges={"KILL_TIMEOUT": {"min": 60, "max": 61}},
+    )
+    planner = RunPlanner(config, CostModel(default_overhead=0.0), trials=2)
+    # 4 scenarios fit in 2 generations of 2, further generations have nothing left to run
+    estimate = planner.estimate(generations=5, population_size=2)
+    assert estimate.evaluations == 4
+    assert estimate.cluster_seconds == 2 * (60 + 61)
+    assert len(planner.pool) == 4
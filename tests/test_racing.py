@@ -0,0 +1,62 @@
+import math
+import statistics
+
+import pytest
+
+from chaos_ai.algorithm.racing import FitnessStats, RacingPolicy
+from chaos_ai.models.config import ReevaluationConfig
+
+
+def test_fitness_stats():
+    stats = FitnessStats()
+    assert stats.variance is None
+    for value in (1.0, 2.0, 4.0):
+        stats.update(value)
+    assert stats.mean == pytest.approx(statistics.mean([1.0, 2.0, 4.0]))
+    assert stats.variance == pytest.approx(statistics.variance([1.0, 2.0, 4.0]))
+
+
+def test_interval_unbounded_until_variance_is_known(make_scenario):
+    racing = RacingPolicy(ReevaluationConfig(enabled=True))
+    scenario = make_scenario()
+    racing.observe(scenario, 0.5)
+    assert racing.interval(scenario.fingerprint()) == (-math.inf, math.inf)
+    # Ranked by mean while bounds are meaningless
+    assert racing.rank_score(scenario) == 0.5
+    assert racing.rank_score(make_scenario(NAMESPACE="other")) is None
+
+
+def test_rank_by_lower_bound(make_scenario):
+    racing = RacingPolicy(ReevaluationConfig(enabled=True, rank_by="lower"))
+    steady, noisy = make_scenario(NAMESPACE="robot-shop"), make_scenario(NAMESPACE="payments")
+    for value in (0.50, 0.52, 0.51):
+        racing.observe(steady, value)
+    for value in (0.1, 1.0, 0.5):
+        racing.observe(noisy, value)
+    # Same mean, but noisy scenario is less reliably disruptive
+    assert racing.rank_score(steady) > racing.rank_score(noisy)
+
+
+def test_candidates_overlap_and_max_runs(make_scenario):
+    racing = RacingPolicy(ReevaluationConfig(enabled=True, top_k=1, max_runs=3))
+    a, b, c = (make_scenario(NAMESPACE=namespace) for namespace in ("a", "b", "c"))
+    for value in (0.50, 0.60):
+        racing.observe(a, value)
+    for value in (0.55, 0.65):
+        racing.observe(b, value)
+    racing.observe(c, 0.0)
+    # Only the top_k + 1 leading scenarios are considered
+    assert {scenario.fingerprint() for scenario in racing.candidates()} == {a.fingerprint(), b.fingerprint()}
+
+    racing.observe(a, 0.55)
+    assert [scenario.fingerprint() for scenario in racing.candidates()] == [b.fingerprint()]
+
+
+def test_separated_scenarios_are_not_run_again(make_scenario):
+    racing = RacingPolicy(ReevaluationConfig(enabled=True, top_k=2))
+    a, b = make_scenario(NAMESPACE="a"), make_scenario(NAMESPACE="b")
+    for value in (0.90, 0.91):
+        racing.observe(a, value)
+    for value in (0.10, 0.11):
+        racing.observe(b, value)
+    assert racing.candidates() == []
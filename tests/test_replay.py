@@ -0,0 +1,87 @@
+import logging
+import threading
+import time
+
+from chaos_ai.chaos_engines.replay import ReplayItem, ReplayRunner, load_top, shared_fitness, targets
+from chaos_ai.models.app import CommandRunResult
+from chaos_ai.models.base_scenario import CompositeDependency, CompositeScenario
+from chaos_ai.models.config import FitnessFunction
+from chaos_ai.reporter.run_ledger import RunLedger
+
+
+def test_targets(make_scenario):
+    pod = make_scenario(NAMESPACE="robot-shop")
+    hog = make_scenario("node-cpu-hog")
+    assert targets(pod) == {("namespace", "robot-shop")}
+    composite = CompositeScenario(name="", scenario_a=pod, scenario_b=hog, dependency=CompositeDependency.NONE)
+    assert targets(composite) == {("namespace", "robot-shop"), ("node", "node-role.kubernetes.io/worker=")}
+
+
+def test_shared_fitness():
+    assert shared_fitness(FitnessFunction(query="up")) == ["Prometheus queries"]
+    assert shared_fitness(FitnessFunction(items=[{"type": "failure_ratio"}])) == ["health checks"]
+    assert shared_fitness(FitnessFunction(items=[{"query": "up"}, {"type": "outage_streak"}])) == [
+        "Prometheus queries", "health checks"
+    ]
+
+
+def test_concurrency_warns_on_shared_fitness(tmp_path, config, caplog):
+    with caplog.at_level(logging.WARNING):
+        ReplayRunner(config, str(tmp_path / "sequential")).ledger.close()
+        assert "whole cluster" not in caplog.text
+        ReplayRunner(config, str(tmp_path / "concurrent"), concurrency=2).ledger.close()
+        assert "Prometheus queries over the whole cluster" in caplog.text
+
+
+def test_compare(tmp_path, config, make_scenario, make_result):
+    runner = ReplayRunner(config, str(tmp_path), tolerance=0.1, absolute_tolerance=0.05)
+    scenario = make_scenario()
+    item = ReplayItem(scenario, fitness_score=1.0, runs=2, scenario_id=7)
+    statuses = [runner.compare(item, make_result(scenario, score)).status for score in (1.05, 1.2, 0.8)]
+    assert statuses == ["pass", "regression", "improvement"]
+    # Absolute tolerance applies when larger than the relative one
+    low = ReplayItem(scenario, fitness_score=0.1, runs=1, scenario_id=8)
+    assert runner.compare(low, make_result(scenario, 0.14)).allowed_delta == 0.05
+    assert runner.compare(item, CommandRunResult.not_run(scenario, 0, "failed")).status == "error"
+    runner.ledger.close()
+
+
+def test_load_top_skips_not_run(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    ran, failed = make_scenario(NAMESPACE="robot-shop"), make_scenario(NAMESPACE="payments")
+    ledger.append(make_result(ran, 0.5))
+    ledger.append(make_result(ran, 0.7))
+    ledger.append(make_result(failed, 0.9, returncode=-1))
+    ledger.close()
+    items = load_top(str(tmp_path), 5)
+    assert len(items) == 1
+    assert str(items[0].scenario) == str(ran)
+    assert items[0].runs == 2
+    assert abs(items[0].fitness_score - 0.6) < 1e-9
+
+
+def test_replay_never_overlaps_targets(tmp_path, config, make_scenario, make_result):
+    runner = ReplayRunner(config, str(tmp_path), concurrency=3)
+    items = [
+        ReplayItem(make_scenario(NAMESPACE=namespace), 0.5, 1, scenario_id)
+        for scenario_id, namespace in enumerate(("robot-shop", "robot-shop", "payments", "robot-shop"))
+    ]
+    lock = threading.Lock()
+    running, overlaps, peak = [], [], [0]
+
+    def run(item, health_check_watcher):
+        with lock:
+            overlaps.extend(running_item for running_item in running if targets(running_item) & targets(item.scenario))
+            running.append(item.scenario)
+            peak[0] = max(peak[0], len(running))
+        time.sleep(0.05)
+        with lock:
+            running.remove(item.scenario)
+        return make_result(item.scenario, 0.5)
+
+    runner._run = run
+    results = runner.replay(items)
+    assert overlaps == []
+    assert peak[0] == 2  # payments runs along the robot-shop ones
+    assert [result.status for result in results] == ["pass"] * 4
+    assert [result.recorded_scenario_id for result in results] == [0, 1, 2, 3]
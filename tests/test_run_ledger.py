@@ -0,0 +1,66 @@
+import os
+
+import pytest
+
+from chaos_ai.reporter.run_ledger import LEDGER_FILE_NAME, RunLedger
+from chaos_ai.utils.serialization import load_yaml
+
+
+def test_append_and_read(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    scenarios = [make_scenario(NAMESPACE=namespace) for namespace in ("robot-shop", "payments")]
+    results = [make_result(scenario, score) for scenario, score in zip(scenarios, (0.2, 0.8))]
+    for result in results:
+        ledger.append(result)
+    ledger.close()
+
+    # Ledger is readable after the run
+    ledger = RunLedger(str(tmp_path))
+    assert os.path.exists(os.path.join(str(tmp_path), LEDGER_FILE_NAME))
+    rows = list(ledger.rows())
+    assert [row["scenario_id"] for row in rows] == [result.scenario_id for result in results]
+    assert rows[0]["fingerprint"] == scenarios[0].fingerprint()
+
+    stored = ledger.result(results[1].scenario_id)
+    assert stored["fitness_result"]["fitness_score"] == 0.8
+    assert "log" not in stored
+    assert [row["result"]["scenario_id"] for row in ledger.top_scenarios(1)] == [results[1].scenario_id]
+    with pytest.raises(KeyError):
+        ledger.result(-1)
+    ledger.close()
+
+
+def test_append_replaces_same_scenario_id(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    result = make_result(make_scenario(), 0.1)
+    ledger.append(result)
+    rerun = result.model_copy(update={"fitness_result": result.fitness_result.model_copy(update={"fitness_score": 0.9})})
+    ledger.append(rerun)
+    assert [row["fitness_score"] for row in ledger.rows()] == [0.9]
+    ledger.close()
+
+
+def test_export_files(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    result = make_result(make_scenario(), 0.5, generation_id=3)
+    ledger.append(result)
+    ledger.export_files('yaml')
+    ledger.close()
+
+    path = tmp_path / "yaml" / "generation_3" / ("scenario_%d.yaml" % result.scenario_id)
+    with open(path, encoding="utf-8") as f:
+        exported = load_yaml(f)
+    assert exported["job_id"] == result.scenario_id
+    assert exported["scenario"]["name"] == str(result.scenario)
+    with open(exported["log"], encoding="utf-8") as f:
+        assert f.read() == "log of scenario"
+
+
+def test_top_scenarios_excludes_skipped(tmp_path, make_scenario, make_result):
+    ledger = RunLedger(str(tmp_path))
+    skipped = make_result(make_scenario(NAMESPACE="payments"), 0.0, returncode=-1)
+    ledger.append(make_result(make_scenario(NAMESPACE="robot-shop"), -0.5))
+    ledger.append(skipped)
+    top = ledger.top_scenarios(5)
+    assert [row["result"]["scenario"]["parameters"][0]["value"] for row in top] == ["robot-shop"]
+    ledger.close()
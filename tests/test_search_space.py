@@ -0,0 +1,69 @@
+import pytest
+
+from chaos_ai.models.search_space import SearchSpace
+
+
+@pytest.fixture
+def search_space(make_config) -> SearchSpace:
+    # 2 namespaces * 2 pod labels * 3 kill timeouts
+    config = make_config(
+        scenario={
+            "pod-scenarios": {
+                "namespace": ["robot-shop", "payments"],
+                "pod_label": ["service=cart", "service=user"],
+                "name_pattern": [".*"],
+            },
+        },
+        parameter_ranges={"KILL_TIMEOUT": {"min": 60, "max": 62}},
+    )
+    return SearchSpace(config)
+
+
+def test_cardinality(search_space):
+    assert search_space.cardinality == 12
+    assert search_space.describe() == "pod-scenarios: 12"
+
+
+def test_index_round_trip(search_space):
+    template = search_space.templates[0]
+    scenarios = [template.scenario_at(index) for index in range(template.cardinality)]
+    assert [template.index_of(scenario) for scenario in scenarios] == list(range(12))
+    assert len({str(scenario) for scenario in scenarios}) == 12
+
+
+def test_index_of_value_outside_space(search_space):
+    template = search_space.templates[0]
+    scenario = template.scenario_at(0)
+    scenario.parameters[0].value = "kube-system"
+    assert template.index_of(scenario) is None
+
+
+def test_sample_without_replacement(search_space):
+    first = search_space.sample(5)
+    rest = search_space.sample(100)
+    names = [str(scenario) for scenario in first + rest]
+    assert len(names) == 12
+    assert len(set(names)) == 12
+    assert search_space.remaining == 0
+    assert search_space.sample(1) == []
+
+
+def test_draw_target(search_space):
+    template = search_space.templates[0]
+    digit = template.target_axis.values.index("service=user")
+    drawn = [template.scenario_at(template.draw(digit)) for _ in range(6)]
+    assert all(scenario.parameters[1].value == "service=user" for scenario in drawn)
+    assert template.target_remaining(digit) == 0
+    assert template.draw(digit) is None
+    assert template.remaining == 6
+
+
+def test_mark_drawn(search_space):
+    template = search_space.templates[0]
+    search_space.mark_drawn(template.scenario_at(3))
+    assert search_space.remaining == 11
+    assert all(template.index_of(scenario) != 3 for scenario in search_space.sample(11))
+
+
+def test_enumerate(search_space):
+    assert len(list(search_space.enumerate())) == 12
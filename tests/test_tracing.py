@@ -0,0 +1,62 @@
+import contextvars
+import threading
+
+from chaos_ai.utils.tracing import SpanRecorder, recording, span, to_chrome_trace
+
+
+def test_nested_spans_forwarded_to_run_recorder():
+    run = SpanRecorder()
+    with recording(run):
+        with span("evaluate_generation", generation_id=0):
+            scenario = SpanRecorder(scenario_id=7)
+            with recording(scenario):
+                with span("krkn_runner.run"):
+                    with span("krkn_run"):
+                        pass
+            with span("save_result"):
+                pass
+
+    # Spans are recorded as they end, inner ones first
+    assert [item.name for item in scenario.spans] == ["krkn_run", "krkn_runner.run"]
+    assert [item.name for item in run.spans] == ["krkn_run", "krkn_runner.run", "save_result", "evaluate_generation"]
+    assert [item.scenario_id for item in run.spans] == [7, 7, None, None]
+    inner, outer = run.spans[0], run.spans[-1]
+    assert outer.start <= inner.start
+    assert inner.start + inner.duration <= outer.start + outer.duration + 1e-3
+    assert outer.attributes == {"generation_id": 0}
+
+
+def test_context_propagates_to_threads_with_copied_context():
+    run = SpanRecorder()
+
+    def work(name):
+        with span(name):
+            pass
+
+    with recording(run):
+        copied = threading.Thread(target=contextvars.copy_context().run, args=(work, "copied"), name="worker")
+        plain = threading.Thread(target=work, args=("plain",))
+        for thread in (copied, plain):
+            thread.start()
+            thread.join()
+    # Threads start with an empty context unless it is copied
+    assert [(item.name, item.thread) for item in run.spans] == [("copied", "worker")]
+
+    # Spans outside of any recorder are not recorded
+    work("outside")
+    assert len(run.spans) == 1
+
+
+def test_chrome_trace():
+    run = SpanRecorder()
+    with recording(run):
+        with span("outer"):
+            with recording(SpanRecorder(scenario_id=3)):
+                with span("inner", phase="run"):
+                    pass
+    trace = to_chrome_trace(run.spans)
+    events = {event["name"]: event for event in trace["traceEvents"]}
+    assert events["inner"]["args"] == {"phase": "run", "scenario_id": 3}
+    assert events["inner"]["cat"] == "scenario" and events["outer"]["cat"] == "run"
+    assert events["inner"]["tid"] == events["outer"]["tid"]
+    assert events["thread_name"]["args"] == {"name": threading.current_thread().name}